@@ -4,11 +4,13 @@ from pathlib import Path
 import csv
 import io
 import unicodedata
-import yaml
-from rapidfuzz import fuzz
 
 """
 Matching module for address data (blocking + confidence + stopword gating).
+
+method: retrieve -> bloklama yerine sol satır başına TF-IDF ile sağ tarafın en
+yakın retrieve_n adayı alınır, yalnız bunlar confidence ile yeniden skorlanır
+(pahalı skorlama blok boyutundan bağımsız, satır başına en çok N).
 """
 
 # internal modules
@@ -36,6 +38,8 @@ def load_cfg(cfg_path: str) -> dict:
     p = Path(cfg_path)
     if not p.exists():
         return {}
+    import yaml
+
     return yaml.safe_load(p.read_text(encoding="utf-8")) or {}
 
 
@@ -84,11 +88,73 @@ def _tokenize_without_stops(text: str, stops: set[str]) -> set[str]:
     return {t for t in text.split() if t and (t not in stops)}
 
 
+def _prepare_right(rows: list[dict], text_col: str, stops: set[str]) -> list[tuple]:
+    """Sağ satırlar için (satır, metin, token, lat, lon) ön-hesabı."""
+    r_pre = []
+    for rr in rows:
+        rtxt = rr.get(text_col, "")
+        rlat, rlon = _get_latlon(rr)
+        r_pre.append((rr, rtxt, _tokenize_without_stops(rtxt, stops), rlat, rlon))
+    return r_pre
+
+
+def _score_candidates(lrow: dict, text_col: str, r_pre: list[tuple], *, scorer, stops: set[str], thr: float,
+                      w_text: float, w_digits: float, w_geo: float, max_km: float) -> list[tuple]:
+    """Sol satırı adaylarla skorlar; eşiği geçen (confidence, sağ satır) listesi."""
+    ltxt = lrow.get(text_col, "")
+    llat, llon = _get_latlon(lrow)
+    ltok = _tokenize_without_stops(ltxt, stops)
+
+    best = []
+    for rrow, rtxt, rtok, rlat, rlon in r_pre:
+        if stops and not (ltok & rtok):
+            continue
+
+        text_s = float(scorer(ltxt, rtxt))
+        d_s = digits_score(ltxt, rtxt)
+
+        g_km = None
+        if (
+            (llat is not None)
+            and (llon is not None)
+            and (rlat is not None)
+            and (rlon is not None)
+        ):
+            g_km = haversine_km(llat, llon, rlat, rlon)
+        g_s = geo_score_km(g_km, max_km=max_km) if g_km is not None else None
+
+        conf = combine_scores(
+            text_s, d_s, g_s, w_text=w_text, w_digits=w_digits, w_geo=w_geo
+        )
+        if conf >= thr:
+            best.append((conf, rrow))
+    return best
+
+
+def _retrieve_candidates(left_texts: list[str], right_texts: list[str], n: int, n_jobs: int = 1) -> list[list[int]]:
+    """
+    Sol satır başına sağ tarafta TF-IDF (char_wb 3-5) kosinüsüne göre en yakın
+    n satırın indeksi (sıfır benzerlikli dolgu adaylar atılır).
+    """
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    from addresskit.matching.sparse_knn import SparseKNN
+
+    vec = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), dtype=np.float32)
+    try:
+        X_right = vec.fit_transform(right_texts)
+    except ValueError:  # boş sözlük: sağ metinlerin hepsi boş/kısa
+        return [[] for _ in left_texts]
+    idx, sims = SparseKNN(X_right, n_jobs=n_jobs).search(vec.transform(left_texts), k=min(n, len(right_texts)))
+    return [row[s > 0].tolist() for row, s in zip(idx, sims)]
+
+
 # ---------- core ----------
 def match_addresses(left_path, right_path, output_path, config_path):
     cfg = load_cfg(config_path)
 
-    method = str(cfg.get("method", "fuzzy")).lower()  # "index" | "fuzzy"
+    method = str(cfg.get("method", "fuzzy")).lower()  # "index" | "fuzzy" | "retrieve"
     left_id = cfg.get("left_id", "id")
     right_id = cfg.get("right_id", "id")
 
@@ -106,6 +172,8 @@ def match_addresses(left_path, right_path, output_path, config_path):
     write_unmatched = bool(cfg.get("write_unmatched", True))
 
     # scorer
+    from rapidfuzz import fuzz
+
     scorer_name = str(cfg.get("scorer", "token_set_ratio")).lower()
     scorers = {
         "token_set_ratio": fuzz.token_set_ratio,
@@ -164,71 +232,56 @@ def match_addresses(left_path, right_path, output_path, config_path):
         print(f"[match] wrote -> {out}  (config={config_path}, method=index)")
         return
 
-    # --- fuzzy + confidence + blocking ---
-    Lb = group_by_block(left_rows, l_text_col, block_by)
-    Rb = group_by_block(right_rows, r_text_col, block_by)
-
+    score_kw = dict(scorer=scorer, stops=stops, thr=thr, w_text=w_text, w_digits=w_digits, w_geo=w_geo,
+                    max_km=max_km)
     matched_left, matched_right = set(), set()
 
-    with out.open("w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=["left_id", "right_id", "score"])
-        w.writeheader()
-
-        for key, lbucket in Lb.items():
-            rbucket = Rb.get(key, [])
-            if not rbucket:
-                continue
-
-            # R ön-hesap
-            r_pre = []
-            for rr in rbucket:
-                rtxt = rr.get(r_text_col, "")
-                rlat, rlon = _get_latlon(rr)
-                rtok = _tokenize_without_stops(rtxt, stops)
-                r_pre.append((rr, rtxt, rtok, rlat, rlon))
-
-            for lrow in lbucket:
-                ltxt = lrow.get(l_text_col, "")
-                lid_val = lrow.get(left_id, "")
-                llat, llon = _get_latlon(lrow)
-                ltok = _tokenize_without_stops(ltxt, stops)
-
-                best = []
-                for rrow, rtxt, rtok, rlat, rlon in r_pre:
-                    if stops and not (ltok & rtok):
-                        continue
-
-                    text_s = float(scorer(ltxt, rtxt))
-                    d_s = digits_score(ltxt, rtxt)
-
-                    g_km = None
-                    if (
-                        (llat is not None)
-                        and (llon is not None)
-                        and (rlat is not None)
-                        and (rlon is not None)
-                    ):
-                        g_km = haversine_km(llat, llon, rlat, rlon)
-                    g_s = geo_score_km(g_km, max_km=max_km) if g_km is not None else None
-
-                    conf = combine_scores(
-                        text_s, d_s, g_s, w_text=w_text, w_digits=w_digits, w_geo=w_geo
-                    )
-                    if conf >= thr:
-                        best.append((conf, rrow))
+    def _write_best(w, lid_val, best):
+        best.sort(key=lambda x: x[0], reverse=True)
+        for conf, rrow in best[:topk]:
+            rrid = rrow.get(right_id, "")
+            w.writerow({"left_id": lid_val, "right_id": rrid, "score": round(conf, 2)})
+            matched_left.add(lid_val)
+            matched_right.add(rrid)
+
+    if method == "retrieve":
+        # --- retrieve (TF-IDF top-N) + rerank (confidence): satır başına en çok N skor ---
+        retrieve_n = int(cfg.get("retrieve_n", 20))
+        r_pre = _prepare_right(right_rows, r_text_col, stops)
+        cand = _retrieve_candidates(
+            [r.get(l_text_col, "") for r in left_rows],
+            [r.get(r_text_col, "") for r in right_rows],
+            retrieve_n,
+            n_jobs=int(cfg.get("n_jobs", 1)),
+        )
+        with out.open("w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=["left_id", "right_id", "score"])
+            w.writeheader()
+            for lrow, ridx in zip(left_rows, cand):
+                best = _score_candidates(lrow, l_text_col, [r_pre[j] for j in ridx], **score_kw)
+                if best:
+                    _write_best(w, lrow.get(left_id, ""), best)
+    else:
+        # --- fuzzy + confidence + blocking ---
+        Lb = group_by_block(left_rows, l_text_col, block_by)
+        Rb = group_by_block(right_rows, r_text_col, block_by)
+
+        with out.open("w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=["left_id", "right_id", "score"])
+            w.writeheader()
 
-                if not best:
+            for key, lbucket in Lb.items():
+                rbucket = Rb.get(key, [])
+                if not rbucket:
                     continue
 
-                # top-k
-                best.sort(key=lambda x: x[0], reverse=True)
-                for conf, rrow in best[:topk]:
-                    rrid = rrow.get(right_id, "")
-                    w.writerow(
-                        {"left_id": lid_val, "right_id": rrid, "score": round(conf, 2)}
-                    )
-                    matched_left.add(lid_val)
-                    matched_right.add(rrid)
+                # R ön-hesap
+                r_pre = _prepare_right(rbucket, r_text_col, stops)
+
+                for lrow in lbucket:
+                    best = _score_candidates(lrow, l_text_col, r_pre, **score_kw)
+                    if best:
+                        _write_best(w, lrow.get(left_id, ""), best)
 
     # --- unmatched (opsiyonel) ---
     if write_unmatched:
@@ -260,7 +313,7 @@ def match_addresses(left_path, right_path, output_path, config_path):
                     )
 
     print(
-        f"[match] wrote -> {out}  (config={config_path}, method=fuzzy, "
+        f"[match] wrote -> {out}  (config={config_path}, method={method}, "
         f"text_col={l_text_col}/{r_text_col}, scorer={scorer_name}, threshold={thr})"
     )
 
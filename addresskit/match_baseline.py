@@ -1,38 +1,56 @@
 # addresskit/match_baseline.py
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.neighbors import NearestNeighbors
 import argparse
 
-print("match_baseline started...")
 
 def main():
+    # ağır bağımlılıklar yalnız çalıştırınca yüklenir (import süresi bütçesi)
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    from addresskit.matching.knn_index import has_knn_index, open_knn_index, save_knn_index
+
+    print("match_baseline started...")
     parser = argparse.ArgumentParser()
-    parser.add_argument("--train", required=True, help="Normalized train CSV")
+    parser.add_argument("--train", help="Normalized train CSV (--index hazırsa gerekmez)")
     parser.add_argument("--test", required=True, help="Normalized test CSV")
     parser.add_argument("--out", required=True, help="Output CSV for submission")
+    parser.add_argument("--n_jobs", type=int, default=-1, help="KNN sorgu thread sayısı; -1: tüm çekirdekler")
+    parser.add_argument("--index", default=None,
+                        help="Kalıcı KNN indeks dizini: varsa yüklenir (train fit atlanır), yoksa fit edilip yazılır")
     args = parser.parse_args()
+    if not args.train and not has_knn_index(args.index):
+        parser.error("--train ya da hazır bir --index gerekli")
 
     # 1. Verileri oku
     print("📂 Reading data...")
-    train_df = pd.read_csv(args.train)
     test_df = pd.read_csv(args.test)
 
-    # 2. TF-IDF vektörleştirme
-    print("🔤 Vectorizing text...")
-    vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5))
-    X_train = vectorizer.fit_transform(train_df["address"].astype(str))
-    X_test = vectorizer.transform(test_df["address"].astype(str))
+    # 2. TF-IDF vektörleştirme (indeks yoksa)
+    if not has_knn_index(args.index):
+        print("🔤 Vectorizing text...")
+        train_df = pd.read_csv(args.train)
+        vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5))
+        X_train = vectorizer.fit_transform(train_df["address"].astype(str))
+        if args.index:
+            save_knn_index(args.index, vectorizer, X_train, train_df["address_id"].values)
+            print(f"[OK] KNN indeksi yazıldı -> {args.index}")
+        else:
+            from addresskit.matching.sparse_knn import SparseKNN
+
+            knn = SparseKNN(X_train, labels=train_df["address_id"].values, n_jobs=args.n_jobs)
+            X_test = vectorizer.transform(test_df["address"].astype(str))
+    else:
+        print(f"[CACHE] KNN indeksi: {args.index}")
 
     # 3. KNN ile en yakın komşu bulma
     print("🔍 Finding nearest neighbors...")
-    knn = NearestNeighbors(n_neighbors=1, metric="cosine")
-    knn.fit(X_train)
-    distances, indices = knn.kneighbors(X_test)
+    if args.index:
+        preds, _ = open_knn_index(args.index, n_jobs=args.n_jobs).predict(test_df["address"].astype(str))
+    else:
+        preds, _ = knn.predict(X_test)
 
     # 4. Tahminleri oluştur
     print("📝 Creating predictions...")
-    preds = train_df.iloc[indices.flatten()]["address_id"].values
     submission = pd.DataFrame({
         "id": test_df["id"],
         "match_id": preds
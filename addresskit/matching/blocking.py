@@ -3,6 +3,8 @@ from __future__ import annotations
 import re
 from typing import Dict, List
 
+from addresskit.preprocessing.gazetteer import load_gazetteer, tokenize
+
 
 def _alnum_lower(s: str) -> str:
     s = (s or "").lower()
@@ -45,6 +47,10 @@ def make_block_key(row: dict, text_col: str, mode: str) -> str:
             ).lower().strip()
             if va or vb:
                 return f"{va}|{vb}"
+        # alan yoksa il/ilçe'yi metinden gazetteer ile çıkar
+        place = load_gazetteer().locate(tokenize(txt or ""))
+        if place.il or place.ilce:
+            return f"{place.il or ''}|{place.ilce or ''}"
         # bulamazsa text prefix fallback
         return _alnum_lower(txt)[:8]
 
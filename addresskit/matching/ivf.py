@@ -0,0 +1,264 @@
+# addresskit/matching/ivf.py
+"""
+SVD ile indirgenmiş (L2 normalize, float32) adres gömmeleri üzerinde
+IVF tarzı yaklaşık en yakın komşu indeksi.
+
+- Kaba nicemleyici: küresel k-means merkezleri; her vektör en yakın
+  merkezin ters listesine (inverted list) yazılır, listeler ardışık
+  saklanır (offsets + ids + vectors).
+- Sorgu: en yakın `nprobe` liste taranır; aynı listeyi yoklayan sorgular
+  tek matris çarpımıyla skorlanır.
+- İsteğe bağlı ürün nicemleme (PQ, pq_m > 0): vektörler yerine alt uzay
+  başına 1 bayt kod saklanır, skorlar sorgu başına tablo (ADC) ile toplanır.
+
+    index = IVFIndex.build(X_train_red, n_lists=1024, pq_m=0)
+    index.save("models/ann")
+    index = IVFIndex.load("models/ann")          # np.load(mmap_mode="r")
+    ids, scores = index.search(Q, k=10, nprobe=8)
+
+Skor iç çarpımdır (normalize vektörlerde kosinüs benzerliği).
+Eksik sonuçlar ids=-1, skor=-inf ile doldurulur.
+"""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .sparse_knn import DEFAULT_TRAIN_BLOCK, DEFAULT_WORKING_MB, _merge_topk, budget_rows
+
+INDEX_VERSION = 1
+_ARRAYS = ("centroids", "offsets", "ids", "vectors", "codes", "codebooks")
+_BYTES_PER_CELL_DENSE = 12  # float32 skor + argpartition'ın int64 indeksleri (ölçülen 12.0)
+
+
+def _assign(X: np.ndarray, C: np.ndarray, spherical: bool, chunk: int = 65_536) -> np.ndarray:
+    """Her satırın en yakın merkezi (küresel: en büyük iç çarpım; değilse öklid)."""
+    half = None if spherical else 0.5 * np.einsum("ij,ij->i", C, C)
+    out = np.empty(len(X), dtype=np.int64)
+    for s in range(0, len(X), chunk):
+        S = X[s : s + chunk] @ C.T
+        if half is not None:
+            S -= half
+        out[s : s + chunk] = S.argmax(axis=1)
+    return out
+
+
+def kmeans(X: np.ndarray, k: int, n_iter: int = 10, seed: int = 0, sample: int = 200_000,
+           spherical: bool = True) -> np.ndarray:
+    """Örneklem üzerinde Lloyd k-means; (k, d) float32 merkezler."""
+    rng = np.random.default_rng(seed)
+    X = np.asarray(X, dtype=np.float32)
+    if len(X) > sample:
+        X = X[rng.choice(len(X), sample, replace=False)]
+    k = min(k, len(X))
+    C = X[rng.choice(len(X), k, replace=False)].copy()
+    for _ in range(n_iter):
+        a = _assign(X, C, spherical)
+        counts = np.bincount(a, minlength=k)
+        new = np.zeros_like(C)
+        np.add.at(new, a, X)
+        empty = counts == 0
+        new[~empty] /= counts[~empty, None]
+        new[empty] = X[rng.choice(len(X), int(empty.sum()), replace=False)]  # boş küme -> rastgele nokta
+        if spherical:
+            new /= np.maximum(np.linalg.norm(new, axis=1, keepdims=True), 1e-12)
+        C = new
+    return C
+
+
+class IVFIndex:
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, ids: np.ndarray,
+                 vectors: Optional[np.ndarray] = None, codes: Optional[np.ndarray] = None,
+                 codebooks: Optional[np.ndarray] = None):
+        self.centroids = centroids  # (n_lists, d)
+        self.offsets = offsets      # (n_lists + 1,) liste sınırları
+        self.ids = ids              # (n,) liste sırasındaki orijinal satır no
+        self.vectors = vectors      # (n, d) float32 ya da None (PQ)
+        self.codes = codes          # (n, m) uint8 (PQ)
+        self.codebooks = codebooks  # (m, 256, d/m) float32 (PQ)
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def pq_m(self) -> int:
+        return 0 if self.codes is None else self.codes.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---------------- kurulum ----------------
+    @classmethod
+    def build(cls, X: np.ndarray, n_lists: Optional[int] = None, pq_m: int = 0, n_iter: int = 10,
+              seed: int = 0, sample: int = 200_000) -> "IVFIndex":
+        """n_lists varsayılanı ~4*sqrt(n); pq_m > 0 ise d, pq_m'e bölünebilmeli."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n, d = X.shape
+        n_lists = n_lists or max(1, int(4 * np.sqrt(n)))
+        C = kmeans(X, n_lists, n_iter=n_iter, seed=seed, sample=sample)
+        a = _assign(X, C, spherical=True)
+        order = np.argsort(a, kind="stable")
+        offsets = np.zeros(len(C) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(a, minlength=len(C)), out=offsets[1:])
+        if not pq_m:
+            return cls(C, offsets, order.astype(np.int64), vectors=X[order])
+        if d % pq_m:
+            raise ValueError(f"boyut {d}, pq_m={pq_m} ile bölünemiyor")
+        sub = d // pq_m
+        books = np.empty((pq_m, 256, sub), dtype=np.float32)
+        codes = np.empty((n, pq_m), dtype=np.uint8)
+        for j in range(pq_m):
+            Xj = np.ascontiguousarray(X[order, j * sub : (j + 1) * sub])
+            B = kmeans(Xj, 256, n_iter=n_iter, seed=seed + j + 1, sample=sample, spherical=False)
+            books[j, : len(B)] = B
+            books[j, len(B) :] = 0
+            codes[:, j] = _assign(Xj, B, spherical=False)
+        return cls(C, offsets, order.astype(np.int64), codes=codes, codebooks=books)
+
+    # ---------------- arama ----------------
+    def probe(self, Q: np.ndarray, nprobe: int) -> np.ndarray:
+        """(nq, nprobe) en yakın liste indeksleri."""
+        nprobe = min(max(1, int(nprobe)), self.n_lists)
+        S = Q @ self.centroids.T
+        if nprobe < self.n_lists:
+            return np.argpartition(-S, nprobe - 1, axis=1)[:, :nprobe]
+        return np.broadcast_to(np.arange(self.n_lists), S.shape).copy()
+
+    def _scores(self, Qs: np.ndarray, tables: Optional[np.ndarray], lo: int, hi: int) -> np.ndarray:
+        """[lo, hi) aralığındaki vektörlerin skorları (PQ: tablolar üzerinden ADC)."""
+        if tables is None:
+            return Qs @ np.asarray(self.vectors[lo:hi]).T
+        codes = np.asarray(self.codes[lo:hi])  # (nl, m)
+        m = codes.shape[1]
+        return tables[:, np.arange(m), codes].sum(axis=2)  # (nq, nl)
+
+    def search(self, Q: np.ndarray, k: int = 10, nprobe: int = 8,
+               chunk_rows: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids (nq, k) int64, skor (nq, k) float32), skora göre azalan."""
+        Q = np.atleast_2d(np.asarray(Q, dtype=np.float32))
+        nq = len(Q)
+        out_i = np.full((nq, k), -1, dtype=np.int64)
+        out_s = np.full((nq, k), -np.inf, dtype=np.float32)
+        for s in range(0, nq, max(1, int(chunk_rows))):
+            Qc = Q[s : s + chunk_rows]
+            i, sc = self._search_chunk(Qc, k, nprobe)
+            out_i[s : s + len(Qc)], out_s[s : s + len(Qc)] = i, sc
+        return out_i, out_s
+
+    def _search_chunk(self, Q: np.ndarray, k: int, nprobe: int):
+        nq = len(Q)
+        best_i = np.full((nq, k), -1, dtype=np.int64)
+        best_s = np.full((nq, k), -np.inf, dtype=np.float32)
+        if not nq:
+            return best_i, best_s
+        tables = None
+        if self.codes is not None:
+            m, _, sub = self.codebooks.shape
+            # tables[q, j, c] = <Q[q, j. alt uzay], codebooks[j, c]>
+            tables = np.einsum("qjs,jcs->qjc", Q.reshape(nq, m, sub), np.asarray(self.codebooks))
+        probes = self.probe(Q, nprobe)
+        q_of = np.repeat(np.arange(nq), probes.shape[1])
+        lists = probes.ravel()
+        order = np.argsort(lists, kind="stable")
+        lists, q_of = lists[order], q_of[order]
+        bounds = np.flatnonzero(np.diff(lists)) + 1
+        for qs, lst in zip(np.split(q_of, bounds), lists[np.r_[0, bounds]]):
+            lo, hi = int(self.offsets[lst]), int(self.offsets[lst + 1])
+            if hi == lo:
+                continue
+            S = self._scores(Q[qs], None if tables is None else tables[qs], lo, hi)
+            kk = min(k, S.shape[1])
+            idx = np.argpartition(-S, kk - 1, axis=1)[:, :kk] if kk < S.shape[1] else \
+                np.broadcast_to(np.arange(S.shape[1]), S.shape).copy()
+            cand_i = np.asarray(self.ids[lo:hi])[idx]
+            cand_s = np.take_along_axis(S, idx, axis=1).astype(np.float32)
+            best_i[qs], best_s[qs] = _merge_topk(best_i[qs], best_s[qs], cand_i, cand_s, k)
+        return best_i, best_s
+
+    # ---------------- kalıcılık ----------------
+    def save(self, path) -> Path:
+        d = Path(path)
+        d.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            arr = getattr(self, name)
+            f = d / f"{name}.npy"
+            if arr is not None:
+                np.save(f, np.ascontiguousarray(arr))
+            elif f.exists():
+                f.unlink()
+        meta = {"version": INDEX_VERSION, "n": len(self), "dim": int(self.centroids.shape[1]),
+                "n_lists": self.n_lists, "pq_m": self.pq_m}
+        with open(d / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        return d
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> "IVFIndex":
+        d = Path(path)
+        with open(d / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"IVF indeks sürümü {meta.get('version')} != {INDEX_VERSION}")
+        mode = "r" if mmap else None
+        arrays = {n: np.load(d / f"{n}.npy", mmap_mode=mode) if (d / f"{n}.npy").exists() else None
+                  for n in _ARRAYS}
+        arrays["centroids"] = np.asarray(arrays["centroids"])  # her sorguda okunur; küçük
+        arrays["offsets"] = np.asarray(arrays["offsets"])
+        return cls(**arrays)
+
+    def __repr__(self) -> str:
+        return f"IVFIndex(n={len(self)}, n_lists={self.n_lists}, pq_m={self.pq_m})"
+
+
+# ---------------- değerlendirme ----------------
+def exact_topk(Q: np.ndarray, X: np.ndarray, k: int = 10, chunk_rows: int = 1024,
+               train_block: int = DEFAULT_TRAIN_BLOCK,
+               working_mb: float = DEFAULT_WORKING_MB) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Kaba kuvvet iç çarpım top-k (indeks, skor) — recall ölçümü için. Sorgular ve
+    train birlikte parçalanır: yoğun skor bloğu (sorgu parçası x train_block)
+    working_mb ile sınırlı, train boyundan bağımsız (X memmap olabilir).
+    """
+    k = min(k, len(X))
+    block = max(1, min(int(train_block), len(X)))
+    step = max(1, min(int(chunk_rows), budget_rows(block, 1, working_mb, _BYTES_PER_CELL_DENSE)))
+    idx = np.empty((len(Q), k), dtype=np.int64)
+    sc = np.empty((len(Q), k), dtype=np.float32)
+    for s in range(0, len(Q), step):
+        Qc = np.asarray(Q[s : s + step], dtype=np.float32)
+        best_i = np.empty((len(Qc), 0), dtype=np.int64)
+        best_s = np.empty((len(Qc), 0), dtype=np.float32)
+        for b in range(0, len(X), block):
+            S = Qc @ np.asarray(X[b : b + block], dtype=np.float32).T
+            kk = min(k, S.shape[1])
+            # dilim kopyalanır: görünüm tam boy indeks dizisini sonraki bloğa kadar tutardı
+            part = np.argpartition(S, S.shape[1] - kk, axis=1)[:, -kk:].copy() if kk < S.shape[1] else \
+                np.broadcast_to(np.arange(S.shape[1]), S.shape).copy()
+            best_i, best_s = _merge_topk(best_i, best_s, part + b, np.take_along_axis(S, part, axis=1), k)
+        idx[s : s + len(Qc)], sc[s : s + len(Qc)] = best_i, best_s
+    return idx, sc
+
+
+def recall_curve(index: IVFIndex, Q: np.ndarray, exact: Tuple[np.ndarray, np.ndarray], k: int = 10,
+                 nprobes: Sequence[int] = (1, 2, 4, 8, 16, 32, 64)) -> List[Dict[str, float]]:
+    """
+    nprobe başına recall@k (kesin top-k içinden bulunan oran), recall@1
+    (ilk sonuç kesin en iyi; eşit skorlu kopyalar doğru sayılır) ve sorgu başına ms.
+    """
+    exact_i, exact_s = exact
+    ties = exact_s >= exact_s[:, :1] - 1e-5  # en iyiyle eşit skorlu kesin sonuçlar
+    rows = []
+    for p in nprobes:
+        t0 = time.perf_counter()
+        ids, sc = index.search(Q, k=k, nprobe=p)
+        ms = (time.perf_counter() - t0) * 1000 / max(len(Q), 1)
+        hit = [len(np.intersect1d(a, b)) / len(b) for a, b in zip(ids, exact_i[:, :k])]
+        rows.append({"nprobe": int(p), f"recall@{k}": float(np.mean(hit)),
+                     "recall@1": float(np.mean(((exact_i == ids[:, :1]) & ties).any(axis=1))),
+                     "ms_per_query": ms})
+    return rows
@@ -0,0 +1,166 @@
+# addresskit/matching/knn_index.py
+"""
+Kalıcı, tekrar kullanılabilir TF-IDF KNN indeksi.
+
+fit_knn bir kez çalışır ve indeksi diske yazar; sonraki tahmin
+çalıştırmaları (ve işçi süreçler) TfidfVectorizer / train CSV'sini yeniden
+fit etmeden aynı dosyaları memory-map ile paylaşır.
+
+    <dir>/meta.json
+    <dir>/tfidf.vocab.npy, tfidf.cols.npy, tfidf.idf.npy   sözlük + idf (bkz. modeling/bundle.py)
+    <dir>/data.npy, indices.npy, indptr.npy               L2 normalize float32 CSR train matrisi
+    <dir>/labels.npy                                      satır etiketleri
+    <dir>/texts.bin, texts.off.npy                        (opsiyonel) UTF-8 satır metinleri + ofsetler
+
+    save_knn_index(dir, vectorizer, X_train, train_labels)
+    index = open_knn_index(dir)          # süreç başına bir kez; diziler ilk sorguda açılır
+    labels, sims = index.predict(texts)
+
+Arama sparse_knn ile aynıdır; train blokları memmap dizilerinin kopyasız
+satır görünümleridir.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .sparse_knn import (DEFAULT_CHUNK_ROWS, DEFAULT_TRAIN_BLOCK, DEFAULT_WORKING_MB, l2_normalize, row_blocks,
+                         search_blocks)
+
+KNN_INDEX_VERSION = 1
+_CHANNEL = "tfidf"
+
+
+def save_knn_index(path, vectorizer: Any, X_train, labels: Sequence[Any],
+                   texts: Optional[Sequence[str]] = None) -> Path:
+    """
+    Fit edilmiş TfidfVectorizer + train matrisi + etiketleri dizine yazar (geçici dizin + rename).
+    texts verilirse komşu metinleri de saklanır (yeniden sıralama için, bkz. modeling/cascade.py).
+    """
+    from addresskit.modeling.bundle import save_vocab_channel
+
+    final = Path(path)
+    tmp = final.with_name(f".{final.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    params = save_vocab_channel(tmp, _CHANNEL, vectorizer)
+    X = l2_normalize(X_train)
+    for name in ("data", "indices", "indptr"):
+        np.save(tmp / f"{name}.npy", getattr(X, name))
+    labels = np.asarray(labels)
+    if labels.dtype == object:
+        labels = labels.astype(str)
+    if len(labels) != X.shape[0]:
+        raise ValueError(f"etiket sayısı {len(labels)} != satır sayısı {X.shape[0]}")
+    np.save(tmp / "labels.npy", labels)
+    if texts is not None:
+        _save_texts(tmp, texts, X.shape[0])
+    meta = {"version": KNN_INDEX_VERSION, "params": params, "n_rows": X.shape[0], "n_features": X.shape[1],
+            "texts": texts is not None}
+    with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(tmp, final)
+    return final
+
+
+def _save_texts(d: Path, texts: Sequence[str], n: int) -> None:
+    enc = ["" if t is None else str(t) for t in texts]
+    if len(enc) != n:
+        raise ValueError(f"metin sayısı {len(enc)} != satır sayısı {n}")
+    blobs = [t.encode("utf-8") for t in enc]
+    off = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in blobs], out=off[1:])
+    (d / "texts.bin").write_bytes(b"".join(blobs))
+    np.save(d / "texts.off.npy", off)
+
+
+def has_knn_index(path) -> bool:
+    return bool(path) and (Path(path) / "meta.json").exists()
+
+
+class TfidfKNNIndex:
+    def __init__(self, path, n_jobs: int = 1, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 train_block: int = DEFAULT_TRAIN_BLOCK, working_mb: float = DEFAULT_WORKING_MB):
+        self.path = Path(path)
+        with open(self.path / "meta.json", "r", encoding="utf-8") as f:
+            self.meta: Dict[str, Any] = json.load(f)
+        if self.meta.get("version") != KNN_INDEX_VERSION:
+            raise ValueError(f"KNN indeks sürümü {self.meta.get('version')} != {KNN_INDEX_VERSION}")
+        self.n_jobs = n_jobs
+        self.chunk_rows = chunk_rows
+        self.train_block = train_block
+        self.working_mb = working_mb
+        self._channel = None
+        self._blocks = None
+        self._labels: Optional[np.ndarray] = None
+        self._texts = None
+
+    def _load(self) -> None:
+        if self._blocks is not None:
+            return
+        from addresskit.modeling.bundle import load_vocab_channel
+
+        d = self.path
+        self._channel = load_vocab_channel(d, _CHANNEL, self.meta["params"])
+        data, indices, indptr = (np.load(d / f"{n}.npy", mmap_mode="r") for n in ("data", "indices", "indptr"))
+        shape = (self.meta["n_rows"], self.meta["n_features"])
+        self._blocks = row_blocks(data, indices, indptr, shape, self.train_block)
+        self._labels = np.load(d / "labels.npy", mmap_mode="r")
+        if self.meta.get("texts"):
+            blob = np.memmap(d / "texts.bin", dtype=np.uint8, mode="r") if (d / "texts.bin").stat().st_size else b""
+            self._texts = (blob, np.load(d / "texts.off.npy", mmap_mode="r"))
+
+    @property
+    def labels(self) -> np.ndarray:
+        self._load()
+        return self._labels
+
+    def __len__(self) -> int:
+        return self.meta["n_rows"]
+
+    def texts(self, rows) -> List[str]:
+        """Verilen satırların metinleri (indeks texts ile yazılmış olmalı)."""
+        self._load()
+        if self._texts is None:
+            raise ValueError(f"{self.path} metin içermiyor (save_knn_index(..., texts=...))")
+        blob, off = self._texts
+        return [bytes(blob[off[r] : off[r + 1]]).decode("utf-8") for r in np.asarray(rows).ravel()]
+
+    def transform(self, texts: Sequence[str]):
+        self._load()
+        return self._channel.transform(["" if t is None else str(t) for t in texts])
+
+    def search(self, texts: Sequence[str], k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """(indeks (n,k), kosinüs benzerliği (n,k)), benzerliğe göre azalan."""
+        Q = self.transform(texts)
+        return search_blocks(Q, self._blocks, len(self), k, self.chunk_rows, self.n_jobs, transposed=False,
+                             working_mb=self.working_mb)
+
+    def predict(self, texts: Sequence[str], k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """(etiketler, benzerlikler); k=1 ise 1-boyutlu."""
+        idx, sims = self.search(texts, k)
+        labels = np.asarray(self.labels[idx])
+        return (labels[:, 0], sims[:, 0]) if k == 1 else (labels, sims)
+
+    def __repr__(self) -> str:
+        return f"TfidfKNNIndex({str(self.path)!r}, rows={len(self)}, n_features={self.meta['n_features']})"
+
+
+_OPEN: Dict[Tuple[str, float], TfidfKNNIndex] = {}
+
+
+def open_knn_index(path, n_jobs: int = 1) -> TfidfKNNIndex:
+    """Süreç içi önbellekli açma (dizin yeniden yazılırsa meta.json zamanı değişir, yeniden açılır)."""
+    p = Path(path).resolve()
+    key = (str(p), (p / "meta.json").stat().st_mtime)
+    index = _OPEN.get(key)
+    if index is None:
+        index = _OPEN[key] = TfidfKNNIndex(p, n_jobs=n_jobs)
+    index.n_jobs = n_jobs
+    return index
@@ -0,0 +1,146 @@
+# addresskit/matching/label_index.py
+"""
+Etiket merkezli (label-centroid) TF-IDF indeksi.
+
+Tahmin ~10k etiketten biridir; ~850k train satırının hepsini indekslemek
+yerine her etiketin L2 normalize satırları toplanıp normalize edilir
+(etiket başına bir merkez, ~80x daha küçük indeks). Sorgu önce merkezlerde
+aranır; rerank_m > 0 ise en iyi m etiketin yalnız üye satırlarıyla
+yeniden skorlanır (en yakın üye satırın etiketi/benzerliği).
+
+    index = LabelCentroidIndex(X_train, train_labels, rerank_m=5)
+    labels, sims = index.predict(X_query)
+    compare_index_modes(X_train, y_train, X_val, y_val)   # hız / doğruluk tablosu
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .sparse_knn import DEFAULT_CHUNK_ROWS, SparseKNN, l2_normalize
+
+RERANK_CHUNK = 64
+
+
+class LabelCentroidIndex:
+    def __init__(self, X, labels: Sequence[Any], rerank_m: int = 0, n_jobs: int = 1,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        import scipy.sparse as sp
+
+        X = l2_normalize(X)
+        self.classes, codes = np.unique(np.asarray(labels), return_inverse=True)
+        n, L = X.shape[0], len(self.classes)
+        M = sp.csr_matrix((np.ones(n, dtype=np.float32), (codes, np.arange(n))), shape=(L, n))
+        self.centroids = SparseKNN(M @ X, labels=self.classes, n_jobs=n_jobs, chunk_rows=chunk_rows)
+        self.n_rows = n
+        self.rerank_m = rerank_m
+        self.members = None
+        if rerank_m:
+            order = np.argsort(codes, kind="stable")
+            self.members = X[order]  # etiket sıralı üye satırlar
+            self.offsets = np.zeros(L + 1, dtype=np.int64)
+            np.cumsum(np.bincount(codes, minlength=L), out=self.offsets[1:])
+
+    def __len__(self) -> int:
+        return len(self.classes)
+
+    def _rerank(self, Q, cand: np.ndarray, chunk_rows: int = RERANK_CHUNK) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Her sorgu için aday etiketlerin üye satırları arasında en yakın satır.
+        Parça başına aday etiketlerin üyeleri tek çarpımla skorlanır, sorgunun
+        kendi adayları dışındaki kolonlar maskelenir.
+        """
+        n = Q.shape[0]
+        best = np.empty(n, dtype=np.int64)
+        sims = np.empty(n, dtype=np.float32)
+        for s in range(0, n, chunk_rows):
+            c = cand[s : s + chunk_rows]
+            labs = np.unique(c)
+            sizes = self.offsets[labs + 1] - self.offsets[labs]
+            rows = np.concatenate([np.arange(self.offsets[lab], self.offsets[lab + 1]) for lab in labs])
+            owner = np.repeat(np.arange(len(labs)), sizes)  # kolon -> labs içindeki sıra
+            allowed = np.zeros((len(c), len(labs)), dtype=bool)
+            np.put_along_axis(allowed, np.searchsorted(labs, c), True, axis=1)
+            S = (Q[s : s + chunk_rows] @ self.members[rows].T).toarray()
+            S[~allowed[:, owner]] = -np.inf
+            j = S.argmax(axis=1)
+            best[s : s + len(c)] = labs[owner[j]]
+            sims[s : s + len(c)] = S[np.arange(len(c)), j]
+        return best, sims
+
+    def predict(self, Q, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """(etiketler, benzerlikler). k > 1 yalnız rerank kapalıyken (merkez skorları) desteklenir."""
+        if not self.rerank_m:
+            return self.centroids.predict(Q, k)
+        if k != 1:
+            raise ValueError("rerank modunda k=1 desteklenir")
+        cand, _ = self.centroids.search(Q, k=self.rerank_m)
+        best, sims = self._rerank(l2_normalize(Q), cand)
+        return self.classes[best], sims
+
+    def __repr__(self) -> str:
+        return f"LabelCentroidIndex(labels={len(self)}, rows={self.n_rows}, rerank_m={self.rerank_m})"
+
+
+def compare_index_modes(X_train, y_train: Sequence[Any], X_val, y_val: Sequence[Any],
+                        rerank_ms: Sequence[int] = (0, 3, 10), n_jobs: int = 1) -> List[Dict[str, Any]]:
+    """
+    Tam satır kaba kuvvet indeksi ile merkez indeksinin (rerank_m değerleri
+    için) top-1 doğruluk, sorgu başına ms ve indeks satır sayısı karşılaştırması.
+    """
+    y_val = np.asarray(y_val)
+    n = max(X_val.shape[0], 1)
+    out = []
+    t0 = time.perf_counter()
+    full = SparseKNN(X_train, labels=y_train, n_jobs=n_jobs)
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    pred, _ = full.predict(X_val)
+    out.append({"mode": "rows", "index_rows": full.shape[0], "acc": float(np.mean(pred == y_val)),
+                "build_s": build, "ms_per_query": (time.perf_counter() - t0) * 1000 / n})
+    for m in rerank_ms:
+        t0 = time.perf_counter()
+        idx = LabelCentroidIndex(X_train, y_train, rerank_m=m, n_jobs=n_jobs)
+        build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        pred, _ = idx.predict(X_val)
+        out.append({"mode": f"centroid+rerank{m}" if m else "centroid", "index_rows": len(idx),
+                    "acc": float(np.mean(pred == y_val)), "build_s": build,
+                    "ms_per_query": (time.perf_counter() - t0) * 1000 / n})
+    return out
+
+
+def main(argv=None) -> None:
+    """python -m addresskit.matching.label_index --train data/processed/train_clean_parsed.csv"""
+    import argparse
+
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    p = argparse.ArgumentParser(description="Tam satır vs etiket merkezi KNN: hız / doğruluk")
+    p.add_argument("--train", required=True)
+    p.add_argument("--text-col", default="address_clean")
+    p.add_argument("--label-col", default="label")
+    p.add_argument("--holdout", type=float, default=0.1)
+    p.add_argument("--rerank", default="0,3,10", help="denenecek rerank_m değerleri")
+    p.add_argument("--n-jobs", type=int, default=-1)
+    args = p.parse_args(argv)
+
+    df = pd.read_csv(args.train)
+    va = np.random.default_rng(42).random(len(df)) < args.holdout
+    texts = df[args.text_col].fillna("").astype(str)
+    vec = TfidfVectorizer(analyzer="char", ngram_range=(3, 5), dtype=np.float32)
+    X_tr, X_va = vec.fit_transform(texts[~va]), vec.transform(texts[va])
+    y = df[args.label_col].to_numpy()
+    print(f"[INFO] train={X_tr.shape[0]} holdout={X_va.shape[0]} etiket={len(np.unique(y[~va]))}")
+    rows = compare_index_modes(X_tr, y[~va], X_va, y[va], [int(x) for x in args.rerank.split(",") if x],
+                               n_jobs=args.n_jobs)
+    for r in rows:
+        print(f"  {r['mode']:<18} satır={r['index_rows']:>8}  acc={r['acc']:.4f}  "
+              f"{r['ms_per_query']:.3f} ms/sorgu  kurulum {r['build_s']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
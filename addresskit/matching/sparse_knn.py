@@ -0,0 +1,179 @@
+# addresskit/matching/sparse_knn.py
+"""
+Seyrek TF-IDF matrisleri için parça parça top-k kosinüs arama.
+
+NearestNeighbors(metric="cosine", algorithm="brute") her sorgu parçası için
+sorgu x train boyutunda yoğun mesafe bloğu kurar. Burada satırlar L2
+normalize edilir (kosinüs = iç çarpım); sorgu parçası x train bloğu
+çarpımı yoğunlaştırılır, argpartition ile blok başına k aday seçilip
+sürekli güncellenen top-k ile birleştirilir. Sorgu parçası boyu
+working_mb bütçesinden (thread sayısına bölünerek) seçilir; yoğun blok
+belleği train boyundan ve çekirdek sayısından bağımsız sınırlı kalır.
+Parçalar thread'lerde işlenir (scipy seyrek çarpımı GIL'i bırakır; train
+blokları paylaşılır).
+
+    index = SparseKNN(X_train, labels=train_labels)
+    idx, sims = index.search(X_query, k=5)
+    labels, sims = index.predict(X_query)          # top-1 etiket + benzerlik
+"""
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_CHUNK_ROWS = 1024  # üst sınır; gerçek parça boyu bütçeden
+DEFAULT_TRAIN_BLOCK = 32_768
+DEFAULT_WORKING_MB = 512  # bütün thread'lerin skor blokları için toplam bütçe
+# skor hücresi başına ölçülen tepe bayt (~19.5): scipy seyrek ara çarpımı
+# + yoğun float32 skor, ardından skor + argpartition'ın int64 indeksleri
+_BYTES_PER_CELL = 20
+_BYTES_PER_CELL_ROWS = 26  # row_blocks yolu (blok @ Q.T, F-sıralı yoğunlaştırma), ölçülen ~25
+
+
+def l2_normalize(X):
+    """float32 CSR kopyası, satırlar birim uzunlukta (boş satırlar sıfır kalır)."""
+    import scipy.sparse as sp
+
+    X = sp.csr_matrix(X, dtype=np.float32, copy=True)
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    X.data /= np.repeat(norms, np.diff(X.indptr)).astype(np.float32)
+    return X
+
+
+def _merge_topk(best_i: np.ndarray, best_s: np.ndarray, idx: np.ndarray, sims: np.ndarray, k: int):
+    """İki aday kümesinden satır başına en iyi k (benzerliğe göre azalan)."""
+    cand_idx = np.concatenate([best_i, idx], axis=1)
+    cand_sim = np.concatenate([best_s, sims], axis=1)
+    if cand_sim.shape[1] > k:
+        part = np.argpartition(cand_sim, cand_sim.shape[1] - k, axis=1)[:, -k:]
+        cand_idx = np.take_along_axis(cand_idx, part, axis=1)
+        cand_sim = np.take_along_axis(cand_sim, part, axis=1)
+    order = np.lexsort((cand_idx, -cand_sim), axis=1)  # benzerlik azalan, eşitlikte küçük indeks
+    return np.take_along_axis(cand_idx, order, axis=1), np.take_along_axis(cand_sim, order, axis=1)
+
+
+def train_blocks(X, train_block: int = DEFAULT_TRAIN_BLOCK):
+    """[(başlangıç, X_blok.T CSR)]: sorgu parçası @ blok çarpımı için bir kez hazırlanır."""
+    block = max(1, int(train_block))
+    return [(b, X[b : b + block].T.tocsr()) for b in range(0, X.shape[0], block)]
+
+
+def row_blocks(data: np.ndarray, indices: np.ndarray, indptr: np.ndarray, shape: Tuple[int, int],
+               train_block: int = DEFAULT_TRAIN_BLOCK):
+    """
+    [(başlangıç, satır bloğu)] ham CSR dizilerinin (ör. memmap) kopyasız görünümleri.
+    Diziler doğrudan verilir: csr_matrix.data dilimlerinden kurulan matrisleri scipy kopyalar.
+    """
+    from addresskit.modeling.folds import rows_view
+
+    block = max(1, int(train_block))
+    n, f = shape
+    return [(b, rows_view(data, indices, indptr, b, min(b + block, n), f)) for b in range(0, n, block)]
+
+
+def _search_chunk(Q, blocks, k: int, transposed: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    n = Q.shape[0]
+    best_i = np.empty((n, 0), dtype=np.int64)
+    best_s = np.empty((n, 0), dtype=np.float32)
+    QT = None if transposed else Q.T.tocsr()
+    for b, B in blocks:
+        # satır görünümünde F-sıralı yoğunlaştırma: .T kopyasız C-sıralı (sorgu x blok) olur
+        S = (Q @ B).toarray() if transposed else (B @ QT).toarray(order="F").T
+        kk = min(k, S.shape[1])
+        if kk == 1:
+            idx = S.argmax(axis=1)[:, None]  # eşitlikte en küçük indeks; tam boy indeks dizisi yok
+        elif kk < S.shape[1]:
+            idx = np.argpartition(S, S.shape[1] - kk, axis=1)[:, -kk:]  # -S kopyası yok
+        else:
+            idx = np.broadcast_to(np.arange(S.shape[1]), S.shape).copy()
+        best_i, best_s = _merge_topk(best_i, best_s, idx + b, np.take_along_axis(S, idx, axis=1), k)
+    return best_i, best_s
+
+
+def budget_rows(block_cols: int, workers: int = 1, working_mb: float = DEFAULT_WORKING_MB,
+                cell_bytes: int = _BYTES_PER_CELL) -> int:
+    """Thread başına bütçeye sığan sorgu satırı: working_mb / (thread x blok genişliği x hücre baytı)."""
+    per_thread = working_mb * 2**20 / max(1, workers)
+    return max(1, int(per_thread // (max(1, block_cols) * cell_bytes)))
+
+
+def search_blocks(Q, blocks, n_train: int, k: int = 1, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                  n_jobs: int = 1, transposed: bool = True,
+                  working_mb: float = DEFAULT_WORKING_MB) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hazır train blokları üzerinde arama (bkz. sparse_topk). transposed=False:
+    bloklar row_blocks() satır görünümleridir (blok @ Q.T). Parça boyu
+    min(chunk_rows, budget_rows(...)).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from addresskit.preprocessing.executor import n_workers
+
+    if not n_train:
+        raise ValueError("boş train matrisi")
+    Q = l2_normalize(Q)
+    k = max(1, min(int(k), n_train))
+    workers = n_workers(n_jobs)
+    block_cols = max(B.shape[1] if transposed else B.shape[0] for _, B in blocks)
+    cell = _BYTES_PER_CELL if transposed else _BYTES_PER_CELL_ROWS
+    step = max(1, min(int(chunk_rows), budget_rows(block_cols, workers, working_mb, cell)))
+    idx = np.empty((Q.shape[0], k), dtype=np.int64)
+    sims = np.empty((Q.shape[0], k), dtype=np.float32)
+    starts = range(0, Q.shape[0], step)
+
+    def run(s):
+        idx[s : s + step], sims[s : s + step] = _search_chunk(Q[s : s + step], blocks, k, transposed)
+
+    workers = min(workers, len(starts))
+    if workers <= 1:
+        for s in starts:
+            run(s)
+    else:
+        with ThreadPoolExecutor(workers) as pool:
+            list(pool.map(run, starts))
+    return idx, sims
+
+
+def sparse_topk(Q, X, k: int = 1, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                train_block: int = DEFAULT_TRAIN_BLOCK, n_jobs: int = 1,
+                working_mb: float = DEFAULT_WORKING_MB) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Q'nun her satırı için X'teki en benzer k satır: (indeks (n,k) int64,
+    kosinüs benzerliği (n,k) float32), benzerliğe göre azalan.
+    """
+    X = l2_normalize(X)
+    return search_blocks(Q, train_blocks(X, train_block), X.shape[0], k, chunk_rows, n_jobs,
+                         working_mb=working_mb)
+
+
+class SparseKNN:
+    """L2 normalize train matrisi + (isteğe bağlı) etiket dizisi üzerinde top-k arama."""
+
+    def __init__(self, X, labels: Optional[Sequence[Any]] = None, n_jobs: int = 1,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS, train_block: int = DEFAULT_TRAIN_BLOCK,
+                 working_mb: float = DEFAULT_WORKING_MB):
+        X = l2_normalize(X)
+        self.shape = X.shape
+        self.blocks = train_blocks(X, train_block)  # yalnız bloklar tutulur
+        self.labels = None if labels is None else np.asarray(labels)
+        self.n_jobs = n_jobs
+        self.chunk_rows = chunk_rows
+        self.working_mb = working_mb
+
+    def search(self, Q, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        return search_blocks(Q, self.blocks, self.shape[0], k, self.chunk_rows, self.n_jobs,
+                             working_mb=self.working_mb)
+
+    def predict(self, Q, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """(etiketler, benzerlikler); k=1 ise 1-boyutlu, değilse (n, k)."""
+        if self.labels is None:
+            raise ValueError("SparseKNN etiketsiz kuruldu")
+        idx, sims = self.search(Q, k)
+        if k == 1:
+            return self.labels[idx[:, 0]], sims[:, 0]
+        return self.labels[idx], sims
+
+    def __repr__(self) -> str:
+        return f"SparseKNN(n={self.shape[0]}, n_features={self.shape[1]}, n_jobs={self.n_jobs})"
@@ -1,34 +1,78 @@
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.neighbors import NearestNeighbors
+def fit_knn(train_texts, ngram_range=(3, 6), max_features=1500000, n_jobs=-1,
+            mode="rows", train_labels=None, rerank_m=0, index_dir=None):
+    """
+    mode="rows": her train satırı indekslenir (SparseKNN).
+    mode="centroid": etiket başına tek merkez (LabelCentroidIndex, train_labels gerekli);
+    rerank_m > 0 ise en iyi m etiketin üye satırlarıyla yeniden skorlanır.
+    index_dir verilirse (rows modu) indeks diske yazılır; sonraki çalıştırmalar
+    predict_knn_index ile yeniden fit etmeden kullanır.
+    """
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
-def fit_knn(train_texts, ngram_range=(3, 6), max_features=1500000):
-    vectorizer = TfidfVectorizer(analyzer="char", ngram_range=ngram_range, max_features=max_features)
+    from .label_index import LabelCentroidIndex
+    from .sparse_knn import SparseKNN
+
+    vectorizer = TfidfVectorizer(analyzer="char", ngram_range=ngram_range, max_features=max_features,
+                                 dtype=np.float32)
     X_train = vectorizer.fit_transform(train_texts)
-    knn = NearestNeighbors(metric="cosine", algorithm="brute")
-    knn.fit(X_train)
+    if mode == "centroid":
+        if train_labels is None:
+            raise ValueError("mode='centroid' için train_labels gerekli")
+        knn = LabelCentroidIndex(X_train, train_labels, rerank_m=rerank_m, n_jobs=n_jobs)
+    else:
+        knn = SparseKNN(X_train, n_jobs=n_jobs)  # parça parça seyrek top-k (yoğun mesafe bloğu yok)
+        if index_dir:
+            if train_labels is None:
+                raise ValueError("index_dir için train_labels gerekli")
+            from .knn_index import save_knn_index
+
+            save_knn_index(index_dir, vectorizer, X_train, train_labels, texts=list(train_texts))
     return vectorizer, knn, X_train
 
 def predict_knn(test_texts, vectorizer, knn, X_train, train_labels, top_k=1):
+    import numpy as np
+
+    from .label_index import LabelCentroidIndex
+
     X_test = vectorizer.transform(test_texts)
-    distances, indices = knn.kneighbors(X_test, n_neighbors=top_k)
-    preds = []
-    confs = []
-    for dist, idx in zip(distances, indices):
-        preds.append(train_labels.iloc[idx[0]])
-        confs.append(1 - dist[0])  # cosine similarity
+    if isinstance(knn, LabelCentroidIndex):  # etiketler indeksin içinde
+        preds, sims = knn.predict(X_test)
+        return preds.tolist(), sims.tolist()
+    idx, sims = knn.search(X_test, k=top_k)
+    preds = np.asarray(train_labels)[idx[:, 0]].tolist()
+    confs = sims[:, 0].tolist()  # cosine similarity
     return preds, confs
 
-def run_match(train_path, test_path, out_path):
+def predict_knn_index(test_texts, index_dir, top_k=1, n_jobs=-1):
+    """Kalıcı indeksten tahmin; indeks süreç başına bir kez açılır, diziler memmap."""
+    from .knn_index import open_knn_index
+
+    labels, sims = open_knn_index(index_dir, n_jobs=n_jobs).predict(list(test_texts), k=top_k)
+    if top_k != 1:
+        labels, sims = labels[:, 0], sims[:, 0]
+    return labels.tolist(), sims.tolist()
+
+def run_match(train_path, test_path, out_path, mode="rows", rerank_m=0, index_dir=None):
+    import pandas as pd
+
+    from .knn_index import has_knn_index
+
     # Verileri oku
-    train_df = pd.read_csv(train_path)
     test_df = pd.read_csv(test_path)
 
-    # Fit KNN
-    vectorizer, knn, X_train = fit_knn(train_df["address_norm"])
+    if mode == "rows" and has_knn_index(index_dir):
+        print(f"[CACHE] KNN indeksi: {index_dir}")
+        preds, confs = predict_knn_index(test_df["address_norm"], index_dir)
+    else:
+        train_df = pd.read_csv(train_path)
+
+        # Fit KNN
+        vectorizer, knn, X_train = fit_knn(train_df["address_norm"], mode=mode, train_labels=train_df["label"],
+                                           rerank_m=rerank_m, index_dir=index_dir if mode == "rows" else None)
 
-    # Predict
-    preds, confs = predict_knn(test_df["address_norm"], vectorizer, knn, X_train, train_df["label"])
+        # Predict
+        preds, confs = predict_knn(test_df["address_norm"], vectorizer, knn, X_train, train_df["label"])
 
     # Sonuçları kaydet
     out_df = pd.DataFrame({
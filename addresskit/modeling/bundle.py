@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Kompakt, memory-map edilebilir çıkarım paketi (TF-IDF/hashing + SGD).
+
+joblib pickle'ları yerine düz .npy dosyaları:
+
+    <dir>/meta.json              kanallar (tür, parametreler, kolon aralığı), sınıf sayısı
+    <dir>/<kanal>.vocab.npy      sıralı terim dizisi (<U), tfidf kanalları
+    <dir>/<kanal>.cols.npy       terim -> kolon (int32)
+    <dir>/<kanal>.idf.npy        float32
+    <dir>/coef.npy, intercept.npy  float32 (sınıf x özellik)
+    <dir>/labels.npy             sınıf etiketleri
+
+Yükleme np.load(mmap_mode="r") ile yapılır: Python dict sözlüğü kurulmaz,
+sayfalar süreçler arasında işletim sistemi cache'inden paylaşılır.
+Terim araması np.searchsorted ile; analizörler sklearn'ün char / word
+n-gram analizörleriyle birebir aynıdır (sklearn yalnız hashing kanalı
+varsa import edilir).
+
+    export_bundle(dir, vect_bundle, clf, labels)
+    b = InferenceBundle.load(dir)
+    top = b.predict_topk(base_texts, side_texts, k=3)
+"""
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .topk import TopK, ovr_norm_rows, topk_from_scores, topk_result
+
+BUNDLE_VERSION = 1
+_WHITE_SPACES = re.compile(r"\s\s+")
+_TFIDF_PARAMS = ("analyzer", "ngram_range", "lowercase", "token_pattern", "sublinear_tf", "norm")
+
+
+# ---------------- analizörler (sklearn _VectorizerMixin ile aynı) ----------------
+def char_ngrams(text: str, ngram_range) -> List[str]:
+    text = _WHITE_SPACES.sub(" ", text)
+    min_n, max_n = ngram_range
+    n_len = len(text)
+    out: List[str] = []
+    for n in range(min_n, min(max_n + 1, n_len + 1)):
+        out.extend(text[i : i + n] for i in range(n_len - n + 1))
+    return out
+
+
+def char_wb_ngrams(text: str, ngram_range) -> List[str]:
+    """Kelime sınırlı char n-gram (analyzer="char_wb")."""
+    min_n, max_n = ngram_range
+    out: List[str] = []
+    for w in _WHITE_SPACES.sub(" ", text).split():
+        w = " " + w + " "
+        w_len = len(w)
+        for n in range(min_n, max_n + 1):
+            if n >= w_len:  # kısa kelime yalnız bir kez sayılır
+                out.append(w)
+                break
+            out.extend(w[i : i + n] for i in range(w_len - n + 1))
+    return out
+
+
+def word_ngrams(tokens: List[str], ngram_range) -> List[str]:
+    min_n, max_n = ngram_range
+    if max_n == 1:
+        return tokens
+    out = list(tokens) if min_n == 1 else []
+    for n in range(max(min_n, 2), min(max_n + 1, len(tokens) + 1)):
+        out.extend(" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+    return out
+
+
+class _VocabChannel:
+    """Sıralı terim dizisi üzerinde TF-IDF dönüşümü."""
+
+    def __init__(self, params: Dict[str, Any], vocab: np.ndarray, cols: np.ndarray, idf: np.ndarray):
+        self.params = params
+        self.vocab, self.cols, self.idf = vocab, cols, idf
+        self.n_features = len(idf)
+        self._token = re.compile(params.get("token_pattern") or r"(?u)\b\w\w+\b")
+
+    def analyze(self, doc: str) -> List[str]:
+        if self.params.get("lowercase"):
+            doc = doc.lower()
+        if self.params["analyzer"] == "char":
+            return char_ngrams(doc, self.params["ngram_range"])
+        if self.params["analyzer"] == "char_wb":
+            return char_wb_ngrams(doc, self.params["ngram_range"])
+        return word_ngrams(self._token.findall(doc), self.params["ngram_range"])
+
+    def transform(self, texts: Sequence[str]):
+        import scipy.sparse as sp
+
+        grams, rows = [], []
+        for i, doc in enumerate(texts):
+            g = self.analyze(doc)
+            grams.extend(g)
+            rows.extend([i] * len(g))
+        n = len(texts)
+        if not grams or not len(self.vocab):
+            return sp.csr_matrix((n, self.n_features), dtype=np.float32)
+        q = np.array(grams)
+        pos = np.searchsorted(self.vocab, q)
+        pos[pos >= len(self.vocab)] = 0
+        hit = self.vocab[pos] == q
+        X = sp.csr_matrix(
+            (np.ones(int(hit.sum()), dtype=np.float32), (np.asarray(rows)[hit], self.cols[pos[hit]])),
+            shape=(n, self.n_features),
+        )
+        X.sum_duplicates()
+        if self.params.get("sublinear_tf"):
+            np.log(X.data, out=X.data)
+            X.data += 1
+        X.data *= self.idf[X.indices]
+        if self.params.get("norm") == "l2":
+            norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+            norms[norms == 0] = 1.0
+            X.data /= np.repeat(norms, np.diff(X.indptr)).astype(np.float32)
+        return X
+
+
+class _HashedChannel:
+    def __init__(self, params: Dict[str, Any], idf: np.ndarray):
+        from .hashing import HashedChannel
+
+        p = dict(params)
+        p["ngram_range"] = tuple(p["ngram_range"])
+        self.channel = HashedChannel(**{**p, "dtype": np.float32})
+        self.channel.idf_ = np.asarray(idf)
+        self.n_features = self.channel.n_features
+
+    def transform(self, texts: Sequence[str]):
+        return self.channel._transform_chunk(list(texts))
+
+
+# ---------------- dışa aktarma ----------------
+def save_vocab_channel(out: Path, name: str, vec: Any) -> Dict[str, Any]:
+    """TfidfVectorizer'ı <name>.vocab/.cols/.idf.npy olarak yazar; meta parametrelerini döndürür."""
+    if getattr(vec, "strip_accents", None) or getattr(vec, "stop_words", None) \
+            or vec.analyzer not in ("char", "char_wb", "word") or getattr(vec, "preprocessor", None) \
+            or getattr(vec, "tokenizer", None):
+        raise ValueError(f"{name}: desteklenmeyen vektörizer ayarı (strip_accents/stop_words/...)")
+    terms = np.array(sorted(vec.vocabulary_))
+    cols = np.array([vec.vocabulary_[t] for t in terms.tolist()], dtype=np.int32)
+    np.save(out / f"{name}.vocab.npy", terms)
+    np.save(out / f"{name}.cols.npy", cols)
+    np.save(out / f"{name}.idf.npy", np.asarray(vec.idf_, dtype=np.float32))
+    params = {k: getattr(vec, k) for k in _TFIDF_PARAMS}
+    params["ngram_range"] = list(params["ngram_range"])
+    return params
+
+
+def load_vocab_channel(d: Path, name: str, params: Dict[str, Any], mmap: bool = True) -> "_VocabChannel":
+    mode = "r" if mmap else None
+    return _VocabChannel(params, np.load(d / f"{name}.vocab.npy", mmap_mode=mode),
+                         np.load(d / f"{name}.cols.npy", mmap_mode=mode),
+                         np.load(d / f"{name}.idf.npy", mmap_mode=mode))
+
+
+def _channel_kind(vec: Any) -> str:
+    return "tfidf" if hasattr(vec, "vocabulary_") else "hashed"
+
+
+def export_bundle(out_dir, vect_bundle: Dict[str, Any], clf: Any, labels: Sequence[Any]) -> Path:
+    """
+    Fit edilmiş vektörizerleri (TfidfVectorizer / HashedChannel) ve lineer
+    modeli .npy dosyalarına yazar. labels: clf satırlarının (coef_) etiketleri.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    channels, start = [], 0
+    for name, vec in vect_bundle.items():
+        kind = _channel_kind(vec)
+        if kind == "tfidf":
+            params = save_vocab_channel(out, name, vec)
+        else:
+            params = vec.params()
+            np.save(out / f"{name}.idf.npy", np.asarray(vec.idf_, dtype=np.float32))
+        n_features = len(vec.idf_)
+        channels.append({"name": name, "kind": kind, "params": params, "start": start, "n_features": n_features})
+        start += n_features
+
+    coef = np.asarray(clf.coef_, dtype=np.float32)
+    intercept = np.asarray(clf.intercept_, dtype=np.float32)
+    if coef.shape[0] == 1 and len(labels) == 2:  # ikili: tek skor -> (negatif, pozitif)
+        coef, intercept = np.vstack([-coef, coef]), np.concatenate([-intercept, intercept])
+    if coef.shape[1] != start:
+        raise ValueError(f"coef_ kolon sayısı {coef.shape[1]} != özellik sayısı {start}")
+    np.save(out / "coef.npy", np.ascontiguousarray(coef))
+    np.save(out / "intercept.npy", intercept)
+    labels = np.asarray(labels)
+    if labels.dtype == object:
+        labels = labels.astype(str)
+    np.save(out / "labels.npy", labels)
+    meta = {"version": BUNDLE_VERSION, "channels": channels, "n_features": start, "n_classes": len(labels)}
+    with open(out / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return out
+
+
+# ---------------- yükleme / tahmin ----------------
+class InferenceBundle:
+    def __init__(self, meta: dict, channels: list, coef: np.ndarray, intercept: np.ndarray, labels: np.ndarray):
+        self.meta = meta
+        self.channels = channels  # [(ad, kanal)], meta sırasıyla
+        self.coef = coef
+        self.intercept = intercept
+        self.labels = labels
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> "InferenceBundle":
+        d = Path(path)
+        with open(d / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != BUNDLE_VERSION:
+            raise ValueError(f"bundle sürümü {meta.get('version')} != {BUNDLE_VERSION}")
+        mode = "r" if mmap else None
+        channels = []
+        for ch in meta["channels"]:
+            if ch["kind"] == "tfidf":
+                obj = load_vocab_channel(d, ch["name"], ch["params"], mmap)
+            else:
+                obj = _HashedChannel(ch["params"], np.load(d / f"{ch['name']}.idf.npy", mmap_mode=mode))
+            channels.append((ch["name"], obj))
+        return cls(meta, channels,
+                   np.load(d / "coef.npy", mmap_mode=mode),
+                   np.load(d / "intercept.npy", mmap_mode=mode),
+                   np.load(d / "labels.npy", mmap_mode=mode))
+
+    def transform(self, base: Sequence[str], side: Sequence[str]):
+        """Kanal adı _base ile bitenler base, _side ile bitenler side metnini kullanır."""
+        import scipy.sparse as sp
+
+        mats = [ch.transform(side if name.endswith("_side") else base) for name, ch in self.channels]
+        return sp.hstack(mats, format="csr", dtype=np.float32)
+
+    def decision_function(self, X) -> np.ndarray:
+        return np.asarray(X @ self.coef.T) + self.intercept
+
+    def predict_topk(self, base: Sequence[str], side: Sequence[str], k: int = 1, chunk_rows: int = 10_000,
+                     full_proba: bool = False) -> TopK:
+        """full_proba=True: proba OvR predict_proba (sigmoid / bütün sınıfların toplamı; bkz. topk.py)."""
+        n = len(base)
+        k = min(k, len(self.labels))
+        labels = np.empty((n, k), dtype=self.labels.dtype)
+        scores = np.empty((n, k), dtype=np.float32)
+        norm = np.empty(n, dtype=np.float64) if full_proba else None
+        for s in range(0, n, max(1, int(chunk_rows))):
+            X = self.transform(list(base[s : s + chunk_rows]), list(side[s : s + chunk_rows]))
+            S = self.decision_function(X)
+            idx, top = topk_from_scores(S, k)
+            labels[s : s + len(idx)] = self.labels[idx]
+            scores[s : s + len(idx)] = top
+            if norm is not None:
+                norm[s : s + len(idx)] = ovr_norm_rows(S)
+        return topk_result(labels, scores, norm)
+
+    def __repr__(self) -> str:
+        return (f"InferenceBundle(channels={[n for n, _ in self.channels]}, "
+                f"n_features={self.meta['n_features']}, n_classes={self.meta['n_classes']})")
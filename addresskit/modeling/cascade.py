@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+Kademeli (cascade) çıkarım: ucuz model önce, pahalı eşleyici yalnız emin
+olunamayan satırlara.
+
+  1) bundle : SGD çıkarım paketi (bkz. bundle.py), top-1 OvR predict_proba /
+              top1-top2 karar skoru farkı
+  2) knn    : kalıcı TF-IDF KNN indeksi (bkz. matching/knn_index.py), kosinüs / marj
+  3) rerank : KNN komşuları rapidfuzz + digits_score (scoring/confidence.py) ile
+              yeniden sıralanır; son kademe kalan her satırı kabul eder
+
+Bir satır, kademenin güveni ya da marjı eşiği geçerse o kademede kabul
+edilir; kalanlar sonraki kademeye gider. Eşikler etiketli bir doğrulama
+kümesinde geriye doğru kalibre edilir: her kademe için, kabul edilen
+satırlarda bu kademenin doğru sayısının sonraki kademelerin doğru sayısından
+az olmadığı en geniş kapsam seçilir (toplam doğruluk düşmez).
+
+    python -m addresskit.modeling.cascade --calibrate data/processed/valid.csv \\
+        --input data/processed/test_clean_parsed.csv --output submissions/submission_cascade.csv
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+STAGES = ("bundle", "knn", "rerank")
+DEFAULT_BUNDLE = os.path.join("models", "baseline", "bundle")
+DEFAULT_INDEX = os.path.join("models", "knn")
+DEFAULT_GATES = os.path.join("models", "cascade_gates.json")
+DEFAULT_INPUT = os.path.join("data", "processed", "test_clean_parsed.csv")
+DEFAULT_OUTPUT = os.path.join("submissions", "submission_cascade.csv")
+
+
+class StageOutput(NamedTuple):
+    labels: np.ndarray  # (n,) top-1 etiket
+    conf: np.ndarray    # (n,) güven (olasılık / kosinüs / birleşik skor 0-1)
+    margin: np.ndarray  # (n,) top-1 ile en iyi farklı etiket arasındaki fark
+
+
+class Gate(NamedTuple):
+    conf: Optional[float] = None    # None: bu sinyal kapalı
+    margin: Optional[float] = None
+
+    def accept(self, out: StageOutput) -> np.ndarray:
+        ok = np.zeros(len(out.labels), dtype=bool)
+        if self.conf is not None:
+            ok |= out.conf >= self.conf
+        if self.margin is not None:
+            ok |= out.margin >= self.margin
+        return ok
+
+
+# ---------------- kademeler ----------------
+def bundle_stage(bundle: Any, base: Sequence[str], side: Sequence[str], chunk_rows: int = 10_000) -> StageOutput:
+    """
+    Güven: bütün sınıflar üzerinden OvR predict_proba'nın top-1 değeri (yalnız 2
+    skor üzerindeki softmax marjla aynı sinyal olurdu); kalibre değil, eşik
+    doğrulama kümesinden gelir. Marj: top1-top2 karar skoru (OvR logit) farkı.
+    """
+    top = bundle.predict_topk(base, side, k=2, chunk_rows=chunk_rows, full_proba=True)
+    margin = top.scores[:, 0] - top.scores[:, 1] if top.scores.shape[1] > 1 else np.zeros(len(top.scores))
+    return StageOutput(top.labels[:, 0], top.proba[:, 0], margin)
+
+
+def _label_margin(labels: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """Azalan sıralı (n, k) komşu skorlarında top-1 ile ilk farklı etiketli komşunun farkı (yoksa top-1)."""
+    other = np.where(labels != labels[:, :1], scores, -np.inf).max(axis=1) if labels.shape[1] > 1 \
+        else np.full(len(labels), -np.inf)
+    return scores[:, 0] - np.where(np.isfinite(other), other, 0.0)
+
+
+def knn_stage(index: Any, texts: Sequence[str], k: int = 10) -> Tuple[StageOutput, np.ndarray, np.ndarray]:
+    """(çıktı, komşu satırları (n,k), kosinüs (n,k)); komşular rerank kademesinde tekrar kullanılır."""
+    idx, sims = index.search(texts, k=k)
+    labels = np.asarray(index.labels[idx])
+    return StageOutput(labels[:, 0], sims[:, 0], _label_margin(labels, sims)), idx, sims
+
+
+def rerank_stage(index: Any, texts: Sequence[str], idx: np.ndarray, scorer=None,
+                 w_text: float = 0.8, w_digits: float = 0.2) -> StageOutput:
+    """Her satırın KNN komşuları metin benzerliği + rakam uyumu ile yeniden skorlanır (skor 0-1)."""
+    from rapidfuzz import fuzz
+
+    from addresskit.scoring.confidence import combine_scores, digits_score
+
+    scorer = scorer or fuzz.token_set_ratio
+    n, k = idx.shape
+    labels = np.asarray(index.labels[idx])
+    neigh = index.texts(idx)
+    S = np.empty((n, k), dtype=np.float32)
+    for i, q in enumerate(texts):
+        q = "" if q is None else str(q)
+        for j in range(k):
+            r = neigh[i * k + j]
+            S[i, j] = combine_scores(float(scorer(q, r)), digits_score(q, r), w_text=w_text, w_digits=w_digits)
+    order = np.argsort(-S, axis=1, kind="stable")
+    S = np.take_along_axis(S, order, axis=1) / 100.0
+    labels = np.take_along_axis(labels, order, axis=1)
+    return StageOutput(labels[:, 0], S[:, 0], _label_margin(labels, S))
+
+
+# ---------------- kalibrasyon ----------------
+def _threshold(signal: np.ndarray, correct: np.ndarray, fallback: np.ndarray, tolerance: int = 0) -> Optional[float]:
+    """
+    Sinyale göre azalan sırada kabul edilen en geniş önek: kabul edilenlerde
+    (bu kademe doğru - sonraki kademeler doğru) toplamı >= -tolerance.
+    Eşit sinyalli satırlar birlikte kabul edildiği için yalnız grup sonları aday.
+    """
+    if not len(signal):
+        return None
+    order = np.argsort(-signal, kind="stable")
+    s = signal[order]
+    gain = np.cumsum(correct[order].astype(np.int64) - fallback[order].astype(np.int64))
+    ends = np.flatnonzero(np.r_[s[1:] != s[:-1], True])  # eşit sinyal gruplarının son elemanı
+    ok = ends[gain[ends] >= -tolerance]
+    return float(s[ok[-1]]) if len(ok) else None
+
+
+def calibrate_gate(out: StageOutput, y: np.ndarray, fallback_correct: np.ndarray, tolerance: int = 0) -> Gate:
+    """Önce güven, sonra kalan satırlarda marj eşiği; ikisinin birleşimi toplam doğruluğu düşürmez."""
+    correct = out.labels == y
+    t_conf = _threshold(out.conf, correct, fallback_correct, tolerance)
+    rest = ~Gate(conf=t_conf).accept(out)
+    t_margin = _threshold(out.margin[rest], correct[rest], fallback_correct[rest], tolerance)
+    return Gate(t_conf, t_margin)
+
+
+class Cascade:
+    def __init__(self, bundle: Any = None, index: Any = None, gates: Optional[Dict[str, Gate]] = None,
+                 k: int = 10, rerank: bool = True, chunk_rows: int = 10_000):
+        if bundle is None and index is None:
+            raise ValueError("en az bir kademe (bundle ya da index) gerekli")
+        self.bundle = bundle
+        self.index = index
+        self.gates = dict(gates or {})
+        self.k = k
+        self.rerank = rerank and index is not None
+        self.chunk_rows = chunk_rows
+
+    @property
+    def stages(self) -> List[str]:
+        return [s for s, on in zip(STAGES, (self.bundle is not None, self.index is not None, self.rerank)) if on]
+
+    def _outputs(self, name: str, rows: np.ndarray, base, side, texts, knn_cache: dict) -> StageOutput:
+        if name == "bundle":
+            return bundle_stage(self.bundle, [base[i] for i in rows], [side[i] for i in rows], self.chunk_rows)
+        if name == "knn":
+            out, idx, _ = knn_stage(self.index, [texts[i] for i in rows], self.k)
+            knn_cache.update(rows=rows, idx=idx)
+            return out
+        # rerank: knn kademesinin komşuları (bu satırlar için) yeniden kullanılır
+        if "idx" in knn_cache:
+            pos = np.searchsorted(knn_cache["rows"], rows)
+            idx = knn_cache["idx"][pos]
+        else:
+            _, idx, _ = knn_stage(self.index, [texts[i] for i in rows], self.k)
+        return rerank_stage(self.index, [texts[i] for i in rows], idx)
+
+    def run(self, base: Sequence[str], side: Sequence[str], texts: Sequence[str],
+            y: Optional[Sequence[Any]] = None) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """
+        (tahminler, satırın kabul edildiği kademe, rapor). Rapor kademe başına
+        giren/kabul edilen satır, kapsam, süre (ve y verilirse kabul edilenlerde doğruluk).
+        """
+        n = len(texts)
+        pred = np.empty(n, dtype=object)
+        stage_of = np.full(n, -1, dtype=np.int8)
+        rows = np.arange(n)
+        report, knn_cache = [], {}
+        names = self.stages
+        y = None if y is None else np.asarray(y)
+        for si, name in enumerate(names):
+            if not len(rows):
+                break
+            t0 = time.perf_counter()
+            out = self._outputs(name, rows, base, side, texts, knn_cache)
+            last = si == len(names) - 1
+            ok = np.ones(len(rows), dtype=bool) if last else self.gates.get(name, Gate()).accept(out)
+            sec = time.perf_counter() - t0
+            pred[rows[ok]] = out.labels[ok]
+            stage_of[rows[ok]] = STAGES.index(name)
+            r = {"stage": name, "rows_in": len(rows), "accepted": int(ok.sum()),
+                 "coverage": float(ok.sum()) / max(n, 1), "sec": sec,
+                 "ms_per_row": sec * 1000 / max(len(rows), 1)}
+            if y is not None:
+                r["acc"] = float(np.mean(out.labels[ok] == y[rows[ok]])) if ok.any() else float("nan")
+            report.append(r)
+            rows = rows[~ok]
+        return pred, stage_of, report
+
+    def calibrate(self, base: Sequence[str], side: Sequence[str], texts: Sequence[str], y: Sequence[Any],
+                  tolerance: int = 0) -> Dict[str, Gate]:
+        """Bütün kademeler bütün doğrulama satırlarında çalışır; eşikler sondan başa seçilir."""
+        y = np.asarray(y)
+        rows = np.arange(len(texts))
+        knn_cache: dict = {}
+        outs = {name: self._outputs(name, rows, base, side, texts, knn_cache) for name in self.stages}
+        names = self.stages
+        downstream = outs[names[-1]].labels == y  # son kademe her şeyi kabul eder
+        gates = {}
+        for name in reversed(names[:-1]):
+            gate = calibrate_gate(outs[name], y, downstream, tolerance)
+            gates[name] = gate
+            downstream = np.where(gate.accept(outs[name]), outs[name].labels == y, downstream)
+        self.gates = gates
+        return gates
+
+
+def save_gates(path, gates: Dict[str, Gate]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({k: g._asdict() for k, g in gates.items()}, f, indent=2)
+
+
+def load_gates(path) -> Dict[str, Gate]:
+    with open(path, "r", encoding="utf-8") as f:
+        return {k: Gate(**v) for k, v in json.load(f).items()}
+
+
+def format_report(report: List[Dict[str, Any]]) -> List[str]:
+    lines = []
+    for r in report:
+        acc = f"  acc={r['acc']:.4f}" if "acc" in r else ""
+        lines.append(f"  {r['stage']:<7} giren={r['rows_in']:>8}  kabul={r['accepted']:>8}  "
+                     f"kapsam={r['coverage']:.3f}  {r['sec']:.2f}s ({r['ms_per_row']:.3f} ms/satır){acc}")
+    return lines
+
+
+# ---------------- CLI ----------------
+def _parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Kademeli çıkarım: bundle -> TF-IDF KNN -> rapidfuzz rerank")
+    p.add_argument("--bundle", default=DEFAULT_BUNDLE, help="boş = bundle kademesi kapalı")
+    p.add_argument("--index", default=DEFAULT_INDEX, help="kalıcı KNN indeksi; yoksa --train ile kurulur")
+    p.add_argument("--train", default=None, help="indeks yoksa kurmak için etiketli train CSV")
+    p.add_argument("--text-col", default="address_clean", help="KNN / rerank metin kolonu")
+    p.add_argument("--label-col", default="label")
+    p.add_argument("--input", default=DEFAULT_INPUT)
+    p.add_argument("--output", default=DEFAULT_OUTPUT)
+    p.add_argument("--gates", default=DEFAULT_GATES, help="kalibre eşik dosyası (json)")
+    p.add_argument("--calibrate", default=None, help="etiketli doğrulama CSV; eşikler yeniden seçilip --gates'e yazılır")
+    p.add_argument("--calibrate-rows", type=int, default=20_000)
+    p.add_argument("--tolerance", type=int, default=0, help="kalibrasyonda izin verilen doğru sayısı kaybı")
+    p.add_argument("--k", type=int, default=10, help="KNN komşu sayısı (rerank adayları)")
+    p.add_argument("--no-rerank", action="store_true")
+    p.add_argument("--n-jobs", type=int, default=-1)
+    return p.parse_args(argv)
+
+
+def _fields(df, text_col: str):
+    from .fields import build_text_fields
+
+    df = df.reset_index(drop=True)
+    base, side = build_text_fields(df)
+    texts = df[text_col].fillna("").astype(str) if text_col in df.columns else base
+    return base.tolist(), side.tolist(), texts.tolist()
+
+
+def main(argv=None) -> None:
+    args = _parse_args(argv)
+    import pandas as pd
+
+    from addresskit.matching.knn_index import has_knn_index, open_knn_index, save_knn_index
+
+    from .bundle import InferenceBundle
+
+    bundle = InferenceBundle.load(args.bundle) if args.bundle and os.path.exists(args.bundle) else None
+    if not has_knn_index(args.index) and args.train:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        tr = pd.read_csv(args.train)
+        texts = _fields(tr, args.text_col)[2]
+        vec = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), dtype=np.float32)
+        save_knn_index(args.index, vec, vec.fit_transform(texts), tr[args.label_col].to_numpy(), texts=texts)
+        print(f"[OK] KNN indeksi yazıldı -> {args.index}")
+    index = open_knn_index(args.index, n_jobs=args.n_jobs) if has_knn_index(args.index) else None
+    print(f"[INFO] kademeler: bundle={'var' if bundle is not None else 'yok'} "
+          f"index={index if index is not None else 'yok'}")
+    gates = load_gates(args.gates) if os.path.exists(args.gates) else {}
+    cascade = Cascade(bundle, index, gates, k=args.k, rerank=not args.no_rerank)
+
+    if args.calibrate:
+        va = pd.read_csv(args.calibrate)
+        if len(va) > args.calibrate_rows:
+            va = va.sample(args.calibrate_rows, random_state=42)
+        t0 = time.perf_counter()
+        gates = cascade.calibrate(*_fields(va, args.text_col), va[args.label_col].to_numpy(), args.tolerance)
+        save_gates(args.gates, gates)
+        print(f"[OK] eşikler ({len(va)} satır, {time.perf_counter() - t0:.1f}s) -> {args.gates}: "
+              + ", ".join(f"{k}: conf>={g.conf} marj>={g.margin}" for k, g in gates.items()))
+        _, _, report = cascade.run(*_fields(va, args.text_col), y=va[args.label_col].to_numpy())
+        print("[INFO] doğrulama kümesinde kademeler:")
+        print("\n".join(format_report(report)))
+    elif not gates:
+        print(f"[WARN] {args.gates} yok: yalnız son kademe kullanılacak (önce --calibrate)")
+
+    df = pd.read_csv(args.input)
+    pred, stage_of, report = cascade.run(*_fields(df, args.text_col))
+    print(f"[INFO] {len(df)} satır:")
+    print("\n".join(format_report(report)))
+    out = pd.DataFrame({"id": df["id"] if "id" in df.columns else np.arange(len(df)), "label": pred,
+                        "stage": np.asarray(STAGES, dtype=object)[stage_of]})
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    out.to_csv(args.output, index=False)
+    print(f"[OK] {args.output} yazıldı (rows={len(out)})")
+
+
+if __name__ == "__main__":
+    main()
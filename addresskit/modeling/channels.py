@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Çok kanallı özellik çıkarımı: her kanal (vektörizer + train/test metni)
+ayrı bir süreçte fit + transform edilir, sonuçlar kanal sırasıyla yatay
+birleştirilir.
+
+    specs = [("char_vect_base", TfidfVectorizer(...), tr_base, te_base), ...]
+    X_tr, X_te, bundle = fit_channels(specs, n_jobs=-1)
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+from addresskit.preprocessing.executor import ParseExecutor, n_workers
+
+ChannelSpec = Tuple[str, Any, Sequence[str], Sequence[str]]
+
+
+def _fit_one(specs: List[ChannelSpec]) -> list:
+    out = []
+    for name, vec, tr, te in specs:
+        X_tr = vec.fit_transform(tr)
+        out.append((name, vec, X_tr, vec.transform(te)))
+    return out
+
+
+def fit_channels(specs: Sequence[ChannelSpec], n_jobs: int = -1):
+    """
+    Kanalları paralel fit eder; (X_tr, X_te, {ad: fit edilmiş vektörizer}) döner.
+    İşçi sayısı kanal sayısıyla sınırlıdır (her kanal tek süreçte).
+    """
+    import scipy.sparse as sp
+
+    specs = [(name, vec, list(tr), list(te)) for name, vec, tr, te in specs]
+    with ParseExecutor(min(len(specs), n_workers(n_jobs)), label="features") as ex:
+        print(f"[INFO] {len(specs)} kanal fit ediliyor (workers={ex.workers}): {[s[0] for s in specs]}")
+        fitted = [r for res in ex.map_chunks(_fit_one, [[s] for s in specs]) for r in res]
+    X_tr = sp.hstack([r[2] for r in fitted]).tocsr()
+    X_te = sp.hstack([r[3] for r in fitted]).tocsr()
+    bundle: Dict[str, Any] = {name: vec for name, vec, _, _ in fitted}
+    return X_tr, X_te, bundle
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Model girdisi metin alanları (eğitim ve çıkarımda aynı):
+  base: address_clean
+  side: ayrıştırılmış parçaların boşlukla birleştirilmiş hali
+"""
+from __future__ import annotations
+
+SIDE_COLUMNS = ("mahalle", "cadde", "sokak", "no", "daire", "kat", "bina_adi", "mevkii", "il", "ilce")
+
+
+def safe_col(df, c):
+    import pandas as pd
+
+    return df[c].astype(str) if c in df.columns else pd.Series([""]*len(df))
+
+
+def build_text_fields(df):
+    """(base, side) metin serileri; df'in indeksi 0..n-1 olmalı."""
+    import pandas as pd
+
+    base = safe_col(df, "address_clean")
+    side_text = pd.Series([""]*len(df))
+    for c in SIDE_COLUMNS:
+        if c in df.columns:
+            side_text = side_text.str.cat(df[c].astype(str), sep=" ")
+    return base.fillna(""), side_text.fillna("")
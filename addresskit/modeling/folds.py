@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Paralel CV için memory-map edilmiş, kopyasız fold görünümleri.
+
+X_tr bir kez diske şu blok sırasıyla yazılır (k fold için 2k-1 blok):
+
+    F1 F2 ... Fk F1 ... F(k-1)
+
+Böylece fold f'in doğrulama kümesi tek blok (Ff), eğitim kümesi ardışık
+k-1 blok (F(f+1) ... F(f+k-1)) olur: ikisi de data/indices dizilerinin
+dilimi olan CSR görünümleridir, X[tr_idx] kopyası oluşmaz. Diziler
+np.load(mmap_mode="r") ile açıldığı için işçi süreçler aynı sayfaları
+işletim sistemi cache'inden paylaşır.
+
+    layout = write_fold_layout(X, y, [va_idx1, va_idx2, va_idx3], "data/interim/cv")
+    results = run_folds(layout.root, fold_fn, n_jobs=3)   # fold_fn(layout, fold, *args) -> dict
+
+Disk: ~(2k-1)/k x X (k=3 için 1.67x).
+"""
+from __future__ import annotations
+
+import json
+import resource
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from addresskit.preprocessing.executor import ParseExecutor, n_workers
+
+WRITE_CHUNK = 100_000
+
+
+def rows_view(data: np.ndarray, indices: np.ndarray, indptr: np.ndarray, a: int, b: int, n_cols: int):
+    """[a, b) satırlarının kopyasız CSR görünümü (yalnız indptr kaydırılır)."""
+    import scipy.sparse as sp
+
+    lo, hi = int(indptr[a]), int(indptr[b])
+    ptr = np.asarray(indptr[a : b + 1]) - lo
+    return sp.csr_matrix((data[lo:hi], indices[lo:hi], ptr), shape=(b - a, n_cols), copy=False)
+
+
+class FoldLayout:
+    def __init__(self, root: str | Path, mmap: bool = True):
+        self.root = Path(root)
+        with open(self.root / "layout.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.n_folds = meta["n_folds"]
+        self.n_cols = meta["n_cols"]
+        self.starts = meta["starts"]  # blok başlangıç satırları (2k-1 blok + son)
+        mode = "r" if mmap else None
+        self.data, self.indices, self.indptr, self.y, self.rows = (
+            np.load(self.root / f"{n}.npy", mmap_mode=mode) for n in ("data", "indices", "indptr", "y", "rows"))
+
+    def _span(self, a: int, b: int) -> Tuple[Any, np.ndarray, np.ndarray]:
+        return rows_view(self.data, self.indices, self.indptr, a, b, self.n_cols), self.y[a:b], self.rows[a:b]
+
+    def train(self, fold: int):
+        """(X, y, orijinal satır no) — fold'un eğitim kümesi."""
+        return self._span(self.starts[fold + 1], self.starts[fold + self.n_folds])
+
+    def valid(self, fold: int):
+        return self._span(self.starts[fold], self.starts[fold + 1])
+
+
+def write_fold_layout(X, y: np.ndarray, folds: Sequence[np.ndarray], root: str | Path) -> FoldLayout:
+    """folds: fold başına doğrulama satır indeksleri (ayrık, tüm satırları kapsar)."""
+    import scipy.sparse as sp
+
+    X = sp.csr_matrix(X)
+    root = Path(root)
+    shutil.rmtree(root, ignore_errors=True)
+    root.mkdir(parents=True)
+    k = len(folds)
+    blocks = [np.asarray(folds[i % k]) for i in range(2 * k - 1)]
+    order = np.concatenate(blocks)
+    row_nnz = np.diff(X.indptr)
+    indptr = np.zeros(len(order) + 1, dtype=np.int64)
+    np.cumsum(row_nnz[order], out=indptr[1:])
+    nnz = int(indptr[-1])
+    data = np.lib.format.open_memmap(root / "data.npy", mode="w+", dtype=X.data.dtype, shape=(nnz,))
+    indices = np.lib.format.open_memmap(root / "indices.npy", mode="w+", dtype=X.indices.dtype, shape=(nnz,))
+    for s in range(0, len(order), WRITE_CHUNK):
+        part = X[order[s : s + WRITE_CHUNK]]
+        lo = int(indptr[s])
+        data[lo : lo + part.nnz] = part.data
+        indices[lo : lo + part.nnz] = part.indices
+    data.flush()
+    indices.flush()
+    del data, indices
+    np.save(root / "indptr.npy", indptr)
+    np.save(root / "y.npy", np.asarray(y)[order])
+    np.save(root / "rows.npy", order)
+    starts = np.concatenate([[0], np.cumsum([len(b) for b in blocks])]).tolist()
+    with open(root / "layout.json", "w", encoding="utf-8") as f:
+        json.dump({"n_folds": k, "n_cols": X.shape[1], "starts": starts, "nnz": nnz}, f)
+    return FoldLayout(root)
+
+
+def _rss_mb() -> float:
+    """Sürecin şu anki RSS'i (MB); /proc yoksa tepe değer."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_fold(folds: List[int], root: str, fn: Callable[..., Dict[str, Any]], *args: Any) -> List[Dict[str, Any]]:
+    layout = FoldLayout(root)
+    out = []
+    for fold in folds:
+        rss0, t0 = _rss_mb(), time.perf_counter()
+        res = dict(fn(layout, fold, *args))
+        res.update(fold=fold + 1, sec=time.perf_counter() - t0, rss_mb=_rss_mb(), rss_start_mb=rss0,
+                   peak_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+        out.append(res)
+    return out
+
+
+def run_folds(root: str | Path, fn: Callable[..., Dict[str, Any]], n_jobs: int = -1, *args: Any) -> List[Dict[str, Any]]:
+    """
+    fn(layout, fold, *args) her fold için ayrı süreçte (en fazla fold sayısı
+    kadar işçi) çalışır; sonuçlara süre ve bellek (MB) eklenir, fold sırasıyla döner.
+    fn modül seviyesinde tanımlı (pickle edilebilir) olmalıdır.
+    """
+    with open(Path(root) / "layout.json", "r", encoding="utf-8") as f:
+        k = json.load(f)["n_folds"]
+    with ParseExecutor(min(k, n_workers(n_jobs)), label="cv") as ex:
+        return [r for res in ex.map_chunks(_run_fold, [[f] for f in range(k)], str(root), fn, *args) for r in res]
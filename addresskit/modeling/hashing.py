@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Durumsuz (hashing) TF-IDF özellikleri.
+
+TfidfVectorizer'ın sözlüğü yerine n-gram'lar sabit boyutlu bir uzaya
+hash'lenir (HashingVectorizer). Tek öğrenilen durum kolon başına IDF
+vektörüdür ve ucuz bir ikinci geçişte (belge frekansı sayımı) bulunur;
+dönüşüm parça parça ve süreçler arasında paralel yapılabilir.
+
+    ch = HashedChannel("char", (3, 5), n_features=2**20, min_df=3)
+    ch.fit(train_texts, executor=ex)       # yalnız belge frekansı -> idf
+    X = ch.transform(texts, executor=ex)   # sublinear tf * idf, l2
+
+Hash çakışmaları dışında sonuç aynı parametreli TfidfVectorizer ile aynıdır
+(smooth_idf, sublinear_tf, norm="l2"); max_features karşılığı yoktur,
+seyrek n-gram'lar min_df ile atılır.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from addresskit.preprocessing.executor import ParseExecutor, chunked
+
+DEFAULT_CHUNK = 50_000
+
+
+def _doc_freq(texts: Sequence[str], channel: "HashedChannel") -> np.ndarray:
+    X = channel._counts(texts)
+    return np.bincount(X.indices, minlength=channel.n_features).astype(np.int64)
+
+
+def _transform(texts: Sequence[str], channel: "HashedChannel") -> sp.csr_matrix:
+    return channel._transform_chunk(texts)
+
+
+class HashedChannel:
+    """Tek kanal (char ya da word n-gram) için hashing + IDF."""
+
+    def __init__(
+        self,
+        analyzer: str = "char",
+        ngram_range: Tuple[int, int] = (3, 5),
+        n_features: int = 2**20,
+        min_df: int = 1,
+        token_pattern: Optional[str] = None,
+        sublinear_tf: bool = True,
+        dtype: Any = np.float64,
+    ):
+        self.analyzer = analyzer
+        self.ngram_range = tuple(ngram_range)
+        self.n_features = int(n_features)
+        self.min_df = int(min_df)
+        self.token_pattern = token_pattern
+        self.sublinear_tf = sublinear_tf
+        self.dtype = dtype
+        self.n_docs = 0
+        self.df_: Optional[np.ndarray] = None
+        self.idf_: Optional[np.ndarray] = None
+
+    @property
+    def hasher(self) -> HashingVectorizer:
+        kw = dict(
+            analyzer=self.analyzer, ngram_range=self.ngram_range, n_features=self.n_features,
+            lowercase=False, alternate_sign=False, norm=None, dtype=self.dtype,
+        )
+        if self.token_pattern is not None:
+            kw["token_pattern"] = self.token_pattern
+        return HashingVectorizer(**kw)
+
+    def params(self) -> Dict[str, Any]:
+        return {
+            "analyzer": self.analyzer, "ngram_range": list(self.ngram_range),
+            "n_features": self.n_features, "min_df": self.min_df,
+            "token_pattern": self.token_pattern, "sublinear_tf": self.sublinear_tf,
+            "dtype": np.dtype(self.dtype).name,
+        }
+
+    def _counts(self, texts: Sequence[str]) -> sp.csr_matrix:
+        X = self.hasher.transform(texts)
+        X.sum_duplicates()
+        return X
+
+    def partial_fit(self, texts: Sequence[str], executor: Optional[ParseExecutor] = None,
+                    chunk_size: int = DEFAULT_CHUNK) -> "HashedChannel":
+        """Belge frekanslarına yeni metinleri ekleyip idf'i günceller (dosya parça parça okunurken)."""
+        ex = executor or ParseExecutor(1)
+        if self.df_ is None:
+            self.df_ = np.zeros(self.n_features, dtype=np.int64)
+        for part in ex.map_chunks(_doc_freq, chunked(list(texts), chunk_size), self):
+            self.df_ += part
+        self.n_docs += len(texts)
+        idf = np.log((1.0 + self.n_docs) / (1.0 + self.df_)) + 1.0
+        idf[self.df_ < self.min_df] = 0.0  # min_df altı n-gram'lar atılır
+        self.idf_ = idf.astype(self.dtype)
+        return self
+
+    def fit(self, texts: Sequence[str], executor: Optional[ParseExecutor] = None,
+            chunk_size: int = DEFAULT_CHUNK) -> "HashedChannel":
+        """Belge frekanslarını parça parça sayıp idf'i kurar (smooth_idf)."""
+        self.df_, self.n_docs = None, 0
+        return self.partial_fit(texts, executor, chunk_size)
+
+    def _transform_chunk(self, texts: Sequence[str]) -> sp.csr_matrix:
+        if self.idf_ is None:
+            raise RuntimeError("HashedChannel önce fit edilmeli")
+        X = self._counts(texts)
+        if self.sublinear_tf:
+            np.log(X.data, out=X.data)
+            X.data += 1
+        X.data *= self.idf_[X.indices]
+        X.eliminate_zeros()
+        return normalize(X, norm="l2", copy=False).astype(self.dtype, copy=False)
+
+    def transform(self, texts: Sequence[str], executor: Optional[ParseExecutor] = None,
+                  chunk_size: int = DEFAULT_CHUNK) -> sp.csr_matrix:
+        ex = executor or ParseExecutor(1)
+        parts = list(ex.map_chunks(_transform, chunked(list(texts), chunk_size), self))
+        if not parts:
+            return sp.csr_matrix((0, self.n_features), dtype=self.dtype)
+        return sp.vstack(parts, format="csr")
+
+    def fit_transform(self, texts: Sequence[str], executor: Optional[ParseExecutor] = None,
+                      chunk_size: int = DEFAULT_CHUNK) -> sp.csr_matrix:
+        return self.fit(texts, executor, chunk_size).transform(texts, executor, chunk_size)
+
+    def __repr__(self) -> str:
+        return f"HashedChannel({self.analyzer}, {self.ngram_range}, n_features={self.n_features})"
+
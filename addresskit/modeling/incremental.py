@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Bellek dışı (out-of-core) artımlı eğitim: diskteki özellik parçaları
+(shard) üzerinde SGDClassifier.partial_fit mini-batch'leri.
+
+    with ShardWriter(shard_dir) as w:
+        for X, y in feature_chunks:          # CSV parça parça -> özellik
+            w.write(X, y)
+    tr = IncrementalTrainer(make_model, classes=np.arange(len(le.classes_)), counts=label_counts)
+    tr.fit(ShardSet(shard_dir), holdout=(X_ho, y_ho))   # erken durdurmalı epoch'lar
+    tr.update(X_new, encode_labels(le, y_new, grow=True))   # sonradan gelen etiketli satırlar
+
+Bellekte aynı anda tek shard + model katsayıları bulunur. Erken durdurma
+sklearn'deki gibidir: holdout doğruluğu `patience` epoch boyunca `tol`'dan
+fazla iyileşmezse durulur (en iyi katsayılara geri dönülmez).
+Shard'lara etiket kodları (LabelEncoder) yazılır; metin etiketler object
+dizisi olarak kaydedilip pickle'sız geri okunamaz.
+Sınıf ağırlıkları "balanced" formülüyle (n / (k * sayım)) şimdiye kadar
+görülen etiket sayımlarından hesaplanır; partial_fit "balanced"ı kabul etmez.
+"""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from .topk import predict_topk
+
+DEFAULT_BATCH = 10_000
+
+
+class ShardWriter:
+    """(X, y) parçalarını <dir>/part-00000.npz + .y.npy olarak yazar."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        for old in self.root.glob("part-*"):
+            old.unlink()
+        self.n_shards = 0
+        self.rows = 0
+
+    def write(self, X, y: np.ndarray) -> None:
+        if X.shape[0] == 0:
+            return
+        y = np.asarray(y)
+        if y.dtype == object:
+            raise TypeError("shard etiketleri sayısal olmalı (önce encode_labels ile kodlayın)")
+        stem = self.root / f"part-{self.n_shards:05d}"
+        sp.save_npz(f"{stem}.npz", sp.csr_matrix(X), compressed=False)
+        np.save(f"{stem}.y.npy", y)
+        self.n_shards += 1
+        self.rows += X.shape[0]
+
+    def close(self) -> None:
+        with open(self.root / "shards.json", "w", encoding="utf-8") as f:
+            json.dump({"n_shards": self.n_shards, "rows": self.rows}, f)
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ShardSet:
+    """Diskteki shard'lar; her iterasyonda (istenirse karışık sırayla) tek tek yüklenir."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.parts = sorted(self.root.glob("part-*.npz"))
+
+    def __len__(self) -> int:
+        return len(self.parts)
+
+    def load(self, i: int) -> Tuple[sp.csr_matrix, np.ndarray]:
+        p = self.parts[i]
+        return sp.load_npz(p).tocsr(), np.load(p.with_suffix("").with_suffix(".y.npy"))
+
+    def iter(self, shuffle: bool = False, seed: int = 0) -> Iterator[Tuple[sp.csr_matrix, np.ndarray]]:
+        order = np.arange(len(self.parts))
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        for i in order:
+            yield self.load(int(i))
+
+    def __iter__(self):
+        return self.iter()
+
+
+def balanced_weights(classes: Sequence[Any], counts: np.ndarray) -> Dict[Any, float]:
+    """sklearn class_weight='balanced' karşılığı; hiç görülmeyen sınıflara 1.0."""
+    counts = np.asarray(counts, dtype=np.float64)
+    seen = counts > 0
+    w = np.ones(len(counts))
+    w[seen] = counts.sum() / (seen.sum() * counts[seen])
+    return {c: float(x) for c, x in zip(classes, w)}
+
+
+def encode_labels(le: Any, labels: Sequence[Any], grow: bool = False) -> np.ndarray:
+    """
+    Fit edilmiş LabelEncoder ile etiket kodları. grow=True ise görülmemiş
+    etiketler classes_ sonuna eklenir (mevcut kodlar değişmez); bu durumda
+    classes_ sıralı kalmayabilir, le.transform yerine bu fonksiyon kullanılır.
+    """
+    index = {c: i for i, c in enumerate(le.classes_.tolist())}
+    labels = np.asarray(labels).tolist()
+    if grow:
+        new = [c for c in dict.fromkeys(labels) if c not in index]
+        if new:
+            index.update((c, len(index) + i) for i, c in enumerate(new))
+            le.classes_ = np.concatenate([le.classes_, np.asarray(new)])
+    try:
+        return np.fromiter((index[c] for c in labels), dtype=np.int64, count=len(labels))
+    except KeyError as e:
+        raise ValueError(f"bilinmeyen etiket: {e.args[0]!r}") from None
+
+
+def chunked_predict(clf, X, chunk_rows: int = 20_000) -> np.ndarray:
+    """decision_function argmax'ı parça parça (dense olasılık matrisi yok)."""
+    return predict_topk(clf, X, k=1, chunk_rows=chunk_rows).labels[:, 0]
+
+
+class IncrementalTrainer:
+    def __init__(
+        self,
+        make_model: Callable[[], Any],
+        classes: Sequence[Any],
+        counts: Optional[np.ndarray] = None,
+        batch_size: int = DEFAULT_BATCH,
+        max_epochs: int = 10,
+        patience: int = 3,
+        tol: float = 1e-3,
+        seed: int = 42,
+    ):
+        self.clf = make_model()
+        self.clf.set_params(class_weight=None, early_stopping=False)
+        self.classes = np.asarray(classes)
+        self.counts = np.zeros(len(self.classes), dtype=np.int64) if counts is None else np.asarray(counts, np.int64)
+        self.batch_size = max(1, int(batch_size))
+        self.max_epochs = max_epochs
+        self.patience = patience
+        self.tol = tol
+        self.seed = seed
+        self.history: List[Dict[str, float]] = []
+
+    @property
+    def fitted(self) -> bool:
+        return hasattr(self.clf, "coef_")
+
+    def _partial_fit(self, X, y: np.ndarray) -> None:
+        self.clf.set_params(class_weight=balanced_weights(self.classes, self.counts))
+        for s in range(0, X.shape[0], self.batch_size):
+            xb, yb = X[s : s + self.batch_size], y[s : s + self.batch_size]
+            if self.fitted:
+                self.clf.partial_fit(xb, yb)
+            else:
+                self.clf.partial_fit(xb, yb, classes=self.classes)
+
+    def score(self, X, y: np.ndarray) -> float:
+        return float(np.mean(chunked_predict(self.clf, X) == y)) if len(y) else float("nan")
+
+    def fit(self, shards: ShardSet, holdout: Optional[Tuple[Any, np.ndarray]] = None) -> List[Dict[str, float]]:
+        """Shard'lar üzerinde epoch'lar; holdout verilirse erken durdurma."""
+        best, bad = -np.inf, 0
+        for epoch in range(1, self.max_epochs + 1):
+            t0 = time.perf_counter()
+            n = 0
+            for X, y in shards.iter(shuffle=True, seed=self.seed + epoch):
+                self._partial_fit(X, y)
+                n += X.shape[0]
+            rec = {"epoch": epoch, "rows": n, "sec": time.perf_counter() - t0}
+            if holdout is not None:
+                rec["holdout_acc"] = self.score(*holdout)
+            self.history.append(rec)
+            msg = f"[INFO] epoch {epoch}: rows={n} {rec['sec']:.1f}s"
+            print(msg + (f" holdout_acc={rec['holdout_acc']:.4f}" if "holdout_acc" in rec else ""))
+            if holdout is None:
+                continue
+            if rec["holdout_acc"] > best + self.tol:
+                best, bad = rec["holdout_acc"], 0
+            else:
+                bad += 1
+                if bad >= self.patience:
+                    print(f"[INFO] erken durdurma: {self.patience} epoch iyileşme yok (en iyi {best:.4f})")
+                    break
+        return self.history
+
+    def add_classes(self, labels: Sequence[Any]) -> int:
+        """Yeni etiketleri sınıf listesine ekler (katsayıları 0 satırlarla genişletir)."""
+        new = [c for c in dict.fromkeys(labels) if c not in set(self.classes.tolist())]
+        if not new:
+            return 0
+        self.classes = np.concatenate([self.classes, np.asarray(new, dtype=self.classes.dtype)])
+        self.counts = np.concatenate([self.counts, np.zeros(len(new), dtype=np.int64)])
+        if self.fitted:
+            c = self.clf
+            c.coef_ = np.vstack([c.coef_, np.zeros((len(new), c.coef_.shape[1]), dtype=c.coef_.dtype)])
+            c.intercept_ = np.concatenate([c.intercept_, np.zeros(len(new), dtype=c.intercept_.dtype)])
+            c.classes_ = self.classes
+        return len(new)
+
+    def update(self, X, y: Sequence[Any], epochs: int = 1) -> int:
+        """
+        Yeni etiketli satırlarla modeli tam yeniden eğitmeden günceller;
+        bilinmeyen etiketler yeni sınıf olarak eklenir. Eklenen sınıf sayısını döndürür.
+        """
+        y = np.asarray(y)
+        added = self.add_classes(y.tolist())
+        idx = {c: i for i, c in enumerate(self.classes.tolist())}
+        np.add.at(self.counts, [idx[v] for v in y.tolist()], 1)
+        for _ in range(max(1, epochs)):
+            self._partial_fit(X, y)
+        return added
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Kompakt çıkarım paketiyle (bkz. bundle.py) tahmin; sklearn/joblib gerekmez.
+
+    python -m addresskit.modeling.predict --bundle models/baseline/bundle \\
+        --input data/processed/test_clean_parsed.csv --output submissions/submission_bundle.csv --k 3
+
+Girdi parça parça okunur; çıktı id,label (+ k>1 ise label_2..label_k, score_1..score_k).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+DEFAULT_BUNDLE = os.path.join("models", "baseline", "bundle")
+DEFAULT_INPUT = os.path.join("data", "processed", "test_clean_parsed.csv")
+DEFAULT_OUTPUT = os.path.join("submissions", "submission_bundle.csv")
+
+
+def _parse_args(argv=None):
+    p = argparse.ArgumentParser(description="InferenceBundle ile top-k tahmin")
+    p.add_argument("--bundle", default=DEFAULT_BUNDLE)
+    p.add_argument("--input", default=DEFAULT_INPUT)
+    p.add_argument("--output", default=DEFAULT_OUTPUT)
+    p.add_argument("--k", type=int, default=1)
+    p.add_argument("--chunk-rows", type=int, default=10_000)
+    p.add_argument("--no-mmap", action="store_true", help="dizileri belleğe tamamen oku")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = _parse_args(argv)
+    import pandas as pd
+
+    from .bundle import InferenceBundle
+    from .fields import build_text_fields
+
+    t0 = time.perf_counter()
+    bundle = InferenceBundle.load(args.bundle, mmap=not args.no_mmap)
+    print(f"[INFO] {bundle} yüklendi ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    t0, n = time.perf_counter(), 0
+    for i, df in enumerate(pd.read_csv(args.input, chunksize=args.chunk_rows)):
+        df = df.reset_index(drop=True)
+        base, side = build_text_fields(df)
+        top = bundle.predict_topk(base.tolist(), side.tolist(), k=args.k, chunk_rows=args.chunk_rows)
+        out = pd.DataFrame({"id": df["id"] if "id" in df.columns else range(n, n + len(df)),
+                            "label": top.labels[:, 0]})
+        if top.labels.shape[1] > 1:
+            for j in range(1, top.labels.shape[1]):
+                out[f"label_{j + 1}"] = top.labels[:, j]
+            for j in range(top.labels.shape[1]):
+                out[f"score_{j + 1}"] = top.proba[:, j]
+        out.to_csv(args.output, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        n += len(df)
+    print(f"[INFO] {n} satır -> {args.output} ({time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Hiyerarşik aday sınıf budama: ayrıştırılmış il / ilçe / mahalle, eğitimde
+bu parçalarla birlikte görülen etiket alt kümesine eşlenir; tahminde
+yalnız o sınıfların coef_ satırları skorlanır.
+
+    keys = admin_keys(train)                        # [(il, ilce, mahalle), ...]
+    idx = CandidateIndex().fit(keys, y, classes=clf.classes_)
+    group, sets = idx.candidates(admin_keys(test), min_size=3)
+    top = predict_pruned(clf, X_te, group, sets, k=3)
+    prune_stats(group, sets, len(clf.classes_))
+
+Arama en özel önekten geriye doğrudur: (il, ilce, mahalle) -> (il, ilce)
+-> (il,). Bulunamayan ya da hiç parçası olmayan satırlar (group == -1)
+tam sınıf kümesiyle skorlanır.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .topk import DEFAULT_CHUNK_ROWS, TopK, softmax_rows, topk_from_scores
+
+LEVELS = ("il", "ilce", "mahalle")
+_MISSING = {"", "nan", "none", "yok"}
+
+Key = Tuple[Optional[str], ...]
+
+
+def _norm(v: Any) -> Optional[str]:
+    if v is None or (isinstance(v, float) and v != v):
+        return None
+    s = str(v).strip().lower()
+    return None if s in _MISSING else s
+
+
+def admin_keys(df, levels: Sequence[str] = LEVELS) -> List[Key]:
+    """DataFrame satırlarının (il, ilce, mahalle) anahtarları; eksik parça None."""
+    cols = [df[c].tolist() if c in df.columns else [None] * len(df) for c in levels]
+    return [tuple(_norm(v) for v in row) for row in zip(*cols)]
+
+
+def _prefixes(key: Key):
+    """Son elemanı dolu önekler, en özelden genele."""
+    for d in range(len(key), 0, -1):
+        if key[d - 1] is not None:
+            yield key[:d]
+
+
+class CandidateIndex:
+    """önek -> o önekle eğitimde görülen coef_ satır indeksleri (sıralı int32)."""
+
+    def __init__(self, min_rows: int = 1):
+        self.min_rows = min_rows  # daha az satırla görülen önekler kullanılmaz
+        self.sets: Dict[Key, np.ndarray] = {}
+        self.rows: Dict[Key, int] = {}
+        self.n_classes = 0
+
+    def fit(self, keys: Sequence[Key], y: Sequence[Any], classes: Optional[Sequence[Any]] = None) -> "CandidateIndex":
+        """y: etiketler; classes verilirse (clf.classes_) coef_ satırına çevrilir."""
+        rows = _label_rows(y, classes)
+        self.n_classes = len(classes) if classes is not None else (int(rows.max()) + 1 if len(rows) else 0)
+        acc: Dict[Key, set] = {}
+        self.rows = {}
+        for key, r in zip(keys, rows.tolist()):
+            if r < 0:
+                continue
+            for p in _prefixes(key):
+                acc.setdefault(p, set()).add(r)
+                self.rows[p] = self.rows.get(p, 0) + 1
+        self.sets = {p: np.array(sorted(s), dtype=np.int32) for p, s in acc.items()}
+        return self
+
+    def lookup(self, key: Key, min_size: int = 1) -> Optional[Key]:
+        """Kullanılacak önek (en az min_size aday, min_rows satır); yoksa None."""
+        for p in _prefixes(key):
+            s = self.sets.get(p)
+            if s is not None and len(s) >= min_size and self.rows[p] >= self.min_rows:
+                return p
+        return None
+
+    def candidates(self, keys: Sequence[Key], min_size: int = 1) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """(group, sets): satır başına aday kümesi indeksi (-1: tam küme) ve kümeler."""
+        ids: Dict[Key, int] = {}
+        sets: List[np.ndarray] = []
+        memo: Dict[Key, int] = {}
+        group = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            g = memo.get(key)
+            if g is None:
+                p = self.lookup(key, min_size)
+                if p is None:
+                    g = -1
+                else:
+                    g = ids.get(p)
+                    if g is None:
+                        g = ids[p] = len(sets)
+                        sets.append(self.sets[p])
+                memo[key] = g
+            group[i] = g
+        return group, sets
+
+    def __len__(self) -> int:
+        return len(self.sets)
+
+
+def _groups(group: np.ndarray) -> List[np.ndarray]:
+    """Aynı gruptaki satır indeksleri (grup başına bir dizi)."""
+    order = np.argsort(group, kind="stable")
+    return np.split(order, np.flatnonzero(np.diff(group[order])) + 1) if len(order) else []
+
+
+def _weights(clf: Any):
+    W = np.asarray(clf.coef_)
+    b = np.asarray(clf.intercept_)
+    if W.shape[0] == 1:  # ikili: tek skor -> (negatif, pozitif)
+        W, b = np.vstack([-W, W]), np.concatenate([-b, b])
+    return W, b
+
+
+def predict_pruned(
+    clf: Any,
+    X,
+    group: np.ndarray,
+    sets: Sequence[np.ndarray],
+    k: int = 1,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    classes: Optional[np.ndarray] = None,
+) -> TopK:
+    """
+    predict_topk'un budamalı hali: aynı aday kümesini paylaşan satırlar
+    birlikte, yalnız kümedeki sınıflar ve satırların dolu kolonları üzerinden
+    skorlanır. Kümesi k'dan küçük gruplar eksik kolonları -inf ile doldurur.
+    """
+    import scipy.sparse as sp
+
+    classes = np.asarray(clf.classes_ if classes is None else classes)
+    W, b = _weights(clf)
+    X = sp.csr_matrix(X)
+    n = X.shape[0]
+    k = min(k, len(classes))
+    labels = np.empty((n, k), dtype=classes.dtype)
+    scores = np.full((n, k), -np.inf, dtype=np.float32)
+    step = max(1, int(chunk_rows))
+    for rows_g in _groups(group):
+        g = int(group[rows_g[0]])
+        for s in range(0, len(rows_g), step):
+            rows = rows_g[s : s + step]
+            Xg = X[rows]
+            if g < 0:
+                S = np.asarray(Xg @ W.T) + b
+                idx, top = topk_from_scores(S, k)
+                labels[rows], scores[rows] = classes[idx], top
+                continue
+            C = sets[g]
+            cols = np.unique(Xg.indices)
+            S = np.asarray(Xg[:, cols] @ W[np.ix_(C, cols)].T) + b[C]
+            idx, top = topk_from_scores(S, k)
+            kk = idx.shape[1]
+            labels[rows, :kk], scores[rows, :kk] = classes[C[idx]], top
+            if kk < k:
+                labels[rows, kk:] = classes[C[idx[:, :1]]]
+    return TopK(labels, scores, softmax_rows(scores.astype(np.float64)).astype(np.float32))
+
+
+def _label_rows(y: Sequence[Any], classes: Optional[Sequence[Any]]) -> np.ndarray:
+    if classes is None:
+        return np.asarray(y, dtype=np.int64)
+    pos = {c: i for i, c in enumerate(np.asarray(classes).tolist())}
+    return np.array([pos.get(v, -1) for v in np.asarray(y).tolist()], dtype=np.int64)
+
+
+def prune_stats(group: np.ndarray, sets: Sequence[np.ndarray], n_classes: int,
+                y: Optional[Sequence[Any]] = None, classes: Optional[Sequence[Any]] = None) -> Dict[str, float]:
+    """
+    rate: skorlanmayan sınıf oranı (1 - ort. aday / sınıf sayısı),
+    fallback: tam kümeye düşen satır oranı,
+    coverage: (y verilirse) doğru sınıfın adaylar içinde olma oranı.
+    """
+    n = len(group)
+    if not n:
+        return {"rate": 0.0, "fallback": 0.0, "candidates": float(n_classes)}
+    sizes = np.array([len(s) for s in sets] + [n_classes], dtype=np.float64)
+    per_row = sizes[group]  # -1 -> son eleman (tam küme)
+    out = {"rate": float(1 - per_row.mean() / max(n_classes, 1)),
+           "fallback": float(np.mean(group < 0)),
+           "candidates": float(per_row.mean())}
+    if y is not None:
+        y_rows = _label_rows(y, classes)
+        hit = group < 0
+        for rows in _groups(group):
+            g = int(group[rows[0]])
+            if g >= 0:
+                hit[rows] = np.isin(y_rows[rows], sets[g])
+        out["coverage"] = float(hit.mean())
+    return out
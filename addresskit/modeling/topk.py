@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Parça parça top-k tahmin: n x ~10k'lık yoğun predict_proba matrisi yerine
+her parçada decision_function hesaplanır, satır başına yalnız en yüksek k
+sınıf (argpartition) ve bunların üzerinde softmax tutulur (k sınıfa göre
+göreli güven). full_proba=True ise proba, sklearn'ün OvR log_loss
+predict_proba'sıdır: her sınıf skoru sigmoid'den geçirilip bütün sınıfların
+toplamına bölünür (parça başına satır toplamı); k sınıf üzerinde toplamı
+1'den küçük olabilir. Kalibre değildir; eşikler doğrulama kümesinde seçilir.
+Tepe bellek O(chunk_rows x sınıf sayısı).
+
+    top = predict_topk(clf, X, k=3)
+    top.labels[:, 0]                  # argmax tahmini
+    topk_accuracy(y, top.labels)      # top-3 doğruluk
+"""
+from __future__ import annotations
+
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+
+DEFAULT_CHUNK_ROWS = 10_000
+
+
+class TopK(NamedTuple):
+    labels: np.ndarray  # (n, k) sınıf etiketleri, skora göre azalan
+    scores: np.ndarray  # (n, k) float32 decision_function değerleri
+    proba: np.ndarray   # (n, k) float32, k sınıf üzerinde softmax ya da OvR predict_proba (full_proba)
+
+
+def topk_from_scores(S: np.ndarray, k: int):
+    """(indeks, skor) — her satırın en yüksek k skoru, azalan sırada."""
+    k = min(k, S.shape[1])
+    if k < S.shape[1]:
+        idx = np.argpartition(-S, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.broadcast_to(np.arange(S.shape[1]), S.shape).copy()
+    top = np.take_along_axis(S, idx, axis=1)
+    order = np.argsort(-top, axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(top, order, axis=1)
+
+
+def softmax_rows(scores: np.ndarray) -> np.ndarray:
+    z = scores - scores[:, :1]  # azalan sıralı: ilk kolon maksimum
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def ovr_norm_rows(S: np.ndarray) -> np.ndarray:
+    """Satır başına sum(sigmoid(S)): OvR predict_proba'nın paydası (float64)."""
+    from scipy.special import expit
+
+    return expit(np.asarray(S, dtype=np.float64)).sum(axis=1)
+
+
+def topk_result(labels: np.ndarray, scores: np.ndarray, norm: Optional[np.ndarray] = None) -> TopK:
+    """norm verilirse (bkz. ovr_norm_rows) proba = sigmoid(skor) / norm, yoksa k sınıf üzerinde softmax."""
+    if norm is None:
+        proba = softmax_rows(scores.astype(np.float64))
+    else:
+        from scipy.special import expit
+
+        proba = expit(scores.astype(np.float64)) / norm[:, None]
+    return TopK(labels, scores, proba.astype(np.float32))
+
+
+def predict_topk(
+    clf: Any,
+    X,
+    k: int = 3,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    classes: Optional[np.ndarray] = None,
+    full_proba: bool = False,
+) -> TopK:
+    """clf.decision_function üzerinden parça parça top-k (ikili sınıflandırma da desteklenir)."""
+    classes = np.asarray(clf.classes_ if classes is None else classes)
+    n = X.shape[0]
+    k = min(k, len(classes))
+    labels = np.empty((n, k), dtype=classes.dtype)
+    scores = np.empty((n, k), dtype=np.float32)
+    norm = np.empty(n, dtype=np.float64) if full_proba else None
+    for s in range(0, n, max(1, int(chunk_rows))):
+        S = clf.decision_function(X[s : s + chunk_rows])
+        if S.ndim == 1:  # ikili: tek skor -> (negatif, pozitif); sigmoid(-s) + sigmoid(s) = 1
+            S = np.column_stack([-S, S])
+        idx, top = topk_from_scores(S, k)
+        labels[s : s + len(idx)] = classes[idx]
+        scores[s : s + len(idx)] = top
+        if norm is not None:
+            norm[s : s + len(idx)] = ovr_norm_rows(S)
+    return topk_result(labels, scores, norm)
+
+
+def topk_accuracy(y_true, top_labels: np.ndarray) -> float:
+    """Doğru etiketin ilk k tahmin içinde olma oranı."""
+    y_true = np.asarray(y_true)
+    if not len(y_true):
+        return float("nan")
+    return float(np.mean((top_labels == y_true[:, None]).any(axis=1)))
@@ -8,9 +8,20 @@ from pathlib import Path
 import argparse
 import csv
 import io
+import random
 import re
+import time
 import unicodedata
-import yaml
+import warnings
+from typing import Iterable, NamedTuple
+
+from addresskit.preprocessing.rewrite import RegexRule, Rewriter, Rule
+from addresskit.utils.cache import DEFAULT_MAX_ENTRIES, ParseCache, cached_map
+
+# normalize_text çıktısını değiştiren her düzenlemede artır (cache anahtarına girer)
+NORMALIZER_VERSION = "1"
+# normalize_address cache okuma/yazma parça boyu
+_NORMALIZE_CHUNK = 5000
 
 
 # --------------------------------
@@ -31,6 +42,8 @@ def load_cfg(cfg_path: str) -> dict:
     p = Path(cfg_path)
     if not p.exists():
         return {}
+    import yaml
+
     return yaml.safe_load(p.read_text(encoding="utf-8")) or {}
 
 
@@ -82,9 +95,108 @@ def _fold_tr_diacritics(s: str) -> str:
 # --------------------------------
 # Core normalize
 # --------------------------------
-def normalize_text(addr: str, cfg: dict) -> str:
-    """YAML konfige göre adım adım normalizasyon uygular."""
+# cfg -> derlenmiş kurallar; id(cfg) ile önbelleklenir
+_COMPILED: dict[int, tuple] = {}
+
+
+class _CompiledCfg(NamedTuple):
+    regex: list  # [(pattern, compiled | None, repl, error | None)]
+    replace: Rewriter
+    abbreviations: Rewriter
+    stopwords: frozenset
+
+
+def _compile_regex_rules(cfg: dict) -> list:
+    out = []
+    for rule in cfg.get("regex") or []:
+        if not isinstance(rule, dict):
+            out.append((repr(rule), None, "", "kural bir sözlük değil"))
+            continue
+        pat = rule.get("pattern")
+        repl = rule.get("repl", "")
+        if not pat:
+            continue
+        if not isinstance(pat, str) or not isinstance(repl, str):
+            out.append((repr(pat), None, repl, "pattern/repl metin değil"))
+            continue
+        try:
+            out.append((pat, re.compile(pat, re.UNICODE), repl, None))
+        except re.error as e:
+            out.append((pat, None, repl, f"re.error: {e}"))
+    return out
+
+
+def _compiled(cfg: dict) -> _CompiledCfg:
+    hit = _COMPILED.get(id(cfg))
+    if hit is not None and hit[0] is cfg:
+        return hit[1]
+
+    regex = _compile_regex_rules(cfg)
+    broken = [(p, e) for p, c, _, e in regex if c is None]
+    if broken:
+        # eskiden sessizce atlanıyordu; hâlâ atlanır ama görünür olsun
+        warnings.warn(
+            f"{len(broken)} bozuk regex kuralı atlandı: "
+            + "; ".join(f"{p!r} ({e})" for p, e in broken[:5]),
+            stacklevel=3,
+        )
+
+    replace = [
+        Rule(k, v if isinstance(v, str) else "", left=False, right=False)
+        for k, v in (cfg.get("replace") or {}).items()
+        if isinstance(k, str) and k
+    ]
+    abbr = []
+    for src, tgt in (cfg.get("abbreviations") or {}).items():
+        if not isinstance(src, str):
+            continue
+        tgt = str(tgt)
+        if "\\" in tgt:  # re.sub şablonu; literal'e indirgenemez
+            abbr.append(RegexRule(rf"\b{re.escape(src)}\b", tgt, re.UNICODE))
+        else:
+            abbr.append(Rule(src, tgt))
+
+    comp = _CompiledCfg(
+        regex,
+        Rewriter(replace, "replace"),
+        Rewriter(abbr, "abbreviations"),
+        frozenset(cfg.get("stopwords") or []),
+    )
+    if len(_COMPILED) > 32:
+        _COMPILED.clear()
+    _COMPILED[id(cfg)] = (cfg, comp)
+    return comp
+
+
+def open_normalize_cache(
+    path: str | Path, cfg: dict, max_entries: int = DEFAULT_MAX_ENTRIES
+) -> ParseCache:
+    """normalize_text için (metin, NORMALIZER_VERSION, cfg) anahtarlı cache."""
+    return ParseCache(
+        path, "normalize_text", NORMALIZER_VERSION, cfg=cfg, max_entries=max_entries
+    )
+
+
+def normalize_text(addr: str, cfg: dict, cache: ParseCache | None = None) -> str:
+    """YAML konfige göre adım adım normalizasyon uygular.
+
+    cache verilirse (bkz. open_normalize_cache) aynı ham metin tekrar
+    hesaplanmaz. cache aynı cfg ile açılmış olmalıdır. Tek satırlık erişim
+    her çağrıda bir SQLite işlemi demektir; çok satır için cached_map ile
+    toplu çağırın (bkz. normalize_address).
+    """
     addr = addr or ""
+    if cache is not None:
+        hit = cache.get(addr)
+        if hit is None:
+            hit = _normalize_text(addr, cfg)
+            cache.put(addr, hit)
+        return hit
+    return _normalize_text(addr, cfg)
+
+
+def _normalize_text(addr: str, cfg: dict) -> str:
+    comp = _compiled(cfg)
 
     # 0) Mojibake düzelt (opsiyonel)
     if cfg.get("fix_mojibake", False):
@@ -98,30 +210,23 @@ def normalize_text(addr: str, cfg: dict) -> str:
     if cfg.get("fold_diacritics", False):
         addr = _fold_tr_diacritics(addr)
 
-    # 2) Regex kuralları (sırayla)
-    for rule in cfg.get("regex") or []:
+    # 2) Regex kuralları (sırayla); derlenemeyenler _compiled'da raporlanır
+    for _, rx, repl, _ in comp.regex:
+        if rx is None:
+            continue
         try:
-            pat = rule.get("pattern")
-            repl = rule.get("repl", "")
-            if pat:
-                addr = re.sub(pat, repl, addr, flags=re.UNICODE)
-        except Exception:
-            # Bozuk desenleri sessizce atla
+            addr = rx.sub(repl, addr)
+        except (re.error, IndexError):
+            # bozuk replacement şablonu (örn. olmayan grup) -> kuralı atla
             pass
 
-    # 3) Basit replace (literal)
-    for k, v in (cfg.get("replace") or {}).items():
-        if isinstance(k, str):
-            addr = addr.replace(k, v if isinstance(v, str) else "")
-
-    # 4) Kısaltmalar (kelime sınırıyla)
-    for src, tgt in (cfg.get("abbreviations") or {}).items():
-        if not isinstance(src, str):
-            continue
-        addr = re.sub(rf"\b{re.escape(src)}\b", str(tgt), addr, flags=re.UNICODE)
+    # 3) Basit replace (literal) + 4) Kısaltmalar (kelime sınırıyla)
+    # her tablo tek taramada uygulanır (bkz. preprocessing/rewrite.py)
+    addr = comp.replace(addr)
+    addr = comp.abbreviations(addr)
 
     # 5) Stopword temizliği
-    stops = set(cfg.get("stopwords") or [])
+    stops = comp.stopwords
     if stops:
         addr = " ".join(t for t in addr.split() if t not in stops)
 
@@ -136,11 +241,23 @@ def normalize_text(addr: str, cfg: dict) -> str:
     return addr
 
 
-def normalize_address(input_path, output_path, config_path):
+def _chunks(rows: Iterable[dict], size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def normalize_address(input_path, output_path, config_path, cache_path=None):
     src = Path(input_path)
     dst = Path(output_path)
     cfg = load_cfg(config_path)
     dst.parent.mkdir(parents=True, exist_ok=True)
+    cache = open_normalize_cache(cache_path, cfg) if cache_path else None
 
     with (
         _open_read_text(src) as f_in,
@@ -164,13 +281,229 @@ def normalize_address(input_path, output_path, config_path):
         w = csv.DictWriter(f_out, fieldnames=out_fields)
         w.writeheader()
 
-        for row in r:
-            safe_row = {k: row.get(k, "") for k in out_fields}
-            addr = (safe_row.get("address") or "").strip()
-            safe_row["address_norm"] = normalize_text(addr, cfg)
-            w.writerow(safe_row)
+        # cache toplu okunur/yazılır (satır başına get + commit yerine parça başına bir kez)
+        def norm_all(texts):
+            return [_normalize_text(t, cfg) for t in texts]
+
+        for chunk in _chunks(r, _NORMALIZE_CHUNK):
+            safe_rows = [{k: row.get(k, "") for k in out_fields} for row in chunk]
+            addrs = [(sr.get("address") or "").strip() for sr in safe_rows]
+            for sr, norm in zip(safe_rows, cached_map(addrs, norm_all, cache)):
+                sr["address_norm"] = norm
+            w.writerows(safe_rows)
 
     print(f"[normalize] wrote -> {dst}  (config={config_path})")
+    if cache is not None:
+        print(f"[normalize] cache {cache.stats()}")
+        cache.close()
+
+
+# --------------------------------
+# Kural profili
+# --------------------------------
+class RuleStat:
+    """Tek kuralın profil sayaçları."""
+
+    __slots__ = ("step", "index", "rule", "target", "calls", "matches", "changed", "seconds", "error")
+
+    def __init__(self, step: str, index: int, rule: str, target: str = "", error: str = ""):
+        self.step, self.index, self.rule, self.target = step, index, rule, target
+        self.calls = self.matches = self.changed = 0
+        self.seconds = 0.0
+        self.error = error
+
+    def as_row(self) -> dict:
+        return {
+            "step": self.step,
+            "index": self.index,
+            "rule": self.rule,
+            "target": self.target,
+            "calls": self.calls,
+            "matches": self.matches,
+            "changed": self.changed,
+            "match_rate": round(self.matches / self.calls, 6) if self.calls else 0.0,
+            "total_ms": round(self.seconds * 1000, 3),
+            "us_per_call": round(self.seconds * 1e6 / self.calls, 3) if self.calls else 0.0,
+            "dead": int(self.calls > 0 and self.matches == 0 and not self.error),
+            "error": self.error,
+        }
+
+
+def profile_rules(texts: Iterable[str], cfg: dict) -> tuple[list[RuleStat], dict]:
+    """
+    normalize_text adımlarını kural kural, sıralı referans semantiğiyle çalıştırır
+    ve her kural için eşleşme / değişiklik / süre / hata sayar.
+
+    Dönüş: (istatistikler, özet). Özet, tek taramalı yolun sonucuyla kural kural
+    yolun sonucunun kaç metinde ayrıştığını da içerir (>0 ise kural çakışması var).
+    """
+    comp = _compiled(cfg)
+    stats: list[RuleStat] = []
+
+    regex = []
+    for i, (pat, rx, repl, err) in enumerate(comp.regex):
+        st = RuleStat("regex", i, pat, str(repl), err or "")
+        stats.append(st)
+        regex.append((st, rx, repl))
+
+    replace = []
+    for i, r in enumerate(comp.replace.rules):
+        st = RuleStat("replace", i, r.source, r.target)
+        stats.append(st)
+        replace.append((st, r.source, r.target))
+
+    abbr = []
+    for i, r in enumerate(comp.abbreviations.rules):
+        if isinstance(r, RegexRule):
+            st, rx, repl = RuleStat("abbreviations", i, r.pattern, r.repl), re.compile(r.pattern, r.flags), r.repl
+        else:
+            st, rx, repl = RuleStat("abbreviations", i, r.source, r.target), re.compile(r.pattern()), r.target.replace("\\", r"\\")
+        stats.append(st)
+        abbr.append((st, rx, repl))
+
+    stop_stats = {w: RuleStat("stopwords", i, w) for i, w in enumerate(sorted(comp.stopwords))}
+    stats.extend(stop_stats.values())
+    steps = {
+        name: RuleStat("step", i, name)
+        for i, name in enumerate(
+            ["mojibake", "lowercase", "fold_diacritics", "replace[single-pass]",
+             "abbreviations[single-pass]", "stopwords", "strip_punctuation", "strip_extra_spaces"]
+        )
+    }
+    stats.extend(steps.values())
+
+    def timed(name: str, fn, addr: str) -> str:
+        st = steps[name]
+        t0 = time.perf_counter()
+        new = fn(addr)
+        st.seconds += time.perf_counter() - t0
+        st.calls += 1
+        if new != addr:
+            st.matches += 1
+            st.changed += 1
+        return new
+
+    n = divergent = 0
+    for raw in texts:
+        n += 1
+        addr = raw or ""
+        if cfg.get("fix_mojibake", False):
+            addr = timed("mojibake", _maybe_unmojibake, addr)
+        if cfg.get("lowercase", True):
+            addr = timed("lowercase", tr_safe_lower, addr)
+        if cfg.get("fold_diacritics", False):
+            addr = timed("fold_diacritics", _fold_tr_diacritics, addr)
+
+        for st, rx, repl in regex:
+            if rx is None:
+                continue
+            st.calls += 1
+            t0 = time.perf_counter()
+            try:
+                new, k = rx.subn(repl, addr)
+            except (re.error, IndexError) as e:
+                st.error = st.error or f"{type(e).__name__}: {e}"
+                new, k = addr, 0
+            st.seconds += time.perf_counter() - t0
+            st.matches += k > 0
+            st.changed += new != addr
+            addr = new
+
+        # tek taramalı yolun süresi (karşılaştırma için); sonuç kural kural yoldan gelir
+        single = timed("replace[single-pass]", comp.replace, addr)
+        for st, src, tgt in replace:
+            st.calls += 1
+            t0 = time.perf_counter()
+            hit = src in addr
+            new = addr.replace(src, tgt) if hit else addr
+            st.seconds += time.perf_counter() - t0
+            st.matches += hit
+            st.changed += new != addr
+            addr = new
+        divergent_here = single != addr
+
+        single = timed("abbreviations[single-pass]", comp.abbreviations, addr)
+        for st, rx, repl in abbr:
+            st.calls += 1
+            t0 = time.perf_counter()
+            new, k = rx.subn(repl, addr)
+            st.seconds += time.perf_counter() - t0
+            st.matches += k > 0
+            st.changed += new != addr
+            addr = new
+        divergent_here |= single != addr
+
+        if stop_stats:
+            toks = addr.split()
+            for t in set(toks):
+                st = stop_stats.get(t)
+                if st is not None:
+                    st.matches += 1
+                    st.changed += 1
+            for st in stop_stats.values():
+                st.calls += 1
+            addr = timed("stopwords", lambda a: " ".join(t for t in a.split() if t not in comp.stopwords), addr)
+        if cfg.get("strip_punctuation", False):
+            addr = timed("strip_punctuation", lambda a: re.sub(r"[^\w\s]", " ", a, flags=re.UNICODE), addr)
+        if cfg.get("strip_extra_spaces", True):
+            addr = timed("strip_extra_spaces", lambda a: " ".join(a.split()), addr)
+        divergent += divergent_here
+
+    stats = [st for st in stats if st.calls or st.error]
+    stats.sort(key=lambda st: (-st.seconds, st.step, st.index))
+    summary = {
+        "texts": n,
+        "rules": sum(st.step != "step" for st in stats),
+        "dead_rules": sum(st.as_row()["dead"] for st in stats if st.step != "step"),
+        "errors": sum(bool(st.error) for st in stats),
+        "conflicts": len(comp.replace.conflicts) + len(comp.abbreviations.conflicts),
+        "single_pass_divergent": divergent,
+    }
+    return stats, summary
+
+
+def _sample_rows(rows: Iterable[str], k: int | None, seed: int = 42) -> list[str]:
+    """k verilirse rezervuar örnekleme (tek geçiş, sabit bellek); yoksa hepsi."""
+    if not k:
+        return list(rows)
+    rng = random.Random(seed)
+    sample: list[str] = []
+    for i, r in enumerate(rows):
+        if i < k:
+            sample.append(r)
+        else:
+            j = rng.randint(0, i)
+            if j < k:
+                sample[j] = r
+    return sample
+
+
+def profile_file(input_path, config_path, report_path, sample: int | None = None, seed: int = 42):
+    """CSV'nin 'address' kolonunda kural profili çıkarır, süreye göre sıralı CSV yazar."""
+    cfg = load_cfg(config_path)
+    with _open_read_text(input_path) as f_in:
+        r = csv.DictReader(f_in)
+        r.fieldnames = [(fn or "").lstrip("\ufeff").strip() for fn in (r.fieldnames or [])]
+        texts = _sample_rows(((row.get("address") or "").strip() for row in r), sample, seed)
+
+    stats, summary = profile_rules(texts, cfg)
+
+    dst = Path(report_path)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    rows = [st.as_row() for st in stats]
+    with dst.open("w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=list(RuleStat("", 0, "").as_row().keys()))
+        w.writeheader()
+        w.writerows(rows)
+
+    print(f"[profile] {summary}")
+    for row in rows[:10]:
+        print(
+            f"  {row['step']:<14} {row['rule'][:40]:<40} "
+            f"{row['total_ms']:>10.1f} ms  match={row['match_rate']:.3f}  {row['error']}"
+        )
+    print(f"[profile] wrote -> {dst}  (config={config_path})")
+    return stats, summary
 
 
 # --------------------------------
@@ -179,11 +512,22 @@ def normalize_address(input_path, output_path, config_path):
 def _parse_args():
     p = argparse.ArgumentParser()
     p.add_argument("--input", required=True)
-    p.add_argument("--output", required=True)
+    p.add_argument("--output", help="Normalize edilmiş CSV (profil modunda gerekmez)")
     p.add_argument("--config", required=True)
-    return p.parse_args()
+    p.add_argument("--cache", default=None, help="Kalıcı normalize cache (SQLite)")
+    p.add_argument("--profile", action="store_true", help="Kural bazlı profil raporu üret")
+    p.add_argument("--report", default="normalize_profile.csv", help="Profil raporu (CSV)")
+    p.add_argument("--sample", type=int, default=None, help="Profil için örnek satır sayısı")
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+    if not args.profile and not args.output:
+        p.error("--output gerekli (ya da --profile kullanın)")
+    return args
 
 
 if __name__ == "__main__":
     args = _parse_args()
-    normalize_address(args.input, args.output, args.config)
+    if args.profile:
+        profile_file(args.input, args.config, args.report, sample=args.sample, seed=args.seed)
+    else:
+        normalize_address(args.input, args.output, args.config, cache_path=args.cache)
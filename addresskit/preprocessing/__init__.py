@@ -1 +1,23 @@
-from .normalize_and_parse import normalize_and_parse
+# alt modüller ilk erişimde yüklenir (import süresi: bkz. addresskit.utils.startup)
+_EXPORTS = {
+    "normalize_and_parse": ".normalize_and_parse",
+    "ParsedAddress": ".batch",
+    "ParsedBatch": ".batch",
+    "parse_many": ".batch",
+    "ParseExecutor": ".executor",
+    "ParsedWriter": ".parsed_store",
+    "read_parsed": ".parsed_store",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    mod = _EXPORTS.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(mod, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Toplu (kolon bazlı) parse API'si.
+
+    batch = parse_many(texts, cache=cache, n_jobs=4)
+    df = batch.to_frame(fill="")      # tek adımda DataFrame
+    batch.normalized[i], batch["mahalle"][i], batch.row(i).sokak
+
+Sonuç satır başına dict yerine bir `normalized` listesi + parça başına bir
+kolon tutar; eksik parçalar None'dır. Metinler `chunk_size`'lık parçalar
+halinde işlenir; n_jobs > 1 ise parçalar süreç havuzunda paralel parse edilir.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from addresskit.utils.cache import ParseCache, cached_map
+from .executor import DEFAULT_CHUNK, ParseExecutor
+from .pipeline import _parse_uncached
+
+ParseFn = Callable[[str], Tuple[str, Dict[str, Any]]]
+
+PART_KEYS: Tuple[str, ...] = (
+    "mahalle", "cadde", "sokak", "no", "daire", "kat",
+    "bina_adı", "mevkii", "il", "ilçe", "_confidence",
+)
+
+# parça anahtarı -> ParsedAddress alanı (ASCII öznitelik adları)
+_ATTR = {"bina_adı": "bina_adi", "ilçe": "ilce", "_confidence": "confidence"}
+
+
+class ParsedAddress:
+    """Tek satırlık kompakt kayıt (dict yerine __slots__)."""
+
+    __slots__ = (
+        "normalized", "mahalle", "cadde", "sokak", "no", "daire", "kat",
+        "bina_adi", "mevkii", "il", "ilce", "confidence",
+    )
+
+    def __init__(self, normalized: str = "", **fields: Any):
+        self.normalized = normalized
+        for name in self.__slots__[1:]:
+            setattr(self, name, fields.get(name))
+
+    def __getitem__(self, key: str) -> Any:
+        return getattr(self, _ATTR.get(key, key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        v = getattr(self, _ATTR.get(key, key), None)
+        return default if v is None else v
+
+    def to_dict(self) -> Dict[str, Any]:
+        """normalize_and_parse + postprocess_parts biçiminde parça sözlüğü."""
+        return {k: self[k] for k in PART_KEYS if self[k] is not None}
+
+    def __repr__(self) -> str:
+        body = ", ".join(
+            f"{n}={getattr(self, n)!r}" for n in self.__slots__ if getattr(self, n) is not None
+        )
+        return f"ParsedAddress({body})"
+
+
+class ParsedBatch:
+    """Kolon bazlı parse sonucu: normalized listesi + parça başına bir kolon."""
+
+    __slots__ = ("keys", "normalized", "columns")
+
+    def __init__(self, keys: Sequence[str] = PART_KEYS):
+        self.keys = tuple(keys)
+        self.normalized: List[str] = []
+        self.columns: Dict[str, List[Any]] = {k: [] for k in self.keys}
+
+    def extend(self, pairs: Sequence[Sequence[Any]]) -> None:
+        """(normalized, parts) çiftlerini kolonlara ekler."""
+        self.normalized.extend(p[0] for p in pairs)
+        dicts = [p[1] for p in pairs]
+        for k, col in self.columns.items():
+            col.extend([d.get(k) for d in dicts])
+
+    def __len__(self) -> int:
+        return len(self.normalized)
+
+    def __getitem__(self, key: str) -> List[Any]:
+        if key == "normalized":
+            return self.normalized
+        return self.columns[key]
+
+    def row(self, i: int) -> ParsedAddress:
+        fields = {_ATTR.get(k, k): col[i] for k, col in self.columns.items()}
+        return ParsedAddress(self.normalized[i], **fields)
+
+    def __iter__(self) -> Iterator[ParsedAddress]:
+        return (self.row(i) for i in range(len(self)))
+
+    def parts(self, i: int) -> Dict[str, Any]:
+        """i. satırın parça sözlüğü (eksikler atlanır)."""
+        return {k: col[i] for k, col in self.columns.items() if col[i] is not None}
+
+    def to_frame(self, index=None, fill: Any = None, normalized_col: str = "normalized"):
+        """Tek adımda DataFrame; fill verilirse eksik parçalar onunla doldurulur."""
+        import pandas as pd
+
+        data: Dict[str, List[Any]] = {normalized_col: self.normalized}
+        if fill is None:
+            data.update(self.columns)
+        else:
+            data.update(
+                {k: [fill if v is None else v for v in col] for k, col in self.columns.items()}
+            )
+        return pd.DataFrame(data, index=index)
+
+    def __repr__(self) -> str:
+        return f"ParsedBatch(rows={len(self)}, keys={list(self.keys)})"
+
+
+def _parse_chunk(texts: List[str], fn: ParseFn) -> list:
+    return [fn(t) for t in texts]
+
+
+def parse_many(
+    texts: Sequence[Any],
+    cache: Optional[ParseCache] = None,
+    *,
+    parse_fn: Optional[ParseFn] = None,
+    keys: Sequence[str] = PART_KEYS,
+    chunk_size: int = DEFAULT_CHUNK,
+    n_jobs: int = 1,
+    executor: Optional[ParseExecutor] = None,
+) -> ParsedBatch:
+    """
+    texts'i parse edip kolon bazlı ParsedBatch döndürür (sıra korunur).
+
+    parse_fn varsayılan olarak normalize_and_parse + postprocess_parts'tır;
+    başka bir `raw -> (normalized, parts)` fonksiyonu (süreç havuzu için
+    modül seviyesinde tanımlı olmalı) ve onun anahtarları verilebilir.
+    cache verilirse yalnızca cache'te olmayan metinler hesaplanır.
+    executor verilirse (ör. dosya parça parça işlenirken tek havuz) o
+    kullanılır ve kapatılmaz; n_jobs yok sayılır.
+    """
+    texts = ["" if t is None else str(t) for t in texts]
+    fn = parse_fn or _parse_uncached
+    chunk_size = max(1, int(chunk_size))
+    ex = executor or ParseExecutor(n_jobs)
+    batch = ParsedBatch(keys)
+    # bellek sınırı: cache'e bir seferde en fazla workers * chunk_size satır
+    window = chunk_size * ex.workers
+    try:
+        for start in range(0, len(texts), window):
+            part = texts[start : start + window]
+            batch.extend(cached_map(part, lambda lst: ex.map(_parse_chunk, lst, fn, chunk_size=chunk_size), cache))
+    finally:
+        if ex is not executor:
+            ex.close()
+    return batch
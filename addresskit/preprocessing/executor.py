@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Parse / etiketleme için ortak süreç havuzu.
+
+Saf Python parse işi thread'lerde GIL yüzünden seri çalışır; burada işler
+parça (chunk) halinde süreçlere dağıtılır, sonuçlar girdi sırasıyla döner ve
+aynı anda en fazla `2 * workers` parça uçuşta olur (bellek sınırlı).
+Havuz ilk çok parçalı işte açılır; aynı executor birden çok dosya/çağrı
+boyunca tekrar kullanılabilir.
+
+    with ParseExecutor(workers=-1, progress=True) as ex:
+        for res in ex.map_chunks(_parse_chunk, chunks, fn):
+            ...
+        batch = parse_many(texts, cache, executor=ex)
+
+workers: 1 = seri, -1 = bütün çekirdekler, -2 = biri hariç ...
+"""
+from __future__ import annotations
+
+import os
+from collections import deque
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+
+DEFAULT_CHUNK = 5000
+PROGRESS_EVERY = 5.0  # saniye
+
+
+def n_workers(n_jobs: Optional[int]) -> int:
+    """n_jobs (joblib gibi: -1 = tüm çekirdekler) -> işçi sayısı."""
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
+
+
+def chunked(items: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    size = max(1, int(size))
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+class ParseExecutor:
+    """Sıralı, parça bazlı süreç havuzu (+ ilerleme raporu)."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = 1,
+        *,
+        progress: bool = False,
+        label: str = "parse",
+    ):
+        self.workers = n_workers(workers)
+        self.progress = progress
+        self.label = label
+        self.done = 0  # işlenen satır (tüm çağrılar boyunca)
+        self._pool = None
+        self._t0 = perf_counter()
+        self._last = self._t0
+
+    @property
+    def parallel(self) -> bool:
+        return self.workers > 1
+
+    def _get_pool(self):
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(self.workers)
+        return self._pool
+
+    def _tick(self, n: int) -> None:
+        self.done += n
+        if not self.progress:
+            return
+        now = perf_counter()
+        if now - self._last >= PROGRESS_EVERY:
+            self._last = now
+            rate = self.done / max(now - self._t0, 1e-9)
+            print(f"[INFO] {self.label}: {self.done} satır ({rate:.0f} satır/s, workers={self.workers})", flush=True)
+
+    def map_chunks(self, fn: Callable[..., Any], chunks: Iterable[Sequence[Any]], *args: Any) -> Iterator[Any]:
+        """
+        Her parça için fn(chunk, *args) sonucunu girdi sırasıyla üretir.
+        fn ve args süreçlere gönderileceği için pickle edilebilir
+        (modül seviyesinde tanımlı) olmalıdır.
+        """
+        if not self.parallel:
+            for c in chunks:
+                res = fn(c, *args)
+                self._tick(len(c))
+                yield res
+            return
+        pool = self._get_pool()
+        pending: deque = deque()
+        for c in chunks:
+            pending.append((len(c), pool.submit(fn, c, *args)))
+            if len(pending) >= 2 * self.workers:
+                n, fut = pending.popleft()
+                res = fut.result()
+                self._tick(n)
+                yield res
+        while pending:
+            n, fut = pending.popleft()
+            res = fut.result()
+            self._tick(n)
+            yield res
+
+    def map(
+        self, fn: Callable[..., List[Any]], items: Sequence[Any], *args: Any, chunk_size: int = DEFAULT_CHUNK
+    ) -> List[Any]:
+        """items'ı chunk_size'lık parçalara bölüp fn(chunk, *args) listelerini sırayla birleştirir."""
+        if len(items) <= chunk_size:  # tek parça: havuza göndermeye değmez
+            res = fn(items, *args)
+            self._tick(len(items))
+            return res
+        out: List[Any] = []
+        for res in self.map_chunks(fn, chunked(items, chunk_size), *args):
+            out.extend(res)
+        return out
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "ParseExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"ParseExecutor(workers={self.workers}, done={self.done})"
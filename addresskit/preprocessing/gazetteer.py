@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+İl / ilçe / mahalle gazetteer'ı.
+
+data/raw/turkiye_posta_hiyerarsi.json ({il: {ilçe: {mahalle: ...} | [mahalle, ...]}})
+içindeki bütün adlar (çok kelimeli adlar ve aksansız varyantları dahil) token
+düzeyinde tek bir Aho-Corasick otomatına derlenir; bir adresteki bütün
+gazetteer eşleşmeleri tek geçişte bulunur. Dosya yoksa 81 il + bilinen birkaç
+ilçeden oluşan gömülü liste kullanılır (`complete=False`).
+
+Parser'lar, bloklama ve weak labeling aynı nesneyi `load_gazetteer()` ile paylaşır.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+HIER_PATH = ROOT / "data" / "raw" / "turkiye_posta_hiyerarsi.json"
+
+IL, ILCE, MAHALLE = "il", "ilce", "mahalle"
+
+_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_TOKEN_RE = re.compile(r"[^\W_]+(?:[-'][^\W_]+)*")
+# mahalle adlarının sonundaki tür ekleri (adreste ayrı anahtar kelime olarak geçer)
+_MAHALLE_SUFFIXES = {"mahallesi", "mahalle", "mah", "mh"}
+
+# gömülü yedek: 81 il (+ yaygın kısa adlar) ve parser'ların eski ilçe listeleri
+BUILTIN_ILS = (
+    "adana", "adıyaman", "afyonkarahisar", "ağrı", "aksaray", "amasya", "ankara", "antalya",
+    "ardahan", "artvin", "aydın", "balıkesir", "bartın", "batman", "bayburt", "bilecik",
+    "bingöl", "bitlis", "bolu", "burdur", "bursa", "çanakkale", "çankırı", "çorum",
+    "denizli", "diyarbakır", "düzce", "edirne", "elazığ", "erzincan", "erzurum", "eskişehir",
+    "gaziantep", "giresun", "gümüşhane", "hakkari", "hatay", "ığdır", "isparta", "istanbul",
+    "izmir", "kahramanmaraş", "karabük", "karaman", "kars", "kastamonu", "kayseri", "kilis",
+    "kırıkkale", "kırklareli", "kırşehir", "kocaeli", "konya", "kütahya", "malatya", "manisa",
+    "mardin", "mersin", "muğla", "muş", "nevşehir", "niğde", "ordu", "osmaniye", "rize",
+    "sakarya", "samsun", "şanlıurfa", "siirt", "sinop", "şırnak", "sivas", "tekirdağ",
+    "tokat", "trabzon", "tunceli", "uşak", "van", "yalova", "yozgat", "zonguldak",
+)
+BUILTIN_IL_ALIASES = {
+    "afyon": "afyonkarahisar", "maraş": "kahramanmaraş", "k maraş": "kahramanmaraş",
+    "urfa": "şanlıurfa", "antep": "gaziantep", "içel": "mersin",
+}
+BUILTIN_ILCES = {
+    "fethiye": "muğla", "bodrum": "muğla", "çeşme": "izmir", "bornova": "izmir",
+    "konak": "izmir", "buca": "izmir", "karabağlar": "izmir", "karşıyaka": "izmir",
+    "menemen": "izmir", "bayraklı": "izmir", "kartal": "istanbul", "kadıköy": "istanbul",
+    "üsküdar": "istanbul", "ataşehir": "istanbul", "mamak": "ankara", "keçiören": "ankara",
+    "çankaya": "ankara", "yenimahalle": "ankara", "tepebaşı": "eskişehir",
+    "odunpazarı": "eskişehir", "tarsus": "mersin", "çamlıyayla": "mersin",
+    "tekkeköy": "samsun", "muratpaşa": "antalya", "kepez": "antalya", "seyhan": "adana",
+    "yüreğir": "adana",
+}
+
+
+def tr_lower(s: str) -> str:
+    return str(s).replace("I", "ı").replace("İ", "i").lower().replace("\u0307", "")
+
+
+@lru_cache(maxsize=1 << 16)
+def fold(token: str) -> str:
+    """Aksanları katlar: 'muğla' -> 'mugla', 'ığdır' -> 'igdir'."""
+    return tr_lower(token).translate(_FOLD)
+
+
+def tokenize(text: str) -> List[str]:
+    """Harf/rakam token'ları ('/', nokta, virgül vb. ayırıcıdır)."""
+    return _TOKEN_RE.findall(tr_lower(text))
+
+
+class Entry(NamedTuple):
+    level: str  # il | ilce | mahalle
+    name: str  # kanonik (küçük harf) ad
+    il: str
+    ilce: str
+
+
+class Hit(NamedTuple):
+    start: int  # token aralığı [start, end)
+    end: int
+    entries: Tuple[Entry, ...]
+
+    @property
+    def levels(self) -> frozenset:
+        return frozenset(e.level for e in self.entries)
+
+
+class Place(NamedTuple):
+    il: str = ""
+    ilce: str = ""
+    mahalle: str = ""
+    il_at: int = -1  # il eşleşmesinin başladığı token (-1: yok)
+
+    def as_parts(self) -> Dict[str, str]:
+        """Parser sözlüğü biçimi ('il', 'ilçe', 'mahalle'); boşlar atlanır."""
+        out = {"il": self.il, "ilçe": self.ilce, "mahalle": self.mahalle}
+        return {k: v for k, v in out.items() if v}
+
+
+def _name_tokens(name: str, level: str) -> List[str]:
+    toks = tokenize(name)
+    if level == MAHALLE and len(toks) > 1 and toks[-1] in _MAHALLE_SUFFIXES:
+        toks = toks[:-1]
+    return toks
+
+
+def _child_names(value: Any) -> Iterator[Tuple[str, Any]]:
+    """Hiyerarşi düğümünün çocukları: dict anahtarları ya da liste elemanları."""
+    if isinstance(value, dict):
+        yield from value.items()
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            if isinstance(item, str):
+                yield item, None
+            elif isinstance(item, dict):
+                name = item.get("mahalle") or item.get("ad") or item.get("name")
+                if isinstance(name, str):
+                    yield name, None
+
+
+class Gazetteer:
+    """Token düzeyinde Aho-Corasick otomatı (anahtarlar aksanı katlanmış token'lar)."""
+
+    def __init__(self, complete: bool = False, source: str = "builtin"):
+        self.complete = complete
+        self.source = source
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Entry]] = [[]]
+        self._emit: List[Tuple[Tuple[int, Tuple[Entry, ...]], ...]] = []
+        self._single: Dict[str, set] = {IL: set(), ILCE: set(), MAHALLE: set()}
+        self._counts = {IL: 0, ILCE: 0, MAHALLE: 0}
+        self._fingerprint = hashlib.blake2b(digest_size=8)
+        self._built = False
+
+    # ---------- kurulum ----------
+    def add(self, name: str, level: str, il: str = "", ilce: str = "") -> None:
+        toks = _name_tokens(name, level)
+        if not toks:
+            return
+        canon = " ".join(toks)
+        entry = Entry(level, canon, il or (canon if level == IL else ""), ilce or (canon if level == ILCE else ""))
+        self._insert([fold(t) for t in toks], entry)
+        self._counts[level] += 1
+        self._fingerprint.update(repr(entry).encode("utf-8"))
+
+    def add_alias(self, alias: str, entry: Entry) -> None:
+        self._insert([fold(t) for t in tokenize(alias)], entry)
+        self._fingerprint.update(f"{alias}->{entry!r}".encode("utf-8"))
+
+    def _insert(self, keys: List[str], entry: Entry) -> None:
+        node = 0
+        for k in keys:
+            nxt = self._goto[node].get(k)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][k] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if entry not in self._out[node]:
+            self._out[node].append(entry)
+        if len(keys) == 1:
+            self._single[entry.level].add(keys[0])
+        self._built = False
+
+    def _build(self) -> None:
+        """Başarısızlık bağlantıları + her düğümün (uzunluk, girdiler) çıktı listesi."""
+        depth = [0] * len(self._goto)
+        emit: List[list] = [[] for _ in self._goto]
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            depth[child] = 1
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for k, child in self._goto[node].items():
+                depth[child] = depth[node] + 1
+                f = self._fail[node]
+                while f and k not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(k, 0)
+                queue.append(child)
+        # BFS sırası: fail düğümünün çıktısı kendisinden önce hazır olur
+        order = sorted(range(len(self._goto)), key=depth.__getitem__)
+        for node in order:
+            own = [(depth[node], tuple(self._out[node]))] if self._out[node] else []
+            emit[node] = own + (list(emit[self._fail[node]]) if node else [])
+        self._emit = [tuple(e) for e in emit]
+        self._built = True
+
+    @classmethod
+    def from_hierarchy(cls, hier: Dict[str, Any], source: str = "hierarchy") -> "Gazetteer":
+        gz = cls(complete=True, source=source)
+        for il, ilceler in hier.items():
+            il_c = " ".join(tokenize(il))
+            gz.add(il, IL)
+            for ilce, mahalleler in _child_names(ilceler):
+                ilce_c = " ".join(tokenize(ilce))
+                gz.add(ilce, ILCE, il=il_c)
+                for mah, _ in _child_names(mahalleler):
+                    gz.add(mah, MAHALLE, il=il_c, ilce=ilce_c)
+        gz._add_builtin_aliases()
+        return gz
+
+    @classmethod
+    def builtin(cls) -> "Gazetteer":
+        gz = cls(complete=False, source="builtin")
+        for il in BUILTIN_ILS:
+            gz.add(il, IL)
+        for ilce, il in BUILTIN_ILCES.items():
+            gz.add(ilce, ILCE, il=il)
+        gz._add_builtin_aliases()
+        return gz
+
+    def _add_builtin_aliases(self) -> None:
+        for alias, il in BUILTIN_IL_ALIASES.items():
+            self.add_alias(alias, Entry(IL, il, il, ""))
+
+    # ---------- sorgu ----------
+    def find(self, tokens: Sequence[str]) -> List[Hit]:
+        """Bütün eşleşmeler (iç içe/örtüşenler dahil), tek geçiş; (start, -uzunluk) sıralı."""
+        if not self._built:
+            self._build()
+        goto, fail, emit = self._goto, self._fail, self._emit
+        hits: List[Hit] = []
+        state = 0
+        for i, tok in enumerate(tokens):
+            k = fold(tok)
+            while state and k not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(k, 0)
+            for length, entries in emit[state]:
+                hits.append(Hit(i - length + 1, i + 1, entries))
+        hits.sort(key=lambda h: (h.start, h.start - h.end))
+        return hits
+
+    def spans(self, tokens: Sequence[str]) -> List[Hit]:
+        """Örtüşmeyen en-soldaki-en-uzun eşleşmeler (B-/I- etiketleme için)."""
+        out: List[Hit] = []
+        pos = 0
+        for h in self.find(tokens):
+            if h.start >= pos:
+                out.append(h)
+                pos = h.end
+        return out
+
+    def locate(self, tokens: Sequence[str], with_mahalle: bool = False) -> Place:
+        """
+        Hiyerarşiyle tutarlı (il, ilçe[, mahalle]) tahmini. Adreslerde il sonda
+        yazıldığı için son eşleşmeler önceliklidir; ilçe seçilen ile ait olmalıdır
+        (tek ebeveynli ilçeden il de çıkarılır).
+        """
+        hits = self.find(tokens)
+        il = ""
+        il_at = -1
+        il_span = None
+        for h in hits:
+            for e in h.entries:
+                if e.level == IL and h.start >= il_at:
+                    il, il_at, il_span = e.name, h.start, (h.start, h.end)
+
+        ilce = ""
+        ilce_at = -1
+        parents: set = set()
+        for h in hits:
+            if (h.start, h.end) == il_span:
+                continue
+            cands = [e for e in h.entries if e.level == ILCE and (not il or e.il == il)]
+            if cands and h.start >= ilce_at:
+                ilce, ilce_at = cands[0].name, h.start
+                parents = {e.il for e in cands}
+        if ilce and not il and len(parents) == 1:
+            il = parents.pop()
+
+        mahalle = ""
+        if with_mahalle:
+            for h in hits:
+                for e in h.entries:
+                    if e.level == MAHALLE and (not il or e.il == il) and (not ilce or e.ilce == ilce):
+                        mahalle = e.name
+                        break
+        return Place(il, ilce, mahalle, il_at)
+
+    def level_of(self, token: str) -> Tuple[str, ...]:
+        """Tek token'lık ad olarak hangi seviyelerde geçtiği."""
+        k = fold(token)
+        return tuple(lv for lv in (IL, ILCE, MAHALLE) if k in self._single[lv])
+
+    def is_il(self, token: str) -> bool:
+        return fold(token) in self._single[IL]
+
+    def is_ilce(self, token: str) -> bool:
+        return fold(token) in self._single[ILCE]
+
+    def fingerprint(self) -> str:
+        """İçerik özeti (parse cache anahtarına girer)."""
+        return f"{self.source}:{self._fingerprint.hexdigest()}"
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counts, "states": len(self._goto)}
+
+    def __repr__(self) -> str:
+        return f"Gazetteer(source={self.source!r}, complete={self.complete}, {self.stats()})"
+
+
+def _read_hierarchy(path: Path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=4)
+def load_gazetteer(path: Optional[str] = None) -> Gazetteer:
+    """Süreç başına bir kez derlenen gazetteer (dosya yoksa gömülü liste)."""
+    p = Path(path) if path else HIER_PATH
+    if p.exists():
+        return Gazetteer.from_hierarchy(_read_hierarchy(p), source=p.name)
+    return Gazetteer.builtin()
+
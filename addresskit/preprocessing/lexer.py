@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Tek geçişli adres lexer'ı.
+
+clean_text çıktısı bir kez token'lara bölünür; her farklı token'ın tipi ve
+özellikleri (rakam içeriyor mu, isim karakterlerinden mi oluşuyor...) süreç
+genelinde önbellekte tutulur. normalize_and_parse ve postprocess_parts aynı
+`Lexed` nesnesini paylaşır; metin her adımda yeniden bölünmez/regex'ten geçmez.
+İl tespiti (CITY tipi ve `place()`) gazetteer modülünden gelir.
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .gazetteer import Place, load_gazetteer
+
+# token tipleri
+KEYWORD = "keyword"
+NUMBER = "number"  # 12, 12a
+SLASH_NUMBER = "slash_number"  # 12/3, 12/3a
+CITY = "city"
+NAME = "name"
+SLASH = "slash"
+OTHER = "other"
+
+KEYWORDS = frozenset({
+    "mahalle", "cadde", "sokak", "bulvar", "no", "daire", "kat", "mevkii",
+    "apartman", "residence", "rezidans", "blok", "işhanı", "plaza", "hotel",
+    "otel", "site", "tower",
+})
+
+_RE_NUMBER = re.compile(r"\d+[a-z]?")
+_RE_SLASH_NUMBER = re.compile(r"\d+/\d+[a-z]?")
+_RE_WORD = re.compile(r"[a-zçğıöşü\-]+")
+_RE_ALPHA = re.compile(r"[a-zçğıöşü]+")
+# normalize_and_parse'ın isim sınıfı (tarihsel olarak 'ı' içermez)
+_NAME_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzğüşiöç0123456789-")
+
+
+class TokenInfo(NamedTuple):
+    kind: str
+    has_digit: bool  # herhangi bir karakter str.isdigit()
+    is_word: bool  # [a-zçğıöşü\-]+
+    is_alpha: bool  # [a-zçğıöşü]+
+    name_chars: bool  # yalnız [a-zğüşiöç0-9\-]
+
+
+@lru_cache(maxsize=1 << 16)
+def classify(tok: str) -> TokenInfo:
+    """Token'ın tipi ve özellikleri (token metni başına bir kez hesaplanır)."""
+    is_word = _RE_WORD.fullmatch(tok) is not None
+    if tok in KEYWORDS:
+        kind = KEYWORD
+    elif load_gazetteer().is_il(tok):
+        kind = CITY
+    elif tok == "/":
+        kind = SLASH
+    elif _RE_NUMBER.fullmatch(tok):
+        kind = NUMBER
+    elif _RE_SLASH_NUMBER.fullmatch(tok):
+        kind = SLASH_NUMBER
+    elif is_word:
+        kind = NAME
+    else:
+        kind = OTHER
+    return TokenInfo(
+        kind,
+        any(ch.isdigit() for ch in tok),
+        is_word,
+        _RE_ALPHA.fullmatch(tok) is not None,
+        all(ch in _NAME_CHARS for ch in tok),
+    )
+
+
+class Lexed:
+    """Normalize edilmiş metnin token'ları + özellikleri + ilk geçiş indeksi."""
+
+    __slots__ = ("text", "tokens", "infos", "_first", "_split", "_place")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens: List[str] = text.split()
+        self.infos: List[TokenInfo] = [classify(t) for t in self.tokens]
+        first: Dict[str, int] = {}
+        for i, t in enumerate(self.tokens):
+            first.setdefault(t, i)
+        self._first = first
+        self._split: Optional[List[str]] = None
+        self._place: Optional[Place] = None
+
+    def index(self, tok: str) -> int:
+        """tok'un ilk geçtiği konum; yoksa -1 (list.index'in O(1) karşılığı)."""
+        return self._first.get(tok, -1)
+
+    def split_tokens(self) -> List[str]:
+        """'/' ayrı token: 'fethiye/muğla' -> ['fethiye', '/', 'muğla'] (10/3 dahil)."""
+        if self._split is None:
+            out: List[str] = []
+            for tok in self.tokens:
+                if "/" in tok and tok != "/":
+                    for j, seg in enumerate(tok.split("/")):
+                        if j:
+                            out.append("/")
+                        if seg:
+                            out.append(seg)
+                else:
+                    out.append(tok)
+            self._split = out
+        return self._split
+
+    def place(self) -> Place:
+        """Gazetteer'dan il/ilçe tahmini (adres başına tek geçiş, parser ve postprocess paylaşır)."""
+        if self._place is None:
+            self._place = load_gazetteer().locate(self.split_tokens())
+        return self._place
+
+    def kinds(self) -> List[str]:
+        return [info.kind for info in self.infos]
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __iter__(self) -> Iterator[Tuple[str, TokenInfo]]:
+        return iter(zip(self.tokens, self.infos))
+
+    def __repr__(self) -> str:
+        return "Lexed(%s)" % " ".join(f"{t}:{i.kind}" for t, i in self)
+
+
+def lex(text: str) -> Lexed:
+    return Lexed(text)
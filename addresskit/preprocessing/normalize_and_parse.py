@@ -7,6 +7,12 @@ import re
 import unicodedata
 from typing import Dict, Tuple
 
+from .lexer import Lexed, lex
+from .rewrite import Rewriter, rules_from_regex_table
+
+# çıktı (normalized/parts) değişirse artır; kalıcı parse cache anahtarına girer
+PARSER_VERSION = "2"
+
 # yaygın kısaltmaların açılımları (dikkat: 'd' sadece d: / d. olarak genişletilir)
 ABBR = {
     r"\bmah\.?\b": "mahalle",
@@ -31,25 +37,24 @@ ABBR = {
     r"\bmevkii\b": "mevkii",
 }
 
-CITY_HINTS = {
-    "istanbul","ankara","izmir","bursa","antalya","muğla","aydın","tekirdağ","kocaeli",
-    "konya","adana","mersin","samsun","eskişehir","trabzon","kayseri","gaziantep"
-}
-DISTRICT_HINTS = {
-    "fethiye","çeşme","bodrum","kartal","kadıköy","üsküdar","ataşehir","bornova",
-    "konak","mamak","keçiören","tepebaşı","odunpazarı","tarsus","tekkeköy"
-}
+# ABBR tablosu sıralı anlamıyla korunur: çakışan kurallar ayrı geçişe düşer (20 regex -> 4 tarama)
+_ABBR_REWRITER = Rewriter(
+    rules_from_regex_table(ABBR.items()), "normalize_and_parse.ABBR", split_conflicts=True
+)
+
+_RE_SPACES   = re.compile(r"\s+")
+# kelime içi 10/3 vb. kalsın; virgül/nokta çoğunlukla boşluk olsun (tek tarama)
+_RE_PUNCT    = re.compile(r"(?<=\D)[\.,](?=[\s\S])|(?<=\d),(?=\D)|[;:|]+")
+_RE_D_NUM    = re.compile(r"\bd\s+(?=\d)")
+_RE_NO_NUM   = re.compile(r"\bno\s*[:\-]?\s*(\d+)")
+_RE_DOT_NAME = re.compile(r"(\d+)\.(sokak|cadde|mahalle)\b")
+_RE_SLASH    = re.compile(r"(?<!\d)/(?!\d)")
 
 def _normalize_spaces(text: str) -> str:
-    return re.sub(r"\s+", " ", text).strip()
+    return _RE_SPACES.sub(" ", text).strip()
 
 def _strip_punct_but_keep_separators(text: str) -> str:
-    # kelime içi 10/3 vb. kalsın; virgül/nokta çoğunlukla boşluk olsun
-    text = re.sub(r"(?<=\D)[\.,](?=\D)", " ", text)
-    text = re.sub(r"(?<=\D)[\.,](?=\d)", " ", text)
-    text = re.sub(r"(?<=\d)[,](?=\D)", " ", text)
-    text = re.sub(r"[;:|]+", " ", text)
-    return text
+    return _RE_PUNCT.sub(" ", text)
 
 def clean_text(s: str) -> str:
     # None/NaN koruması + TR-safe lower
@@ -58,20 +63,20 @@ def clean_text(s: str) -> str:
     s = unicodedata.normalize("NFKC", s).lower().replace("\u0307", "")
 
     s = _strip_punct_but_keep_separators(s)
-
-    for pat, repl in ABBR.items():
-        s = re.sub(pat, repl, s)
+    s = _ABBR_REWRITER(s)
 
     # 'd 1' → 'daire 1' (yalnız d + sayı; "doria" etkilenmez)
-    s = re.sub(r"\bd\s+(?=\d)", "daire ", s)
+    s = _RE_D_NUM.sub("daire ", s)
     # güvenlik: no:15 / no15 → no 15
-    s = re.sub(r"\bno\s*[:\-]?\s*(\d+)", r"no \1", s)
+    s = _RE_NO_NUM.sub(r"no \1", s)
 
     # 864.sokak → 864 sokak vb.
-    s = re.sub(r"(\d+)\.(sokak|cadde|mahalle)\b", r"\1 \2", s)
+    if "." in s:
+        s = _RE_DOT_NAME.sub(r"\1 \2", s)
 
     # sayi/harf ve slash'lı daireleri koru; diğer slash etrafına boşluk
-    s = re.sub(r"(?<!\d)/(?!\d)", " / ", s)
+    if "/" in s:
+        s = _RE_SLASH.sub(" / ", s)
 
     s = _normalize_spaces(s)
     return s
@@ -81,31 +86,59 @@ RE_NO      = re.compile(r"\bno\s*([0-9]+[a-z]?(?:/[0-9a-z]+)?)\b")
 RE_DAIRE   = re.compile(r"\bdaire\s*([0-9a-z]+)\b")
 RE_KAT     = re.compile(r"\bkat\s*([0-9a-z]+)\b")
 RE_NUM_SOK = re.compile(r"\b(\d+)\s+sokak\b", re.IGNORECASE)
-
-def _extract_following_name(text: str, anchor: str) -> str:
-    pat = rf"{anchor}\s+([a-zğüşiöç0-9 \-]+?)\s+(?=(mahalle|cadde|sokak|bulvar|no|daire|kat|mevkii|apartman|hotel|otel|plaza|blok|işhanı|iş hanı|$))"
-    m = re.search(pat, text)
-    return _normalize_spaces(m.group(1)) if m else ""
-
-def _guess_city_district(text: str) -> Dict[str, str]:
-    il = ilce = ""
-    pieces = [ _normalize_spaces(x) for x in re.split(r"/", text) ]
-    for p in reversed(pieces):
-        toks = set(p.split())
-        if not il and toks & CITY_HINTS:   il   = list(toks & CITY_HINTS)[0]
-        if not ilce and toks & DISTRICT_HINTS: ilce = list(toks & DISTRICT_HINTS)[0]
+RE_MEVKII  = re.compile(r"\b([a-zğüşiöç\-]+)\s+mevkii\b")
+RE_BUILDING = re.compile(r"\b(apartman|residence|rezidans|blok|işhanı|iş hanı|plaza|hotel|otel)\b")
+_RE_NUM_SUFFIX = re.compile(r"\d+[a-z]?")
+_RE_NAME_RUN   = re.compile(r"[a-zğüşiöç\-]+")
+
+# isimli alanın bittiği kelimeler (token bu öneklerden biriyle başlıyorsa)
+_STOP_PREFIXES = (
+    "mahalle","cadde","sokak","bulvar","no","daire","kat","mevkii",
+    "apartman","hotel","otel","plaza","blok","işhanı",
+)
+
+def _extract_following_name(lexed: Lexed, anchor: str) -> str:
+    r"""
+    '<..anchor> <isim...> <durak>' kalıbı: anchor ile biten ilk token'dan sonra,
+    yalnız isim karakterli token'lar; ilk durak kelimesinden önce biter.
+    (eski `anchor\s+([a-zğüşiöç0-9 \-]+?)\s+(?=durak)` regex'inin token karşılığı)
+    """
+    toks, infos = lexed.tokens, lexed.infos
+    n = len(toks)
+    for i in range(n - 2):
+        if not toks[i].endswith(anchor):
+            continue
+        for k in range(i + 1, n - 1):
+            if not infos[k].name_chars:
+                break
+            nxt = toks[k + 1]
+            if nxt.startswith(_STOP_PREFIXES) or (
+                nxt == "iş" and k + 2 < n and toks[k + 2].startswith("hanı")
+            ):
+                return " ".join(toks[i + 1 : k + 1])
+    return ""
+
+def _guess_city_district(lexed: Lexed) -> Dict[str, str]:
+    # gazetteer: bütün il/ilçe adları tek geçişte, ilçe seçilen ile ait olmalı
+    place = lexed.place()
     out = {}
-    if il: out["il"] = il
-    if ilce: out["ilçe"] = ilce
+    if place.il: out["il"] = place.il
+    if place.ilce: out["ilçe"] = place.ilce
     return out
 
 def normalize_and_parse(raw) -> Tuple[str, Dict[str, str]]:
+    normalized, parts, _ = normalize_and_parse_lexed(raw)
+    return normalized, parts
+
+def normalize_and_parse_lexed(raw) -> Tuple[str, Dict[str, str], Lexed]:
+    """normalize_and_parse + token'lar (postprocess_parts(..., lexed=) için)."""
     if raw is None: raw = ""
     txt = clean_text(str(raw))
+    lexed = lex(txt)
     parts: Dict[str, str] = {}
 
     # numaralı alanlar
-    m = RE_NO.search(txt)
+    m = RE_NO.search(txt) if "no" in txt else None
     if m:
         parts["no"] = m.group(1).strip()
         if "/" in parts["no"]:
@@ -113,49 +146,45 @@ def normalize_and_parse(raw) -> Tuple[str, Dict[str, str]]:
             if n.isdigit() and d.isdigit():
                 parts["no"], parts["daire"] = n, d
 
-    m = RE_DAIRE.search(txt)
-    if m and re.fullmatch(r"\d+[a-z]?", m.group(1)):
+    m = RE_DAIRE.search(txt) if "daire" in txt else None
+    if m and _RE_NUM_SUFFIX.fullmatch(m.group(1)):
         parts.setdefault("daire", m.group(1).strip())
 
-    m = RE_KAT.search(txt)
-    if m and re.fullmatch(r"\d+[a-z]?", m.group(1)):
+    m = RE_KAT.search(txt) if "kat" in txt else None
+    if m and _RE_NUM_SUFFIX.fullmatch(m.group(1)):
         parts["kat"] = m.group(1).strip()
 
     # isimli alanlar
-    mah = _extract_following_name(txt, "mahalle")
+    mah = _extract_following_name(lexed, "mahalle")
     if mah: parts["mahalle"] = mah
-    cad = _extract_following_name(txt, "cadde")
+    cad = _extract_following_name(lexed, "cadde")
     if cad: parts["cadde"] = cad
 
     # sokak: sayısal ada öncelik
-    m = RE_NUM_SOK.search(txt)
+    m = RE_NUM_SOK.search(txt) if "sokak" in txt else None
     if m:
         parts["sokak"] = m.group(1)
     else:
-        sok = _extract_following_name(txt, "sokak")
+        sok = _extract_following_name(lexed, "sokak")
         if sok: parts["sokak"] = sok
 
     # mevkii / bina_adı (basit)
-    m = re.search(r"\b([a-zğüşiöç\-]+)\s+mevkii\b", txt)
+    m = RE_MEVKII.search(txt) if "mevkii" in txt else None
     if m:
         parts["mevkii"] = m.group(1)
 
-    m = re.search(r"\b(apartman|residence|rezidans|blok|işhanı|iş hanı|plaza|hotel|otel)\b", txt)
+    m = RE_BUILDING.search(txt)
     if m:
         trigger = m.group(1)
-        left = re.findall(r"[a-zğüşiöç\-]+", txt[:m.start()])
-        name = " ".join(left[-2:] + [trigger]).strip()
-        # başta 'no/sayı' kirlerini temizle
-        name = re.sub(r"^\bno\b\s*\d+[a-z]?\/?\d*\s*", "", name).strip()
-        name = re.sub(r"^\d+[a-z]?\s*", "", name).strip()
-        if name:
-            parts["bina_adı"] = name
+        left = _RE_NAME_RUN.findall(txt, 0, m.start())
+        # parçalar rakam içermez; 'no/sayı' kiri oluşamaz
+        parts["bina_adı"] = " ".join(left[-2:] + [trigger])
 
     # il / ilçe tahmini
-    parts.update(_guess_city_district(txt))
+    parts.update(_guess_city_district(lexed))
 
-    # normalized string (gösterim)
-    normalized = _normalize_spaces(txt)
+    # normalized string (gösterim); clean_text boşlukları zaten sadeleştirdi
+    normalized = txt
 
     # basit güven skoru
     keys = {"mahalle","cadde","sokak","no","daire","kat","bina_adı","mevkii","il","ilçe"}
@@ -165,4 +194,4 @@ def normalize_and_parse(raw) -> Tuple[str, Dict[str, str]]:
     if any(k in parts for k in ("mahalle","cadde","sokak")): score += 0.2
     parts["_confidence"] = round(max(0.0, min(1.0, score)), 2)
 
-    return normalized, parts
+    return normalized, parts, lexed
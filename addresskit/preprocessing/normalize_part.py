@@ -2,6 +2,9 @@
 # -*- coding: utf-8 -*-
 import re
 
+from .gazetteer import load_gazetteer
+from .rewrite import Rewriter, rules_from_regex_table
+
 # --- lowercase (TR) ---
 def tr_lower(s: str) -> str:
     return str(s).replace("I", "ı").replace("İ", "i").lower()
@@ -23,6 +26,8 @@ ABBR_MAP = {
     r"\bk[:\.]?\b": "kat",
     r"\bap?t\.?\b": "apartman",
 }
+# ABBR_MAP'in tek taramalı derlenmiş hali (sıralı uygulamayla aynı sonuç)
+_ABBR_REWRITER = Rewriter(rules_from_regex_table(ABBR_MAP.items()), "ABBR_MAP")
 
 # sınır/boundary anahtarları
 BOUNDARY_WORDS = {
@@ -35,19 +40,9 @@ BOUNDARY_WORDS = {
 # bina adı tetikleyicileri
 BUILDING_TRIGGERS = {"apartman", "apt", "residence", "rezidans", "site", "blok", "plaza", "tower", "işhanı", "işhanı"}
 
-# sık kullanılan iller (kısa liste; istersen genişlet)
-IL_SET = {
-    "adana","adiyaman","afyonkarahisar","ağrı","amasya","ankara","antalya","artvin","aydin","aydın","balıkesir",
-    "bilecik","bingöl","bitlis","bolu","burdur","bursa","çanakkale","canakkale","çankırı","cankiri","çorum","corum",
-    "denizli","diyarbakır","diyarbakir","edirne","elazığ","elazig","erzincan","erzurum","eskişehir","eskisehir",
-    "gaziantep","giresun","gümüşhane","gumushane","hakkari","hatay","ısparta","isparta","mersin","istanbul","izmir",
-    "kars","kastamonu","kayseri","kırklareli","kirklareli","kırşehir","kirsehir","kocaeli","konya","kütahya","kutahya",
-    "malatya","manisa","kahramanmaraş","kahramanmaras","mardin","muğla","mugla","muş","mus","nevşehir","nevsehir",
-    "niğde","nigde","ordu","rize","sakarya","samsun","siirt","sinop","sivas","tekirdağ","tekirdag","tokat","trabzon",
-    "tunceli","şanlıurfa","sanliurfa","uşak","usak","van","yalova","yozgat","zonguldak","karabük","karabuk","kilis",
-    "osmaniye","düzce","duzce","bayburt","ardıhan","ardahan","igdir","iğdır","karaman","kırıkkale","kirikkale","bartın","bartin",
-    "gümüşhane","gumushane"
-}
+# il adları gazetteer'dan (81 il + aksansız varyantlar; hiyerarşi dosyası varsa oradan)
+def _is_il(t: str) -> bool:
+    return load_gazetteer().is_il(t)
 
 def normalize_address(s: str) -> str:
     """Adres metnini normalleştir: TR lower, kısaltma aç, noktalama/boşluk düzelt."""
@@ -56,9 +51,8 @@ def normalize_address(s: str) -> str:
     # virgül/paren -> boşluk
     s = re.sub(r"[(),]", " ", s)
 
-    # kısaltmaları aç (cad., mh., sk. vb.)
-    for pat, rep in ABBR_MAP.items():
-        s = re.sub(pat, rep, s)
+    # kısaltmaları aç (cad., mh., sk. vb.) — tek geçiş
+    s = _ABBR_REWRITER(s)
 
     # "no:15", "kat:2", "daire.3" -> düzgün boşluk
     s = re.sub(r"\b(no|daire|kat)\s*[:\.]?\s*", r"\1 ", s)
@@ -102,7 +96,7 @@ def _extract_il_ilce_from_tail(tokens):
     for t in reversed(tail):
         if "/" in t:
             a, b = [x.strip() for x in t.split("/", 1)]
-            a_ok, b_ok = a in IL_SET, b in IL_SET
+            a_ok, b_ok = _is_il(a), _is_il(b)
             if a_ok and not b_ok:
                 il, ilce = a, ilce or b
                 break
@@ -112,7 +106,7 @@ def _extract_il_ilce_from_tail(tokens):
     # sonra boşlukla ardışık (… fethiye muğla)
     if il is None:
         for i in range(len(tail) - 1, 0, -1):
-            if tail[i] in IL_SET and tail[i-1] not in IL_SET and not _is_number_token(tail[i-1]):
+            if _is_il(tail[i]) and not _is_il(tail[i-1]) and not _is_number_token(tail[i-1]):
                 il, ilce = tail[i], ilce or tail[i-1]
                 break
     return il, ilce
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Kolon bazlı parse çıktısı: her parça ayrı, tipli bir kolon.
+
+Biçim dosya uzantısından seçilir:
+  .parquet          her write() bir satır grubu; il/ilce/mahalle sözlük kodlu
+  .arrow / .feather Arrow IPC dosyası; memory-map ile kopyasız okunur
+  .jsonl            pyarrow yoksa; satır başına düz JSON nesnesi (eksik parçalar yazılmaz)
+
+    with ParsedWriter("train_parsed.parquet") as w:
+        for df in read_csv_chunks(path):
+            batch = parse_many(df["address"].tolist(), cache)
+            w.write(batch, extra={"id": df["id"].tolist()})
+    df = read_parsed("train_parsed.parquet", columns=["id", "il", "ilce"])
+
+Kolon adları ParsedAddress alanlarıdır (bina_adi, ilce, confidence).
+extra kolonları parse kolonlarıyla aynı adı taşıyamaz (ValueError); kaynak
+CSV'deki çakışan kolonlar source_columns() ile src_ önekiyle yeniden adlandırılır.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from .batch import _ATTR, PART_KEYS, ParsedBatch
+
+DICT_COLUMNS = ("il", "ilce", "mahalle")
+FLOAT_COLUMNS = ("confidence",)
+_FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".jsonl": "jsonl"}
+SOURCE_PREFIX = "src_"
+
+
+def has_arrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def default_suffix() -> str:
+    """pyarrow varsa .parquet, yoksa .jsonl."""
+    return ".parquet" if has_arrow() else ".jsonl"
+
+
+def _format_of(path: Path, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    try:
+        return _FORMATS[path.suffix.lower()]
+    except KeyError:
+        raise ValueError(f"bilinmeyen parse çıktısı uzantısı: {path.suffix!r} ({sorted(_FORMATS)})")
+
+
+def parsed_columns(keys: Sequence[str] = PART_KEYS) -> List[str]:
+    """Parse çıktısının yazdığı kolon adları (normalized + parçalar)."""
+    return ["normalized"] + [_ATTR.get(k, k) for k in keys]
+
+
+def source_columns(names: Sequence[Any], keys: Sequence[str] = PART_KEYS) -> Dict[Any, str]:
+    """Kaynak kolon -> çıktı adı; parse kolonlarıyla çakışanlar src_ önekli (il -> src_il)."""
+    taken = set(parsed_columns(keys))
+    out: Dict[Any, str] = {}
+    for c in names:
+        name = str(c)
+        while name in taken:
+            name = SOURCE_PREFIX + name
+        taken.add(name)
+        out[c] = name
+    return out
+
+
+def _batch_columns(batch: ParsedBatch, extra: Optional[Dict[str, Sequence[Any]]]) -> Dict[str, List[Any]]:
+    clash = sorted(set(extra or {}) & set(parsed_columns(batch.keys)))
+    if clash:
+        raise ValueError(f"extra kolonlar parse kolonlarıyla çakışıyor: {clash} (bkz. source_columns)")
+    cols: Dict[str, List[Any]] = {}
+    for k, v in (extra or {}).items():
+        if len(v) != len(batch):
+            raise ValueError(f"extra kolon '{k}' uzunluğu {len(v)} != {len(batch)}")
+        cols[k] = list(v)
+    cols["normalized"] = batch.normalized
+    for k in batch.keys:
+        cols[_ATTR.get(k, k)] = batch[k]
+    return cols
+
+
+class ParsedWriter:
+    """ParsedBatch'leri parça parça aynı dosyaya yazar (bellekte tek parça)."""
+
+    def __init__(self, path, fmt: Optional[str] = None):
+        self.path = Path(path)
+        self.fmt = _format_of(self.path, fmt)
+        if self.fmt != "jsonl" and not has_arrow():
+            raise ImportError(f"{self.fmt} çıktısı için pyarrow gerekli (ya da .jsonl kullanın)")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.rows = 0
+        self._schema = None
+        self._writer = None
+        self._file = None
+        # sözlük kolonları için dosya geneli sözlük: her parçanın sözlüğü öncekinin uzantısı.
+        # IPC dosyası boş sözlükten sonra gelen sözlüğü delta değil değiştirme sayıyor -> "" ile başla
+        seed = {"": 0} if self.fmt == "arrow" else {}
+        self._vocab: Dict[str, Dict[str, int]] = {c: dict(seed) for c in DICT_COLUMNS}
+
+    # ---------- arrow ----------
+    def _dict_array(self, name: str, values: List[Any]):
+        import pyarrow as pa
+
+        vocab = self._vocab[name]
+        idx = [None if v is None else vocab.setdefault(v, len(vocab)) for v in values]
+        return pa.DictionaryArray.from_arrays(
+            pa.array(idx, type=pa.int32()), pa.array(list(vocab), type=pa.string())
+        )
+
+    def _table(self, cols: Dict[str, List[Any]]):
+        import pyarrow as pa
+
+        arrays, names = [], []
+        for name, values in cols.items():
+            if name in self._vocab:
+                arr = self._dict_array(name, values)
+            elif name in FLOAT_COLUMNS:
+                arr = pa.array(values, type=pa.float64())
+            elif self._schema is not None:
+                arr = pa.array(values, type=self._schema.field(name).type)
+            else:
+                arr = pa.array(values)
+                if pa.types.is_null(arr.type):  # ilk parçada hep boş kolon
+                    arr = arr.cast(pa.string())
+            arrays.append(arr)
+            names.append(name)
+        return pa.Table.from_arrays(arrays, names=names)
+
+    def _open_arrow(self, table) -> None:
+        import pyarrow as pa
+
+        self._schema = table.schema
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(
+                self.path, table.schema, use_dictionary=[c for c in DICT_COLUMNS if c in table.column_names]
+            )
+        else:
+            opts = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self._writer = pa.ipc.new_file(self.path, table.schema, options=opts)
+
+    # ---------- ortak ----------
+    def write(self, batch: ParsedBatch, extra: Optional[Dict[str, Sequence[Any]]] = None) -> None:
+        """Bir parçayı yazar; extra, parse edilmemiş kaynak kolonlardır (id, label...)."""
+        cols = _batch_columns(batch, extra)
+        if self.fmt == "jsonl":
+            if self._file is None:
+                self._file = open(self.path, "w", encoding="utf-8", newline="\n")
+            names = list(cols)
+            for row in zip(*cols.values()):
+                rec = {n: v for n, v in zip(names, row) if v is not None}
+                self._file.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        else:
+            table = self._table(cols)
+            if self._writer is None:
+                self._open_arrow(table)
+            self._writer.write_table(table)
+        self.rows += len(batch)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "ParsedWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"ParsedWriter({str(self.path)!r}, fmt={self.fmt!r}, rows={self.rows})"
+
+
+def _iter_jsonl(path: Path, columns: Optional[Sequence[str]]) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            rec = json.loads(line)
+            yield rec if columns is None else {c: rec.get(c) for c in columns}
+
+
+def read_parsed(path, columns: Optional[Sequence[str]] = None, fmt: Optional[str] = None):
+    """
+    Parse çıktısını DataFrame olarak okur; columns verilirse yalnız o kolonlar
+    çözülür (parquet: kolon izdüşümü, arrow: memory-map + kopyasız seçim).
+    Sözlük kodlu kolonlar pandas'ta Categorical gelir.
+    """
+    import pandas as pd
+
+    path = Path(path)
+    fmt = _format_of(path, fmt)
+    cols = list(columns) if columns is not None else None
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, columns=cols, memory_map=True).to_pandas()
+    if fmt == "arrow":
+        return open_parsed_table(path, cols).to_pandas()
+    return pd.DataFrame.from_records(list(_iter_jsonl(path, cols)), columns=cols)
+
+
+def open_parsed_table(path, columns: Optional[Sequence[str]] = None):
+    """Arrow IPC dosyasını memory-map ile pyarrow.Table olarak açar (veri diske bağlı kalır)."""
+    import pyarrow as pa
+
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    return table if columns is None else table.select(list(columns))
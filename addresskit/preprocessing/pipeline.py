@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+normalize_and_parse + postprocess_parts birleşik giriş noktası (cache destekli).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from addresskit.utils.cache import DEFAULT_MAX_ENTRIES, ParseCache, cached_map
+from .gazetteer import load_gazetteer
+from .normalize_and_parse import PARSER_VERSION, normalize_and_parse_lexed
+from .postprocess import POSTPROCESS_VERSION, postprocess_parts
+
+PIPELINE_VERSION = f"{PARSER_VERSION}+{POSTPROCESS_VERSION}"
+
+
+def pipeline_cfg() -> Dict[str, str]:
+    """Cache anahtarına giren veri bağımlılıkları (gazetteer değişirse sonuç da değişir)."""
+    return {"gazetteer": load_gazetteer().fingerprint()}
+
+
+def open_parse_cache(
+    path: str | Path, max_entries: int = DEFAULT_MAX_ENTRIES
+) -> ParseCache:
+    """(ham metin, parser+postprocess sürümü, gazetteer) anahtarlı kalıcı cache."""
+    return ParseCache(
+        path, "normalize_and_parse+postprocess", PIPELINE_VERSION,
+        cfg=pipeline_cfg(), max_entries=max_entries,
+    )
+
+
+def _parse_uncached(raw: str) -> Tuple[str, Dict[str, str]]:
+    # token'lar bir kez üretilir, parser ve postprocess paylaşır
+    norm, parts, lexed = normalize_and_parse_lexed(raw)
+    return norm, postprocess_parts(norm, parts, lexed=lexed)
+
+
+def parse_address(raw, cache: Optional[ParseCache] = None) -> Tuple[str, Dict[str, str]]:
+    """Tek adres: (normalized, parts). cache verilirse önce oraya bakılır."""
+    raw = "" if raw is None else str(raw)
+    if cache is None:
+        return _parse_uncached(raw)
+    hit = cache.get(raw)
+    if hit is None:
+        hit = _parse_uncached(raw)
+        cache.put(raw, hit)
+        return hit
+    return hit[0], hit[1]
+
+
+def parse_addresses(
+    texts: Sequence[str], cache: Optional[ParseCache] = None
+) -> List[Tuple[str, Dict[str, str]]]:
+    """Toplu parse; cache'e tek seferde bakar, yalnızca eksikleri hesaplar."""
+    texts = ["" if t is None else str(t) for t in texts]
+    res = cached_map(texts, lambda lst: [_parse_uncached(t) for t in lst], cache)
+    return [(r[0], r[1]) for r in res]
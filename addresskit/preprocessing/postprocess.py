@@ -1,49 +1,46 @@
 # -*- coding: utf-8 -*-
 import re
-from typing import Dict, Tuple, List
+from typing import Dict, Optional, Tuple
 
-IL_SET = {
-    "adana","adiyaman","afyonkarahisar","ağrı","amasya","ankara","antalya","artvin","aydın","aydin",
-    "balıkesir","bilecik","bingöl","bitlis","bolu","burdur","bursa","çanakkale","canakkale","çankırı",
-    "cankiri","çorum","corum","denizli","diyarbakır","diyarbakir","edirne","elazığ","elazig","erzincan",
-    "erzurum","eskişehir","eskisehir","gaziantep","giresun","gümüşhane","gumushane","hakkari","hatay",
-    "ısparta","isparta","mersin","istanbul","izmir","kars","kastamonu","kayseri","kırklareli","kirklareli",
-    "kırşehir","kirsehir","kocaeli","konya","kütahya","kutahya","malatya","manisa","kahramanmaraş",
-    "kahramanmaras","mardin","muğla","mugla","muş","mus","nevşehir","nevsehir","niğde","nigde","ordu",
-    "rize","sakarya","samsun","siirt","sinop","sivas","tekirdağ","tekirdag","tokat","trabzon","tunceli",
-    "şanlıurfa","sanliurfa","uşak","usak","van","yalova","yozgat","zonguldak","karabük","karabuk","kilis",
-    "osmaniye","düzce","duzce","bayburt","ardahan","iğdır","igdir","karaman","kırıkkale","kirikkale","bartın","bartin"
-}
+from .gazetteer import load_gazetteer
+from .lexer import NAME, Lexed, classify, lex
+
+# çıktı değişirse artır; kalıcı parse cache anahtarına girer
+POSTPROCESS_VERSION = "2"
 
 TRIGGERS_BUILDING = {"apartman","residence","rezidans","işhanı","işhanı","iş","hanı","otel","hotel","site","blok","plaza","tower"}
 CUT_WORDS = {"no","daire","kat","mevkii","il","ilçe","ilce"}
 
 RE_NO = re.compile(r"\bno\s+(\d+[a-z]?(?:/\d+)?[a-z]?)\b", re.IGNORECASE)
+_RE_NUM_SUFFIX = re.compile(r"\d+[a-z]?")
+_RE_NUM_SOK    = re.compile(r"\b(\d+)\s+sokak\b")
+_RE_MEVKII     = re.compile(r"\b([a-zçğıöşü\-]+)\s+mevkii\b")
+_RE_NO_TAIL    = re.compile(r"\bno\b.*$")
+_RE_MULTI_SPACE = re.compile(r"\s{2,}")
+_NAMED = {"mahalle","cadde","sokak","bulvar"}
 
-def _tokens(s: str) -> List[str]:
-    return s.split()
-
-def _get_before_after(label: str, toks: List[str], max_tokens=3, allow_numeric=False) -> Tuple[str,str]:
-    if label not in toks: return "", ""
-    i = toks.index(label)
+def _get_before_after(label: str, lexed: Lexed, max_tokens=3, allow_numeric=False) -> Tuple[str,str]:
+    i = lexed.index(label)
+    if i < 0: return "", ""
+    toks, infos = lexed.tokens, lexed.infos
     # before
     b = []
     j = i-1
     while j >= 0 and len(b) < max_tokens:
         w = toks[j]
-        if w in CUT_WORDS or w in {"mahalle","cadde","sokak","bulvar"}: break
-        if not allow_numeric and any(ch.isdigit() for ch in w): break
+        if w in CUT_WORDS or w in _NAMED: break
+        if not allow_numeric and infos[j].has_digit: break
         b.append(w); j -= 1
-    b = " ".join(reversed(b)).strip()
+    b = " ".join(reversed(b))
     # after
     a = []
     k = i+1
     while k < len(toks) and len(a) < max_tokens:
         w = toks[k]
-        if w in CUT_WORDS or w in {"mahalle","cadde","sokak","bulvar"}: break
-        if not allow_numeric and any(ch.isdigit() for ch in w): break
+        if w in CUT_WORDS or w in _NAMED: break
+        if not allow_numeric and infos[k].has_digit: break
         a.append(w); k += 1
-    a = " ".join(a).strip()
+    a = " ".join(a)
     return b, a
 
 def _fix_no_and_daire(parts: Dict[str,str]) -> None:
@@ -52,74 +49,77 @@ def _fix_no_and_daire(parts: Dict[str,str]) -> None:
         if n.isdigit() and d.isdigit():
             parts["no"], parts["daire"] = n, d
     # alfabetik 'daire' değerlerini kaldır (örn. 'oria')
-    if "daire" in parts and not re.fullmatch(r"\d+[a-z]?", str(parts["daire"])):
+    if "daire" in parts and not _RE_NUM_SUFFIX.fullmatch(str(parts["daire"])):
         parts.pop("daire", None)
 
 def _fix_kat(parts: Dict[str,str]) -> None:
-    if "kat" in parts and not re.fullmatch(r"\d+[a-z]?", str(parts["kat"])):
+    if "kat" in parts and not _RE_NUM_SUFFIX.fullmatch(str(parts["kat"])):
         parts.pop("kat", None)
 
 def _fix_sokak(normalized: str, parts: Dict[str,str]) -> None:
     val = parts.get("sokak","")
     if val.startswith("no"):
-        m = re.search(r"\b(\d+)\s+sokak\b", normalized)
+        m = _RE_NUM_SOK.search(normalized)
         if m: parts["sokak"] = m.group(1)
         else: parts.pop("sokak", None)
 
-def _reassign_mahalle_cadde_sokak(normalized: str, parts: Dict[str,str]) -> None:
-    toks = _tokens(normalized)
+def _reassign_mahalle_cadde_sokak(lexed: Lexed, parts: Dict[str,str]) -> None:
     # mahalle
-    b,a = _get_before_after("mahalle", toks, allow_numeric=False)
+    b,a = _get_before_after("mahalle", lexed, allow_numeric=False)
     if b: parts["mahalle"] = b
     elif a: parts["mahalle"] = a
     # cadde
-    b,a = _get_before_after("cadde", toks, allow_numeric=False)
+    b,a = _get_before_after("cadde", lexed, allow_numeric=False)
     if b: parts["cadde"] = b
     elif a: parts["cadde"] = a
     # sokak
-    b,a = _get_before_after("sokak", toks, allow_numeric=True)
+    b,a = _get_before_after("sokak", lexed, allow_numeric=True)
     if b and b.replace("/","").isdigit():
         parts["sokak"] = b
     elif a and not any(ch.isdigit() for ch in a.split()[:1]):
         parts["sokak"] = a
 
-def _fix_building_name(normalized: str, parts: Dict[str,str]) -> None:
-    toks = _tokens(normalized)
+def _fix_building_name(lexed: Lexed, parts: Dict[str,str]) -> None:
+    toks, infos = lexed.tokens, lexed.infos
     for i, t in enumerate(toks):
         if t in TRIGGERS_BUILDING:
             name_tokens = []
             for j in range(i-2, i):
-                if j >= 0 and re.fullmatch(r"[a-zçğıöşü\-]+", toks[j]) and toks[j] not in CUT_WORDS:
+                if j >= 0 and infos[j].is_word and toks[j] not in CUT_WORDS:
                     name_tokens.append(toks[j])
             name_tokens.append(t)
-            cand = " ".join(name_tokens).strip()
-            # baştaki 'no/sayı' kırp
-            cand = re.sub(r"^\bno\b\s*\d+[a-z]?\/?\d*\s*", "", cand).strip()
-            cand = re.sub(r"^\d+[a-z]?\s*", "", cand).strip()
+            # isim token'ları rakam içermez; baştaki 'no/sayı' kırpması gerekmez
+            cand = " ".join(name_tokens)
             if cand and (parts.get("bina_adı") in (None, "", t) or parts.get("bina_adı","").startswith(("no","0","1","2","3","4","5","6","7","8","9"))):
                 parts["bina_adı"] = cand
             break
 
 def _fix_mevkii(normalized: str, parts: Dict[str,str]) -> None:
-    m = re.search(r"\b([a-zçğıöşü\-]+)\s+mevkii\b", normalized)
+    m = _RE_MEVKII.search(normalized) if "mevkii" in normalized else None
     if m:
         parts["mevkii"] = m.group(1)
 
-def _parse_city_district_from_tail(normalized: str, parts: Dict[str,str]) -> None:
-    toks = _tokens(normalized)
-    tail = toks[-8:]
-    for w in reversed(tail):
-        if "/" in w and re.fullmatch(r"[a-zçğıöşü]+/[a-zçğıöşü]+", w):
-            a,b = w.split("/",1)
-            if b in IL_SET and a not in IL_SET:
-                parts["il"], parts["ilçe"] = b, a; return
-            if a in IL_SET and b not in IL_SET:
-                parts["il"], parts["ilçe"] = a, b; return
-    for k in range(len(tail)-1, 0, -1):
-        a, b = tail[k-1], tail[k]
-        if re.fullmatch(r"[a-zçğıöşü]+", a) and re.fullmatch(r"[a-zçğıöşü]+", b):
-            if b in IL_SET and a not in IL_SET:
-                parts["il"], parts["ilçe"] = b, a; return
+def _parse_city_district(lexed: Lexed, parts: Dict[str,str]) -> None:
+    place = lexed.place()
+    if place.il: parts["il"] = place.il
+    if place.ilce:
+        parts["ilçe"] = place.ilce
+        return
+    gz = load_gazetteer()
+    if not place.il or gz.complete:
+        return
+    # gömülü liste ilçeyi tanımıyor: 'X il', 'X/il' ya da 'il/X' kalıbında X ilçe sayılır
+    toks, i = lexed.split_tokens(), place.il_at
+    cands = [i-2 if i >= 2 and toks[i-1] == "/" else i-1]
+    if i+2 < len(toks) and toks[i+1] == "/":
+        cands.append(i+2)
+    for j in cands:
+        if not 0 <= j < len(toks) or toks[j] in CUT_WORDS:
+            continue
+        info = classify(toks[j])
+        if info.kind == NAME and info.is_alpha and not gz.level_of(toks[j]):
+            parts["ilçe"] = toks[j]
+            return
 
 def _recompute_confidence(parts: Dict[str,str]) -> None:
     score = 0.0
@@ -131,19 +131,27 @@ def _recompute_confidence(parts: Dict[str,str]) -> None:
     if "il" in parts: score += 0.06
     parts["_confidence"] = round(min(1.0, score), 2)
 
-def postprocess_parts(normalized: str, parts: Dict[str,str]) -> Dict[str,str]:
+def postprocess_parts(normalized: str, parts: Dict[str,str], lexed: Optional[Lexed] = None) -> Dict[str,str]:
+    """
+    Parça düzeltmeleri. `lexed`, normalize_and_parse_lexed'in ürettiği token'lar;
+    verilmezse (ya da başka metne aitse) burada bir kez üretilir.
+    """
+    if lexed is None or lexed.text != normalized:
+        lexed = lex(normalized)
     parts = dict(parts)  # kopya
     _fix_no_and_daire(parts)
     _fix_kat(parts)
     _fix_sokak(normalized, parts)
-    _reassign_mahalle_cadde_sokak(normalized, parts)
-    _fix_building_name(normalized, parts)
+    _reassign_mahalle_cadde_sokak(lexed, parts)
+    _fix_building_name(lexed, parts)
     _fix_mevkii(normalized, parts)
-    _parse_city_district_from_tail(normalized, parts)
+    _parse_city_district(lexed, parts)
     # alan içi temizlik
     for key in ("mahalle","cadde","sokak"):
         if key in parts and parts[key]:
-            parts[key] = re.sub(r"\bno\b.*$", "", parts[key]).strip()
-            parts[key] = re.sub(r"\s{2,}", " ", parts[key])
+            v = parts[key]
+            if "no" in v:
+                v = _RE_NO_TAIL.sub("", v)
+            parts[key] = _RE_MULTI_SPACE.sub(" ", v.strip())
     _recompute_confidence(parts)
     return {k:v for k,v in parts.items() if v}
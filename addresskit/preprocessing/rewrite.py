@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+"""
+Tek geçişli çoklu desen (multi-pattern) yeniden yazma motoru.
+
+Sıralı `re.sub` / `str.replace` tabloları (kısaltma açma, literal replace,
+kanonik ikameler) her kural için metni baştan tarar. Bu modül literal
+kuralları bir trie'ye dizer ve trie'den tek bir regex üretir; tüm tablo
+soldan sağa TEK taramada uygulanır (aynı konumda en uzun eşleşme kazanır).
+
+Kelime sınırı (`\\b`) birebir regex anlamıyla korunur; kural sonu için
+opsiyonel lookahead (örn. `\\s*\\d`) desteklenir. Literal'e indirgenemeyen
+desenler (`\\s*`, `.` vb.) `RegexRule` olarak tablodaki yerlerinde ayrı
+adım olarak çalışır; böylece sıra semantiği korunur.
+
+Kurallar çakışmıyorsa sonuç sıralı uygulamayla aynıdır. Çakışmalar
+(aynı kaynak, gölgeleme, kısmi örtüşme, zincirleme) derleme sırasında
+tespit edilip `conflicts` içinde raporlanır.
+"""
+from __future__ import annotations
+
+import itertools
+import re
+import warnings
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+
+class Rule(NamedTuple):
+    """
+    Literal kural: source -> target. left/right: kaynağın başında/sonunda \\b.
+    origin: kural bir regex'ten açıldıysa o regex (sıralı referans için).
+    """
+
+    source: str
+    target: str
+    left: bool = True
+    right: bool = True
+    lookahead: str = ""
+    origin: str = ""
+
+    def pattern(self) -> str:
+        return (
+            (r"\b" if self.left else "")
+            + re.escape(self.source)
+            + (r"\b" if self.right else "")
+            + (f"(?={self.lookahead})" if self.lookahead else "")
+        )
+
+
+class RegexRule(NamedTuple):
+    """Literal'e indirgenemeyen kural; tablodaki sırasında tek başına uygulanır."""
+
+    pattern: str
+    repl: str
+    flags: int = 0
+
+
+class Conflict(NamedTuple):
+    kind: str  # duplicate | shadow | overlap | chain
+    first: Rule
+    second: Rule
+
+    def __str__(self) -> str:
+        return f"{self.kind}: {self.first.source!r}->{self.first.target!r} / {self.second.source!r}->{self.second.target!r}"
+
+
+class RewriteConflictWarning(UserWarning):
+    pass
+
+
+AnyRule = Union[Rule, RegexRule]
+
+
+# --------------------------------
+# Basit regex -> literal kurallar
+# --------------------------------
+_MAX_EXPANSION = 64
+
+
+def _parse_simple_body(body: str) -> Optional[List[Tuple[List[str], bool]]]:
+    """
+    '\\bmah\\.?' gövdesini [(seçenekler, opsiyonel_mi), ...] atomlarına böler.
+    Desteklenmeyen bir regex yapısı görülürse None.
+    """
+    atoms: List[Tuple[List[str], bool]] = []
+    i, n = 0, len(body)
+    while i < n:
+        c = body[i]
+        if c == "\\":
+            if i + 1 >= n or body[i + 1].isalnum():
+                return None  # \s, \d, \b ... literal değil
+            choices, i = [body[i + 1]], i + 2
+        elif c == "[":
+            j = body.find("]", i + 1)
+            if j < 0:
+                return None
+            inner, choices, k = body[i + 1 : j], [], 0
+            while k < len(inner):
+                if inner[k] == "\\" and k + 1 < len(inner) and not inner[k + 1].isalnum():
+                    choices.append(inner[k + 1])
+                    k += 2
+                elif inner[k] in "\\^-":
+                    return None
+                else:
+                    choices.append(inner[k])
+                    k += 1
+            if not choices:
+                return None
+            i = j + 1
+        elif c in ".^$*+(){}|?]":
+            return None
+        else:
+            choices, i = [c], i + 1
+        optional = i < n and body[i] == "?"
+        if optional:
+            i += 1
+            if i < n and body[i] in "?+":
+                return None  # tembel/possessive niceleyiciler
+        atoms.append((choices, optional))
+    return atoms
+
+
+def rules_from_regex(pattern: str, repl: str, flags: int = 0) -> List[AnyRule]:
+    """
+    Basit bir regex'i (\\b + literal/[sınıf]/? + \\b + (?=...)) literal
+    kurallara açar; açılamazsa [RegexRule(pattern, repl)] döner.
+    """
+    fallback: List[AnyRule] = [RegexRule(pattern, repl, flags)]
+    if flags or "\\" in repl:
+        return fallback
+    rest, lookahead = pattern, ""
+    m = re.search(r"\(\?=([^()]*)\)$", rest)
+    if m:
+        lookahead, rest = m.group(1), rest[: m.start()]
+    left = rest.startswith(r"\b")
+    if left:
+        rest = rest[2:]
+    right = rest.endswith(r"\b") and not rest.endswith(r"\\b")
+    if right:
+        rest = rest[:-2]
+    atoms = _parse_simple_body(rest)
+    if not atoms:
+        return fallback
+    options = [c + ([""] if opt else []) for c, opt in atoms]
+    total = 1
+    for o in options:
+        total *= len(o)
+    if total > _MAX_EXPANSION:
+        return fallback
+    literals = sorted(
+        {"".join(p) for p in itertools.product(*options)} - {""},
+        key=lambda s: -len(s),
+    )
+    return [Rule(lit, repl, left, right, lookahead, pattern) for lit in literals]
+
+
+def rules_from_regex_table(pairs: Iterable[Tuple[str, str]]) -> List[AnyRule]:
+    out: List[AnyRule] = []
+    for pat, repl in pairs:
+        out.extend(rules_from_regex(pat, repl))
+    return out
+
+
+# --------------------------------
+# Derleme
+# --------------------------------
+def _trie_regex(rules: Sequence[Rule]) -> str:
+    trie: dict = {}
+    for r in rules:
+        node = trie
+        for ch in r.source:
+            node = node.setdefault(ch, {})
+        node[""] = r
+
+    def emit(node: dict) -> str:
+        alts = [re.escape(ch) + emit(node[ch]) for ch in sorted(k for k in node if k)]
+        if "" in node:
+            r = node[""]
+            # uç en sonda: önce daha uzun eşleşmeler denenir
+            alts.append(
+                (r"\b" if r.right else "")
+                + (f"(?={r.lookahead})" if r.lookahead else "")
+            )
+        if len(alts) == 1:
+            return alts[0]
+        return "(?:" + "|".join(alts) + ")"
+
+    return emit(trie)
+
+
+def _isw(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class _LiteralPass:
+    """
+    Bir literal segmentinin tek taramalı uygulaması.
+
+    Sıralı uygulamada bir değiştirme, komşusunun \\b / lookahead bağlamını
+    değiştirebilir (örn. 'cd.caddesi'). Tarama sırasında bu durum tespit
+    edilirse o metin için sıralı referansa düşülür; böylece statik çakışma
+    yoksa sonuç birebir aynıdır.
+    """
+
+    __slots__ = ("regex", "table", "rules", "left_starts", "right_ends", "looks", "fallbacks")
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = list(rules)
+        self.table: Dict[str, str] = {r.source: r.target for r in rules}
+        self.left_starts = {r.source[0] for r in rules if r.left}
+        self.right_ends = {r.source[-1] for r in rules if r.right}
+        self.looks = {r.source: re.compile(r.lookahead) for r in rules if r.lookahead}
+        self.fallbacks = 0
+        groups = []
+        bounded = [r for r in rules if r.left]
+        free = [r for r in rules if not r.left]
+        if bounded:
+            groups.append(r"\b" + _group(_trie_regex(bounded)))
+        if free:
+            groups.append(_group(_trie_regex(free)))
+        self.regex = re.compile("|".join(groups))
+
+    def __call__(self, text: str) -> str:
+        table, looks = self.table, self.looks
+        out: List[str] = []
+        pos, n, look_end = 0, len(text), -1
+        for m in self.regex.finditer(text):
+            a, b = m.span()
+            src = m.group(0)
+            tgt = table[src]
+            if a < look_end or self._context_changes(text, a, b, src, tgt, n):
+                self.fallbacks += 1
+                return apply_sequential(self.rules, text)
+            if src in looks:
+                look_end = looks[src].match(text, b).end()
+            out.append(text[pos:a])
+            out.append(tgt)
+            pos = b
+        if not out:
+            return text
+        out.append(text[pos:])
+        return "".join(out)
+
+    def _context_changes(self, text: str, a: int, b: int, src: str, tgt: str, n: int) -> bool:
+        if a > 0 and text[a - 1] in self.right_ends:
+            if not tgt or _isw(src[0]) != _isw(tgt[0]):
+                return True
+        if b < n and text[b] in self.left_starts:
+            if not tgt or _isw(src[-1]) != _isw(tgt[-1]):
+                return True
+        return False
+
+
+def _group(rx: str) -> str:
+    return rx if rx.startswith("(?:") and rx.endswith(")") else f"(?:{rx})"
+
+
+class _RegexPass:
+    __slots__ = ("regex", "repl")
+
+    def __init__(self, rule: RegexRule):
+        self.regex = re.compile(rule.pattern, rule.flags)
+        self.repl = rule.repl
+
+    def __call__(self, text: str) -> str:
+        return self.regex.sub(self.repl, text)
+
+
+def _find_conflicts(rules: Sequence[Rule]) -> Tuple[List[Rule], List[Conflict]]:
+    """Aynı literal segmentindeki kurallar için çakışma analizi."""
+    kept: List[Rule] = []
+    conflicts: List[Conflict] = []
+    seen: Dict[str, Rule] = {}
+    for r in rules:
+        if r.source in seen:
+            prev = seen[r.source]
+            if prev != r:
+                conflicts.append(Conflict("duplicate", prev, r))
+            continue
+        seen[r.source] = r
+        kept.append(r)
+
+    compiled = [re.compile(r.pattern()) for r in kept]
+    for i, a in enumerate(kept):
+        for j in range(i + 1, len(kept)):
+            b = kept[j]
+            if a.origin and a.origin == b.origin:
+                continue  # aynı regex'in alternatifleri: regex zaten en uzunu seçer
+            # a, b'nin içinde eşleşiyor: sıralıda a önce yazar, b hiç görünmez
+            if compiled[i].search(b.source):
+                conflicts.append(Conflict("shadow", a, b))
+                continue
+            # b'nin sonu a'nın başıyla örtüşüyor: tek geçişte b (solda) kazanır
+            for k in range(1, min(len(a.source), len(b.source))):
+                if b.source[-k:] == a.source[:k]:
+                    merged = b.source + a.source[k:]
+                    if compiled[j].match(merged) and compiled[i].match(
+                        merged, len(b.source) - k
+                    ):
+                        conflicts.append(Conflict("overlap", a, b))
+                        break
+            # b, a'nın çıktısını yeniden yazıyor: sıralıda zincirlenir, tek geçişte değil
+            if compiled[j].sub(b.target.replace("\\", r"\\"), a.target) != a.target:
+                conflicts.append(Conflict("chain", a, b))
+            elif _junction(a, b):
+                conflicts.append(Conflict("chain", a, b))
+    return kept, conflicts
+
+
+def _junction(a: Rule, b: Rule) -> bool:
+    """Sınırsız b kuralı, a'nın çıktısı ile komşu metnin birleşim yerinde eşleşebilir mi?"""
+    t, s = a.target, b.source
+    if not t:
+        return False
+    if not b.left and any(t.endswith(s[:k]) for k in range(1, len(s))):
+        return True
+    if not b.right and any(t.startswith(s[-k:]) for k in range(1, len(s))):
+        return True
+    if b.lookahead and re.match(b.lookahead, t) or (
+        b.lookahead and re.match(b.lookahead, " " + t)
+    ):
+        return True
+    return False
+
+
+def _units(rules: Sequence[AnyRule]) -> list:
+    """Kuralları ardışık aynı-origin literal gruplarına ayırır; sona None ekler."""
+    out: list = []
+    for r in rules:
+        if isinstance(r, RegexRule):
+            out.append(r)
+        elif r.source:
+            last = out[-1] if out else None
+            if isinstance(last, list) and r.origin and last[-1].origin == r.origin:
+                last.append(r)
+            else:
+                out.append([r])
+    out.append(None)
+    return out
+
+
+class Rewriter:
+    """
+    Derlenmiş kural tablosu. `rw(text)` tüm tabloyu uygular.
+
+    Ardışık literal kurallar tek bir trie-regex taramasında birleşir;
+    RegexRule'lar sıralarını koruyarak araya girer. `split_conflicts=True`
+    ise çakışan kural bir sonraki geçişe bırakılır (uyarı yerine bölme).
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[Union[AnyRule, Tuple[str, str]]],
+        name: str = "",
+        on_conflict: str = "warn",
+        split_conflicts: bool = False,
+    ):
+        self.name = name
+        self.rules: List[AnyRule] = [
+            r if isinstance(r, (Rule, RegexRule)) else Rule(*r) for r in rules
+        ]
+        self.conflicts: List[Conflict] = []
+        self._passes: list = []
+
+        segment: List[Rule] = []
+        for unit in _units(self.rules):
+            if isinstance(unit, list):
+                # aynı regex'ten açılan literaller bölünmez (yoksa iki kez uygulanır)
+                if split_conflicts and segment and _find_conflicts(segment + unit)[1]:
+                    # çakışan kural yeni bir geçiş başlatır: sıralı anlam korunur
+                    self._passes.append(_LiteralPass(_find_conflicts(segment)[0]))
+                    segment = []
+                segment.extend(unit)
+                continue
+            if segment:
+                kept, conflicts = _find_conflicts(segment)
+                self.conflicts.extend(conflicts)
+                self._passes.append(_LiteralPass(kept))
+                segment = []
+            if unit is not None:
+                self._passes.append(_RegexPass(unit))
+
+        if self.conflicts:
+            msg = f"{len(self.conflicts)} rewrite conflict(s) in {name or 'rule table'}: " + "; ".join(
+                str(c) for c in self.conflicts[:5]
+            )
+            if on_conflict == "raise":
+                raise ValueError(msg)
+            if on_conflict == "warn":
+                warnings.warn(msg, RewriteConflictWarning, stacklevel=2)
+
+    @property
+    def n_passes(self) -> int:
+        return len(self._passes)
+
+    def __call__(self, text: str) -> str:
+        for p in self._passes:
+            text = p(text)
+        return text
+
+    def __repr__(self) -> str:
+        return f"Rewriter({self.name!r}, rules={len(self.rules)}, passes={self.n_passes})"
+
+
+def apply_sequential(rules: Iterable[AnyRule], text: str) -> str:
+    """
+    Referans: kuralları tek tek, sırayla uygular (test / profil için).
+    Aynı regex'ten açılmış ardışık kurallar o regex ile tek adımda uygulanır.
+    """
+    last_origin = None
+    for r in rules:
+        if isinstance(r, RegexRule):
+            text = re.sub(r.pattern, r.repl, text, flags=r.flags)
+            last_origin = None
+        elif r.origin:
+            if r.origin != last_origin:
+                text = re.sub(r.origin, lambda m, t=r.target: t, text)
+            last_origin = r.origin
+        elif r.source:
+            text = re.sub(r.pattern(), lambda m, t=r.target: t, text)
+            last_origin = None
+    return text
+
+
+__all__ = [
+    "Rule",
+    "RegexRule",
+    "Conflict",
+    "Rewriter",
+    "RewriteConflictWarning",
+    "rules_from_regex",
+    "rules_from_regex_table",
+    "apply_sequential",
+]
@@ -1,17 +1,25 @@
 # -*- coding: utf-8 -*-
-import os, json
-import pandas as pd
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
 
 # paket içi importlar
-from .normalize_and_parse import normalize_and_parse
-from addresskit.preprocessing.postprocess import postprocess_parts
+from .batch import parse_many
+from .executor import ParseExecutor
+from .parsed_store import ParsedWriter, default_suffix, source_columns
+from .pipeline import open_parse_cache
+from ..utils.io import DEFAULT_CSV_CHUNK, read_csv_chunks
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 HERE = os.path.dirname(__file__)
 ROOT = os.path.abspath(os.path.join(HERE, "..", ".."))
 DATA_RAW = os.path.join(ROOT, "data", "raw")
 DATA_PROCESSED = os.path.join(ROOT, "data", "processed")
-os.makedirs(DATA_PROCESSED, exist_ok=True)
+PARSE_CACHE = os.path.join(ROOT, "data", "interim", "parse_cache.sqlite")
 
 def find_address_col(df: pd.DataFrame) -> str:
     candidates = {"address","adres","full_address","text"}
@@ -23,45 +31,49 @@ def find_address_col(df: pd.DataFrame) -> str:
         raise ValueError("Adres metni için object tipinde bir kolon bulunamadı.")
     return obj_cols[0]
 
-def main():
-    train_p = os.path.join(DATA_RAW, "train.csv")
-    if not os.path.exists(train_p):
-        raise FileNotFoundError(f"Bulunamadı: {train_p}")
-    df = pd.read_csv(train_p)
+def _parse_args():
+    import argparse
 
-    text_col = find_address_col(df)
-    # NaN/None temizliği
-    df[text_col] = (
-        df[text_col]
-        .where(df[text_col].notna(), "")
-        .astype(str)
-        .replace({"None":"", "nan":"", "NaN":""})
-    )
+    p = argparse.ArgumentParser(description="Adresleri normalize edip parçalarını kolon bazlı yazar")
+    p.add_argument("--input", default=os.path.join(DATA_RAW, "train.csv"))
+    p.add_argument("--output", default=None,
+                   help="Çıktı (.parquet/.arrow/.jsonl); varsayılan data/processed/train_parsed.parquet "
+                        "(pyarrow yoksa .jsonl)")
+    p.add_argument("--chunk-size", type=int, default=DEFAULT_CSV_CHUNK)
+    p.add_argument("--workers", type=int, default=-1, help="Parse süreç sayısı; -1: bütün çekirdekler")
+    return p.parse_args()
 
-    norms, parts_list = [], []
-    for i, addr in enumerate(df[text_col]):
-        norm, parts = normalize_and_parse(addr)
-        parts = postprocess_parts(norm, parts)
-        norms.append(norm)
-        parts_list.append(parts)
 
-        if i < 5:
-            print("\n" + "="*60)
-            print("Original :", addr)
-            print("Normalized:", norm)
-            print("Parts    :", parts)
-
-    df_out = df.copy()
-    df_out["normalized"] = norms
-    df_out["parts"] = [json.dumps(p, ensure_ascii=False) for p in parts_list]
+def main():
+    args = _parse_args()
+    if not os.path.exists(args.input):
+        raise FileNotFoundError(f"Bulunamadı: {args.input}")
+    out_path = args.output or os.path.join(DATA_PROCESSED, "train_parsed" + default_suffix())
 
-    out_csv  = os.path.join(DATA_PROCESSED, "train_labeled.csv")
-    out_json = os.path.join(DATA_PROCESSED, "train_labeled.json")
-    df_out.to_csv(out_csv, index=False, encoding="utf-8")
-    with open(out_json, "w", encoding="utf-8") as f:
-        json.dump(df_out.to_dict(orient="records"), f, ensure_ascii=False, indent=2)
+    text_col = None
+    with open_parse_cache(PARSE_CACHE) as cache, ParsedWriter(out_path) as writer, \
+         ParseExecutor(args.workers, progress=True) as ex:
+        for df in read_csv_chunks(args.input, args.chunk_size):
+            if text_col is None:
+                text_col = find_address_col(df)
+            # NaN/None temizliği (boşlar zaten "" okunur)
+            texts = df[text_col].replace({"None": "", "nan": "", "NaN": ""})
+            batch = parse_many(texts.tolist(), cache, executor=ex)
+            if writer.rows == 0:
+                for i, addr in enumerate(texts.head(5)):
+                    print("\n" + "="*60)
+                    print("Original :", addr)
+                    print("Normalized:", batch.normalized[i])
+                    print("Parts    :", batch.parts(i))
+            names = source_columns(df.columns, batch.keys)
+            if writer.rows == 0:
+                renamed = {c: n for c, n in names.items() if n != str(c)}
+                if renamed:
+                    print(f"[WARN] parse kolonlarıyla çakışan kaynak kolonlar yeniden adlandırıldı: {renamed}")
+            writer.write(batch, extra={names[c]: df[c].tolist() for c in df.columns})
+        print(f"[CACHE] {cache.stats()}")
 
-    print(f"\nKaydedildi:\n- {out_csv}\n- {out_json}")
+    print(f"\nKaydedildi: {out_path} ({writer.rows} satır)")
 
 if __name__ == "__main__":
     main()
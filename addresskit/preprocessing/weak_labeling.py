@@ -1,54 +1,235 @@
-import pandas as pd
-import yaml
+# -*- coding: utf-8 -*-
+"""
+Gazetteer tabanlı weak labeling (il / ilçe / mahalle, BIO etiketleri).
+
+Hiyerarşi ve posta index'i ilk kullanımda bir kez okunur ve token/n-gram
+otomatına derlenir (bkz. gazetteer.py); adres başına tek geçişte bütün
+eşleşmeler bulunur. Çok kelimeli adlar B-/I- olarak etiketlenir.
+Dosya etiketleme satırları parça parça süreç havuzunda işler ve JSONL
+(satır başına {"tokens", "labels"}) ya da CoNLL (token<TAB>etiket) yazar.
+"""
+from __future__ import annotations
+
+import csv
 import json
-from addresskit.preprocessing.clean_text import normalize_text
+import re
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from addresskit.normalize import _open_read_text, load_cfg, normalize_text
+
+from .executor import ParseExecutor
+from .gazetteer import HIER_PATH, IL, ILCE, MAHALLE, ROOT, Gazetteer, Hit, _read_hierarchy
+
+INDEX_PATH = ROOT / "data" / "raw" / "turkiye_posta_index.json"
+CONFIG_PATH = ROOT / "configs" / "normalize.yaml"
+DEFAULT_CHUNK = 20000
+
+TAGS = {IL: "IL", ILCE: "ILCE", MAHALLE: "MAHALLE"}
+# locate() dışında kalan, birden çok seviyede geçen adlar için öncelik (eski davranış)
+_PRIORITY = (MAHALLE, ILCE, IL)
+FORMATS = ("jsonl", "conll")
+# kelimeler + tek karakterlik noktalama token'ları ('fethiye/muğla' -> fethiye / muğla)
+_TOKEN_RE = re.compile(r"[^\W_]+(?:[-'][^\W_]+)*|\S")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text)
+
+
+def load_config(path=CONFIG_PATH):
+    return load_cfg(str(path))
+
+
+def _index_entries(index: Any) -> Iterator[Tuple[str, str, str]]:
+    """Posta index'inden (mahalle, il, ilçe); değerlerde il/ilçe yoksa boş kalır."""
+    items = index.items() if isinstance(index, dict) else ((x, x) for x in index or [])
+    for key, val in items:
+        name = key if isinstance(key, str) else ""
+        il = ilce = ""
+        if isinstance(val, dict):
+            name = val.get("mahalle") or name
+            il, ilce = val.get("il") or "", val.get("ilce") or val.get("ilçe") or ""
+        if isinstance(name, str) and name:
+            yield name, str(il), str(ilce)
+
+
+class WeakLabeler:
+    """Token listesi -> BIO etiketleri; otomat bir kez kurulur, adres başına tek geçiş."""
+
+    def __init__(self, gazetteer: Gazetteer):
+        self.gz = gazetteer
+
+    @classmethod
+    def from_files(cls, hier_path=HIER_PATH, index_path=INDEX_PATH) -> "WeakLabeler":
+        hier_path, index_path = Path(hier_path), Path(index_path)
+        if hier_path.exists():
+            gz = Gazetteer.from_hierarchy(_read_hierarchy(hier_path), source=hier_path.name)
+        else:
+            print(f"[WARN] hiyerarşi yok ({hier_path}); gömülü il/ilçe listesi kullanılıyor")
+            gz = Gazetteer.builtin()
+        if index_path.exists():
+            for name, il, ilce in _index_entries(_read_hierarchy(index_path)):
+                gz.add(name, MAHALLE, il=il, ilce=ilce)
+        return cls(gz)
 
-# Doğru path'ler
-HIER_PATH = "data/raw/turkiye_posta_hiyerarsi.json"
-INDEX_PATH = "data/raw/turkiye_posta_index.json"
+    def _level(self, hit: Hit, il: str, il_at: int, ilce: str) -> str:
+        levels = hit.levels
+        # adresin tutarlı il/ilçe'si (locate) önce; kalan belirsizlikte sabit öncelik
+        if IL in levels and hit.start == il_at:
+            return IL
+        if ilce and any(e.level == ILCE and e.name == ilce for e in hit.entries):
+            return ILCE
+        if il and any(e.level == MAHALLE and e.il == il for e in hit.entries):
+            return MAHALLE
+        return next(lv for lv in _PRIORITY if lv in levels)
 
-def load_config(path="configs/normalize.yaml"):
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    def label_tokens(self, tokens: Sequence[str]) -> List[str]:
+        """
+        Eşleşme yalnız kelime token'ları üzerinde yapılır ('k . maraş' -> 'k maraş');
+        span içinde kalan noktalama I- etiketi alır.
+        """
+        labels = ["O"] * len(tokens)
+        pos = [i for i, t in enumerate(tokens) if t[:1].isalnum()]
+        words = [tokens[i] for i in pos]
+        spans = self.gz.spans(words)
+        if not spans:
+            return labels
+        il, ilce, _, il_at = self.gz.locate(words)
+        for h in spans:
+            tag = TAGS[self._level(h, il, il_at, ilce)]
+            start, end = pos[h.start], pos[h.end - 1] + 1
+            labels[start] = "B-" + tag
+            for j in range(start + 1, end):
+                labels[j] = "I-" + tag
+        return labels
 
-# JSON'ları yükle
-with open(HIER_PATH, "r", encoding="utf-8") as f:
-    hier = json.load(f)
+    def label(self, text: str) -> Dict[str, List[str]]:
+        tokens = tokenize(text)
+        return {"tokens": tokens, "labels": self.label_tokens(tokens)}
 
-with open(INDEX_PATH, "r", encoding="utf-8") as f:
-    index = json.load(f)
 
-def weak_label_address(addr: str, cfg: dict):
+@lru_cache(maxsize=2)
+def load_labeler(hier_path: Optional[str] = None, index_path: Optional[str] = None) -> WeakLabeler:
+    """Süreç başına bir kez kurulan labeler (havuz işçilerinde de ilk çağrıda)."""
+    return WeakLabeler.from_files(hier_path or HIER_PATH, index_path or INDEX_PATH)
+
+
+def weak_label_address(addr: str, cfg: dict, labeler: Optional[WeakLabeler] = None):
     text = normalize_text(addr, cfg)
-    tokens = text.split()
-    labels = ["O"] * len(tokens)
-
-    for i, tok in enumerate(tokens):
-        # Mahalle eşleşmesi
-        if tok in index:
-            labels[i] = "B-MAHALLE"
-            continue
-        # İl eşleşmesi
-        for il in hier.keys():
-            if tok == il:
-                labels[i] = "B-IL"
-                break
-        # İlçe eşleşmesi
-        for il, ilceler in hier.items():
-            for ilce in ilceler.keys():
-                if tok == ilce:
-                    labels[i] = "B-ILCE"
-                    break
-
-    return {"tokens": tokens, "labels": labels}
+    return (labeler or load_labeler()).label(text)
+
+
+# --------------------------------
+# Dosya etiketleme
+# --------------------------------
+def _label_chunk(texts: List[str], cfg: dict, hier_path: Optional[str], index_path: Optional[str]):
+    lab = load_labeler(hier_path, index_path)
+    return [lab.label(normalize_text(t, cfg)) for t in texts]
+
+
+def _read_rows(path, text_col: str, id_col: Optional[str]) -> Iterator[Tuple[Any, str]]:
+    with _open_read_text(path) as f:
+        r = csv.DictReader(f)
+        r.fieldnames = [(fn or "").lstrip("\ufeff").strip() for fn in (r.fieldnames or [])]
+        if text_col not in r.fieldnames:
+            raise KeyError(f"'{text_col}' kolonu yok: {r.fieldnames}")
+        if id_col and id_col not in r.fieldnames:
+            id_col = None
+        for i, row in enumerate(r):
+            yield (row.get(id_col) if id_col else i), (row.get(text_col) or "").strip()
+
+
+def _write(f, fmt: str, rid: Any, res: Dict[str, List[str]]) -> None:
+    if fmt == "jsonl":
+        f.write(json.dumps({"id": rid, **res}, ensure_ascii=False) + "\n")
+    else:
+        for tok, lab in zip(res["tokens"], res["labels"]):
+            f.write(f"{tok}\t{lab}\n")
+        f.write("\n")
+
+
+def label_file(
+    in_path,
+    out_path,
+    cfg: Optional[dict] = None,
+    *,
+    text_col: str = "address",
+    id_col: Optional[str] = "id",
+    fmt: str = "jsonl",
+    chunk_size: int = DEFAULT_CHUNK,
+    n_jobs: int = 1,
+    limit: Optional[int] = None,
+    hier_path: Optional[str] = None,
+    index_path: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    CSV'yi akış halinde etiketler; sıra korunur, bellekte en fazla
+    2 * n_jobs parça (chunk_size satır) bulunur.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt {FORMATS} içinden olmalı: {fmt!r}")
+    cfg = load_config() if cfg is None else cfg
+    chunk_size = max(1, int(chunk_size))
+    rows = _read_rows(in_path, text_col, id_col)
+    if limit:
+        rows = islice(rows, limit)
+    ids: deque = deque()
+
+    def _chunks():
+        for chunk in iter(lambda: list(islice(rows, chunk_size)), []):
+            ids.extend(rid for rid, _ in chunk)
+            yield [t for _, t in chunk]
+
+    out = Path(out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    stats = {"rows": 0, "tokens": 0, "tagged_tokens": 0, "tagged_rows": 0}
+    with ParseExecutor(n_jobs, progress=True, label="weak labels") as ex, \
+         out.open("w", encoding="utf-8", newline="\n") as f:
+        for res_chunk in ex.map_chunks(_label_chunk, _chunks(), cfg, hier_path, index_path):
+            for res in res_chunk:
+                _write(f, fmt, ids.popleft(), res)
+                tagged = sum(lab != "O" for lab in res["labels"])
+                stats["rows"] += 1
+                stats["tokens"] += len(res["tokens"])
+                stats["tagged_tokens"] += tagged
+                stats["tagged_rows"] += tagged > 0
+    print(f"[INFO] weak labels -> {out} ({fmt}) {stats}")
+    return stats
+
+
+def _parse_args():
+    import argparse
+
+    p = argparse.ArgumentParser(description="Gazetteer tabanlı weak labeling (BIO)")
+    p.add_argument("--input", default=str(ROOT / "data" / "raw" / "train.csv"))
+    p.add_argument("--output", default=None, help="Çıktı yolu; verilmezse ilk 5 satır yazdırılır")
+    p.add_argument("--config", default=str(CONFIG_PATH))
+    p.add_argument("--format", choices=FORMATS, default="jsonl")
+    p.add_argument("--text-col", default="address")
+    p.add_argument("--id-col", default="id")
+    p.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+    p.add_argument("--workers", "--n-jobs", dest="n_jobs", type=int, default=-1, help="-1: bütün çekirdekler")
+    p.add_argument("--limit", type=int, default=None)
+    return p.parse_args()
+
 
 if __name__ == "__main__":
-    cfg = load_config()
-    df = pd.read_csv("data/raw/train.csv")
-
-    for i, row in df.head(5).iterrows():
-        res = weak_label_address(row["address"], cfg)
-        print("Original :", row["address"])
-        print("Tokens   :", res["tokens"])
-        print("Labels   :", res["labels"])
-        print("="*60)
+    args = _parse_args()
+    cfg = load_config(args.config)
+    if args.output:
+        label_file(
+            args.input, args.output, cfg,
+            text_col=args.text_col, id_col=args.id_col, fmt=args.format,
+            chunk_size=args.chunk_size, n_jobs=args.n_jobs, limit=args.limit,
+        )
+    else:
+        for _, addr in islice(_read_rows(args.input, args.text_col, None), 5):
+            res = weak_label_address(addr, cfg)
+            print("Original :", addr)
+            print("Tokens   :", res["tokens"])
+            print("Labels   :", res["labels"])
+            print("=" * 60)
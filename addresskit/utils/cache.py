@@ -0,0 +1,238 @@
+# addresskit/utils/cache.py
+"""
+İçerik adresli (content-addressed) kalıcı normalizasyon/parse cache'i.
+
+Anahtar: (ham metnin hash'i, normalizer/parser sürümü, config hash'i).
+Tek bir SQLite dosyasında tutulur; train/test/left/right ve farklı günlerdeki
+çalıştırmalar aynı satırları tekrar hesaplamaz. Bir satır değişse bile yalnızca
+o satır yeniden hesaplanır (dosya bazlı MD5 cache'inin aksine).
+
+Boyut sınırı `max_entries` ile verilir; aşıldığında en uzun süredir
+erişilmeyen kayıtlar atılır (LRU). `hits` / `misses` / `evictions`
+sayaçları `stats()` ile okunur.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_MAX_ENTRIES = 2_000_000
+# sınır aşılınca kapasitenin bu oranına kadar temizle (her put'ta silmemek için)
+_EVICT_TO = 0.9
+# SQLite değişken limiti altında kalmak için toplu sorgu boyu
+_BATCH = 500
+
+
+def text_hash(text: str) -> str:
+    """Ham metnin 128-bit hash'i (hex)."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _str_keys(obj: Any) -> Any:
+    """Sözlük anahtarlarını özyinelemeli str yapar (YAML `no:` -> False gibi karışık tipler sıralanamaz)."""
+    if isinstance(obj, dict):
+        return {str(k): _str_keys(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_str_keys(v) for v in obj]
+    return obj
+
+
+def config_hash(cfg: Any) -> str:
+    """Config sözlüğünün sıralı JSON'ından kısa hash; cfg yoksa '-'."""
+    if not cfg:
+        return "-"
+    blob = json.dumps(_str_keys(cfg), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class ParseCache:
+    """
+    SQLite tabanlı, süreçler arası paylaşılabilen satır cache'i.
+
+    scope = "<namespace>@<version>#<config_hash>" — sürüm ya da config
+    değişince eski kayıtlar otomatik olarak devre dışı kalır (ve zamanla
+    LRU ile silinir). Değerler JSON olarak saklanır.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        namespace: str,
+        version: str,
+        cfg: Any = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = Path(path)
+        self.scope = f"{namespace}@{version}#{config_hash(cfg)}"
+        self.max_entries = int(max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._touched: set[str] = set()
+        self._count: Optional[int] = None
+
+    # ---------- bağlantı ----------
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=60)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " scope TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " atime INTEGER NOT NULL, PRIMARY KEY (scope, key)) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_atime ON entries(atime)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def __getstate__(self):
+        # worker süreçlerine bağlantı taşınmaz; her süreç kendi bağlantısını açar
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_touched"] = set()
+        state["_count"] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    # ---------- okuma ----------
+    def get(self, text: str) -> Any:
+        """Cache'teki değeri döndürür; yoksa None."""
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: Sequence[str]) -> List[Any]:
+        """Toplu okuma; sıra korunur, bulunamayanlar None."""
+        keys = [text_hash(t) for t in texts]
+        found: dict[str, str] = {}
+        db = self._db()
+        uniq = list(dict.fromkeys(keys))
+        for i in range(0, len(uniq), _BATCH):
+            chunk = uniq[i : i + _BATCH]
+            q = (
+                "SELECT key, value FROM entries WHERE scope=? AND key IN (%s)"
+                % ",".join("?" * len(chunk))
+            )
+            found.update(db.execute(q, [self.scope, *chunk]).fetchall())
+        out: List[Any] = []
+        for k in keys:
+            v = found.get(k)
+            if v is None:
+                self.misses += 1
+                out.append(None)
+            else:
+                self.hits += 1
+                self._touched.add(k)
+                out.append(json.loads(v))
+        return out
+
+    # ---------- yazma ----------
+    def put(self, text: str, value: Any) -> None:
+        self.put_many([(text, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        now = int(time.time())
+        rows = [
+            (self.scope, text_hash(t), json.dumps(v, ensure_ascii=False), now)
+            for t, v in items
+        ]
+        if not rows:
+            return
+        db = self._db()
+        before = db.total_changes
+        db.executemany("INSERT OR IGNORE INTO entries VALUES (?,?,?,?)", rows)
+        inserted = db.total_changes - before
+        self._flush_touched(now)
+        db.commit()
+        if self._count is not None:
+            self._count += inserted
+        self._maybe_evict()
+
+    def get_or_compute(self, text: str, fn: Callable[[str], Any]) -> Any:
+        v = self.get(text)
+        if v is None:
+            v = fn(text)
+            self.put(text, v)
+        return v
+
+    # ---------- bakım ----------
+    def _flush_touched(self, now: Optional[int] = None) -> None:
+        if not self._touched or self._conn is None:
+            return
+        now = now or int(time.time())
+        self._conn.executemany(
+            "UPDATE entries SET atime=? WHERE scope=? AND key=?",
+            [(now, self.scope, k) for k in self._touched],
+        )
+        self._touched.clear()
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = self._db().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return self._count
+
+    def _maybe_evict(self) -> None:
+        n = len(self)
+        if n <= self.max_entries:
+            return
+        drop = n - int(self.max_entries * _EVICT_TO)
+        db = self._db()
+        db.execute(
+            "DELETE FROM entries WHERE (scope, key) IN ("
+            " SELECT scope, key FROM entries ORDER BY atime LIMIT ?)",
+            (drop,),
+        )
+        db.commit()
+        self.evictions += drop
+        self._count = n - drop
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self),
+        }
+
+    def __repr__(self) -> str:
+        return f"ParseCache({str(self.path)!r}, scope={self.scope!r})"
+
+
+def cached_map(
+    texts: Sequence[str],
+    fn: Callable[[List[str]], List[Any]],
+    cache: Optional[ParseCache],
+) -> List[Any]:
+    """
+    texts için değerleri döndürür: önce cache'e toplu bakar, yalnızca eksikleri
+    fn(list) ile hesaplar (tekrarlı metinler tek kez), sonra cache'e yazar.
+    """
+    if cache is None:
+        return fn(list(texts))
+    out = cache.get_many(texts)
+    todo = list(dict.fromkeys(t for t, v in zip(texts, out) if v is None))
+    if todo:
+        computed = dict(zip(todo, fn(todo)))
+        cache.put_many(computed.items())
+        out = [computed[t] if v is None else v for t, v in zip(texts, out)]
+    return out
@@ -0,0 +1,180 @@
+# addresskit/utils/dedup.py
+"""
+64-bit parmak izi tabanlı tekrar tespiti.
+
+Satırlar / adresler bir kez uint64 parmak izine çevrilir (pandas'ın
+vektörel hash'i; pandas yoksa blake2b) ve tekrar kontrolü NumPy dizileri
+üzerinde yapılır. `FingerprintIndex` parça parça güncellenir; büyük dosyalar
+satır nesneleri bellekte tutulmadan tekilleştirilir.
+
+    dd = ChunkDeduper()
+    for df in chunks:
+        keep, dup, rows = dd.update(row_fingerprints(df, raw_cols),
+                                    fingerprints(df["address_clean"]))
+    dd.late_duplicates()   # ilk yazıldığında tekil görünüp sonra tekrarı çıkanlar
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+_U64 = np.uint64
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _hash_python(values: Sequence[Any]) -> np.ndarray:
+    out = np.empty(len(values), dtype=_U64)
+    for i, v in enumerate(values):
+        d = hashlib.blake2b(str(v).encode("utf-8"), digest_size=8).digest()
+        out[i] = int.from_bytes(d, "little")
+    return out
+
+
+def fingerprints(values: Any) -> np.ndarray:
+    """Değer başına 64-bit parmak izi (uint64). None/NaN ayrı bir değer olarak hash'lenir."""
+    try:
+        from pandas.util import hash_array
+    except ImportError:
+        return _hash_python(list(values))
+    arr = np.asarray(values, dtype=object)
+    return hash_array(arr, categorize=False).astype(_U64, copy=False)
+
+
+def row_fingerprints(frame: Any, columns: Optional[Sequence[str]] = None) -> np.ndarray:
+    """
+    DataFrame (ya da {kolon: değerler}) satırları için 64-bit parmak izi;
+    kolon sırası anlamlıdır.
+    """
+    cols = list(columns) if columns is not None else list(frame.keys())
+    if not cols:
+        return np.zeros(len(frame), dtype=_U64)
+    out = None
+    with np.errstate(over="ignore"):
+        for c in cols:
+            h = fingerprints(frame[c])
+            out = h if out is None else (out * _MIX) ^ h
+    return out
+
+
+def occurrence_rank(fps: np.ndarray) -> np.ndarray:
+    """Her elemanın dizide kendisinden önce kaç kez geçtiği (0 = ilk geçiş)."""
+    fps = np.asarray(fps, dtype=_U64)
+    order = np.argsort(fps, kind="stable")
+    s = fps[order]
+    starts = np.ones(len(s), dtype=bool)
+    starts[1:] = s[1:] != s[:-1]
+    group_start = np.maximum.accumulate(np.where(starts, np.arange(len(s)), 0))
+    rank = np.empty(len(s), dtype=np.int64)
+    rank[order] = np.arange(len(s)) - group_start
+    return rank
+
+
+def duplicated(fps: np.ndarray, keep: Any = "first") -> np.ndarray:
+    """pandas.duplicated karşılığı: keep='first' sonrakileri, keep=False hepsini işaretler."""
+    fps = np.asarray(fps, dtype=_U64)
+    if keep is False:
+        _, inv, counts = np.unique(fps, return_inverse=True, return_counts=True)
+        return counts[inv] > 1
+    return occurrence_rank(fps) > 0
+
+
+class FingerprintIndex:
+    """
+    Sıralı uint64 anahtarlar + görülme sayısı + ilk görüldüğü satır no.
+    Bellek: tekil anahtar başına 24 bayt.
+    """
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=_U64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.first = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _find(self, fps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        pos = np.searchsorted(self.keys, fps)
+        found = pos < len(self.keys)
+        found[found] = self.keys[pos[found]] == fps[found]
+        return found, pos
+
+    def prior(self, fps: np.ndarray) -> np.ndarray:
+        """Her elemanın önceki parçalarda + bu dizide kendisinden önce kaç kez görüldüğü."""
+        fps = np.asarray(fps, dtype=_U64)
+        found, pos = self._find(fps)
+        before = np.zeros(len(fps), dtype=np.int64)
+        before[found] = self.counts[pos[found]]
+        return before + occurrence_rank(fps)
+
+    def add(self, fps: np.ndarray, rows: Optional[np.ndarray] = None) -> None:
+        """Sayaçları güncelle; yeni anahtarlar için ilk geçişin satır nosunu (rows) kaydet."""
+        fps = np.asarray(fps, dtype=_U64)
+        if not len(fps):
+            return
+        uniq, first_idx, counts = np.unique(fps, return_index=True, return_counts=True)
+        found, pos = self._find(uniq)
+        np.add.at(self.counts, pos[found], counts[found])
+        new = ~found
+        if new.any():
+            first = np.full(int(new.sum()), -1, dtype=np.int64)
+            if rows is not None:
+                first = np.asarray(rows, dtype=np.int64)[first_idx[new]]
+            keys = np.concatenate([self.keys, uniq[new]])
+            order = np.argsort(keys, kind="stable")
+            self.keys = keys[order]
+            self.counts = np.concatenate([self.counts, counts[new]])[order]
+            self.first = np.concatenate([self.first, first])[order]
+
+    def seen(self, fps: np.ndarray) -> np.ndarray:
+        """Önceden görülenleri işaretle (ilk geçiş False) ve ekle."""
+        dup = self.prior(fps) > 0
+        self.add(fps)
+        return dup
+
+    def repeated_first_rows(self) -> np.ndarray:
+        """Birden çok kez görülen anahtarların ilk satır noları."""
+        rows = self.first[self.counts > 1]
+        return rows[rows >= 0]
+
+
+class ChunkDeduper:
+    """
+    Parçalar arası tam satır + address_clean tekrarları (pandas
+    drop_duplicates / duplicated(keep=False) sırasıyla aynı sonuç).
+    """
+
+    def __init__(self, drop_exact: bool = True, drop_clean: bool = True):
+        self.drop_exact = drop_exact
+        self.drop_clean = drop_clean
+        self.rows = FingerprintIndex()
+        self.clean = FingerprintIndex()
+        self.written = 0
+        self.dropped_exact = 0
+        self.dropped_clean = 0
+
+    def update(self, row_fps: np.ndarray, clean_fps: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Parçadaki satırlar için (tut?, is_duplicate_clean, yazılan satır no / -1).
+        is_duplicate_clean ilk geçiş için geçicidir; bkz. late_duplicates.
+        """
+        n_before = self.clean.prior(clean_fps)
+        keep = np.ones(len(clean_fps), dtype=bool)
+        if self.drop_exact:
+            exact = self.rows.seen(row_fps)
+            self.dropped_exact += int(exact.sum())
+            keep &= ~exact
+        if self.drop_clean:
+            again = keep & (n_before > 0)
+            self.dropped_clean += int(again.sum())
+            keep &= ~again
+        rows = np.full(len(keep), -1, dtype=np.int64)
+        rows[keep] = self.written + np.arange(int(keep.sum()))
+        self.written += int(keep.sum())
+        self.clean.add(clean_fps, rows)
+        return keep, (n_before > 0).astype(np.int8), rows
+
+    def late_duplicates(self) -> np.ndarray:
+        """Tekil yazılıp sonradan tekrarı görülen satırların noları (is_duplicate_clean -> 1)."""
+        return self.clean.repeated_first_rows()
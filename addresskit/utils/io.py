@@ -1,4 +1,48 @@
 # addresskit/utils/io.py
+import io
 from pathlib import Path
+
+DEFAULT_CSV_CHUNK = 100_000
+
+
 def ensure_parent_dir(path: str):
     Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+
+def read_csv_chunks(path, chunk_rows: int = DEFAULT_CSV_CHUNK, encoding: str = "utf-8", **kw):
+    """
+    CSV'yi C motoruyla chunk_rows kayıtlık DataFrame'ler halinde okur; bozuk
+    (fazla alanlı) satırlar atlanır. Tüm kolonlar str, boşlar "" gelir.
+
+    pandas'ın chunksize'ı, bir parçanın ilk satırı fazla alanlıysa onu atmak
+    yerine kırpıp tutuyor (tek parça okumada da ilk veri satırı için aynı
+    durum var). Bu yüzden dosya kayıt sınırlarından (tırnak dengesi)
+    bölünür ve her parçanın başına atılacak boş bir satır eklenir.
+    """
+    import pandas as pd
+
+    opts = dict(engine="c", on_bad_lines="skip", dtype=str, keep_default_na=False, encoding=encoding)
+    opts.update(kw)
+    chunk_rows = max(1, int(chunk_rows))
+    with open(path, "rb") as f:
+        header = f.readline()
+        n_cols = len(pd.read_csv(io.BytesIO(header), **opts).columns)
+        pad = b'""' + b"," * (n_cols - 1) + b"\n"
+
+        def _frame(lines):
+            df = pd.read_csv(io.BytesIO(header + pad + b"".join(lines)), **opts)
+            return df.iloc[1:].reset_index(drop=True)
+
+        buf, n, odd = [], 0, False
+        for line in f:
+            buf.append(line)
+            if line.count(b'"') % 2:
+                odd = not odd
+            if odd:  # tırnak içindeki satır sonu: kayıt devam ediyor
+                continue
+            n += 1
+            if n >= chunk_rows:
+                yield _frame(buf)
+                buf, n = [], 0
+        if buf:
+            yield _frame(buf)
@@ -1,8 +1,9 @@
 # addresskit/utils/seeds.py
 import random
-import numpy as np
 
 
 def set_seeds(seed=42):
+    import numpy as np
+
     random.seed(seed)
     np.random.seed(seed)
@@ -0,0 +1,133 @@
+# addresskit/utils/startup.py
+"""
+Giriş noktalarının import (başlangıç) süresi ölçümü ve bütçe kontrolü.
+
+Her modül ayrı bir `python -X importtime -c "import <modül>"` sürecinde
+yüklenir; yorumlayıcının kendi başlangıç import'ları çıkarılır ve tekrarların
+en küçüğü alınır. Bütçeler configs/startup_budget.yaml'dadır:
+
+    addresskit.match:
+      max_ms: 60                     # kümülatif import süresi üst sınırı
+      forbid: [yaml, rapidfuzz]      # import anında yüklenmemesi gereken paketler
+
+    python -m addresskit.utils.startup --check    # bütçe aşılırsa çıkış kodu 1
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+BUDGET_PATH = ROOT / "configs" / "startup_budget.yaml"
+
+
+class Measurement(NamedTuple):
+    module: str
+    ms: float  # kümülatif import süresi (yorumlayıcı başlangıcı hariç)
+    modules: frozenset  # yüklenen bütün modül adları
+
+    def forbidden(self, names: Sequence[str]) -> List[str]:
+        """names içindeki paketlerden (alt modülleri dahil) yüklenmiş olanlar."""
+        return sorted(
+            n for n in names if any(m == n or m.startswith(n + ".") for m in self.modules)
+        )
+
+
+def _importtime(code: str, python: str) -> List[Tuple[int, str, int]]:
+    """(kümülatif µs, modül, girinti) satırları."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or [""]
+        raise RuntimeError(f"import başarısız: {code!r}: {tail[0]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cum), name.strip(), len(name) - len(name.lstrip())))
+    return rows
+
+
+def _baseline(python: str) -> Set[str]:
+    return {name for _, name, _ in _importtime("pass", python)}
+
+
+def measure(
+    module: str, repeat: int = 3, python: Optional[str] = None, baseline: Optional[Set[str]] = None
+) -> Measurement:
+    python = python or sys.executable
+    base = _baseline(python) if baseline is None else baseline
+    best = None
+    names: Set[str] = set()
+    for _ in range(max(1, repeat)):
+        rows = _importtime(f"import {module}", python)
+        # girintisi en az olan satırlar doğrudan yapılan import'lardır
+        top = min((ind for _, n, ind in rows if n not in base), default=0)
+        us = sum(cum for cum, n, ind in rows if ind == top and n not in base)
+        names = {n for _, n, _ in rows}
+        best = us if best is None else min(best, us)
+    return Measurement(module, (best or 0) / 1000.0, frozenset(names))
+
+
+def load_budgets(path: Path | str = BUDGET_PATH) -> Dict[str, dict]:
+    import yaml
+
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def check(budgets: Dict[str, dict], repeat: int = 3, python: Optional[str] = None) -> List[str]:
+    """Bütçeleri ölçer ve yazdırır; ihlal mesajlarını döndürür (boş = temiz)."""
+    python = python or sys.executable
+    base = _baseline(python)
+    errors: List[str] = []
+    for module, spec in budgets.items():
+        spec = spec or {}
+        try:
+            m = measure(module, repeat=repeat, python=python, baseline=base)
+        except RuntimeError as e:
+            errors.append(str(e))
+            print(f"[startup] {module:<45} {'-':>8}     ERROR")
+            continue
+        limit = spec.get("max_ms")
+        bad = m.forbidden(spec.get("forbid") or [])
+        status = "ok"
+        if limit is not None and m.ms > float(limit):
+            status = "SLOW"
+            errors.append(f"{module}: {m.ms:.1f} ms > {limit} ms")
+        if bad:
+            status = "FORBID"
+            errors.append(f"{module}: import anında yüklendi: {', '.join(bad)}")
+        print(f"[startup] {module:<45} {m.ms:>8.1f} ms  (bütçe {limit} ms)  {status}")
+    return errors
+
+
+def _parse_args():
+    p = argparse.ArgumentParser(description="Giriş noktası import süresi bütçesi")
+    p.add_argument("modules", nargs="*", help="Yalnız bu modüller (varsayılan: bütçe dosyasındakiler)")
+    p.add_argument("--budget", default=str(BUDGET_PATH))
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--check", action="store_true", help="İhlalde çıkış kodu 1")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    budgets = load_budgets(args.budget)
+    if args.modules:
+        budgets = {m: budgets.get(m) or {} for m in args.modules}
+    errors = check(budgets, repeat=args.repeat)
+    for e in errors:
+        print(f"[WARN] {e}")
+    if args.check and errors:
+        sys.exit(1)
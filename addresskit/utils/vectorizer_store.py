@@ -0,0 +1,101 @@
+# addresskit/utils/vectorizer_store.py
+"""
+İçerik adresli özellik cache'i: fit edilmiş vektörizerler + CSR matrisler.
+
+Anahtar: (girdi metinlerinin hash'i, vektörizer parametreleri, mod).
+Girdi ya da parametreler değişmedikçe tekrar çalıştırmalar ve
+hiperparametre taramaları featurization'ı tamamen atlar.
+
+    store = VectorizerStore("data/interim/features")
+    key = store.key("tfidf", params, [data_digest(tr), data_digest(te)])
+    hit = store.load(key)            # (X_tr, X_te, bundle) ya da None
+    if hit is None:
+        ...
+        store.save(key, X_tr, X_te, bundle)
+
+Dizin düzeni: <root>/<key>/{X_tr.npz, X_te.npz, bundle.joblib, meta.json}.
+Yazma önce geçici dizine yapılır, sonra tek adımda yerine taşınır.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .cache import config_hash
+
+
+def data_digest(texts: Sequence[Any]) -> str:
+    """Metin dizisinin sıraya duyarlı 128-bit hash'i (64-bit parmak izleri üzerinden)."""
+    from .dedup import fingerprints
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(len(texts)).encode("ascii"))
+    h.update(fingerprints(["" if t is None else str(t) for t in texts]).tobytes())
+    return h.hexdigest()
+
+
+def vectorizer_params(vec: Any) -> Dict[str, Any]:
+    """Anahtar için parametreler: HashedChannel.params() ya da sklearn get_params()."""
+    if hasattr(vec, "params"):
+        return vec.params()
+    return dict(vec.get_params(deep=False))
+
+
+class VectorizerStore:
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(mode: str, params: Dict[str, Any], digests: Sequence[str]) -> str:
+        return f"{mode}-{config_hash({'params': params, 'data': list(digests)})}"
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def load(self, key: str) -> Optional[Tuple[Any, Any, Dict[str, Any]]]:
+        d = self.path(key)
+        if not (d / "meta.json").exists():
+            self.misses += 1
+            return None
+        import joblib
+        import scipy.sparse as sp
+
+        X_tr = sp.load_npz(d / "X_tr.npz").tocsr()
+        X_te = sp.load_npz(d / "X_te.npz").tocsr()
+        bundle = joblib.load(d / "bundle.joblib")
+        self.hits += 1
+        return X_tr, X_te, bundle
+
+    def save(self, key: str, X_tr, X_te, bundle: Dict[str, Any], meta: Optional[dict] = None) -> Path:
+        import joblib
+        import scipy.sparse as sp
+
+        final = self.path(key)
+        tmp = self.root / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        sp.save_npz(tmp / "X_tr.npz", X_tr.tocsr(), compressed=False)
+        sp.save_npz(tmp / "X_te.npz", X_te.tocsr(), compressed=False)
+        joblib.dump(bundle, tmp / "bundle.joblib")
+        info = {"key": key, "created": int(time.time()),
+                "shape_tr": list(X_tr.shape), "shape_te": list(X_te.shape), **(meta or {})}
+        with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(info, f, ensure_ascii=False, indent=2, default=str)
+        if final.exists():  # aynı anahtar başka bir çalıştırmada yazılmış
+            shutil.rmtree(tmp, ignore_errors=True)
+            return final
+        os.replace(tmp, final)
+        return final
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def __repr__(self) -> str:
+        return f"VectorizerStore({str(self.root)!r})"
@@ -3,12 +3,11 @@
 TF‑IDF en yakın komşu baseline (paralel + cache'li).
 Kullanım (proje kökünden):
   python -m scripts.baseline_submission \
-    --min_df 2 --ngram_hi 2 --n_jobs -1 --max_features 300000
+    --min_df 2 --ngram_hi 2 --workers -1 --max_features 300000
 """
 
-import os, sys, json, gzip, pickle, hashlib, argparse
+import os, sys, json, argparse
 from time import perf_counter
-from joblib import Parallel, delayed
 
 import pandas as pd
 
@@ -18,16 +17,20 @@ ROOT = os.path.abspath(os.path.join(HERE, ".."))
 DATA = os.path.join(ROOT, "data")
 RAW = os.path.join(DATA, "raw")
 PROC = os.path.join(DATA, "processed")
-os.makedirs(PROC, exist_ok=True)
+PARSE_CACHE = os.path.join(DATA, "interim", "parse_cache.sqlite")
 
 # ---------- Paket importları ----------
 try:
-    from addresskit.preprocessing.normalize_and_parse import normalize_and_parse
-    from addresskit.preprocessing.postprocess import postprocess_parts
+    from addresskit.preprocessing import parse_many
+    from addresskit.preprocessing.executor import ParseExecutor
+    from addresskit.preprocessing.pipeline import PIPELINE_VERSION, parse_address, pipeline_cfg
+    from addresskit.utils.cache import ParseCache, cached_map
 except Exception:
     sys.path.append(ROOT)
-    from addresskit.preprocessing.normalize_and_parse import normalize_and_parse  # type: ignore
-    from addresskit.preprocessing.postprocess import postprocess_parts  # type: ignore
+    from addresskit.preprocessing import parse_many  # type: ignore
+    from addresskit.preprocessing.executor import ParseExecutor  # type: ignore
+    from addresskit.preprocessing.pipeline import PIPELINE_VERSION, parse_address, pipeline_cfg  # type: ignore
+    from addresskit.utils.cache import ParseCache, cached_map  # type: ignore
 
 # ---------- Yardımcılar ----------
 def pick_text_col(df: pd.DataFrame) -> str:
@@ -48,65 +51,64 @@ def safe_str(x) -> str:
     s = str(x)
     return "" if s.lower() in {"nan","none"} else s
 
-def _hash_file(path: str) -> str:
-    h = hashlib.md5()
-    with open(path, "rb") as f:
-        while chunk := f.read(1<<20):
-            h.update(chunk)
-    return h.hexdigest()
-
-def _cache_path(tag: str, src_path: str) -> str:
-    return os.path.join(PROC, f"{tag}_{_hash_file(src_path)}.pkl.gz")
+SIG_KEYS = ("mahalle","cadde","sokak","no","kat","daire","ilçe","il","bina_adı","mevkii")
 
 def _normalize_one(s: str) -> str:
-    norm, parts = normalize_and_parse(safe_str(s))
-    parts = postprocess_parts(norm, parts)
-    sig_keys = ("mahalle","cadde","sokak","no","kat","daire","ilçe","il","bina_adı","mevkii")
-    sig = " ".join(f"{k}:{parts[k]}" for k in sig_keys if parts.get(k))
+    norm, parts = parse_address(safe_str(s))
+    sig = " ".join(f"{k}:{parts[k]}" for k in SIG_KEYS if parts.get(k))
     return (norm + " | " + sig).strip()
 
-def normalize_series_with_cache(series: pd.Series, tag: str, src_path: str, n_jobs=-1, chunk=2000):
-    cpath = _cache_path(tag, src_path)
-    if os.path.exists(cpath):
-        with gzip.open(cpath, "rb") as f:
-            print(f"[CACHE] Yükleniyor -> {os.path.basename(cpath)}")
-            return pickle.load(f)
-
+def _signatures(batch) -> list:
+    """_normalize_one'ın kolon bazlı hali: 'normalized | k:v ...'."""
+    cols = [batch[k] for k in SIG_KEYS]
+    return [
+        (norm + " | " + " ".join(f"{k}:{v}" for k, v in zip(SIG_KEYS, vals) if v)).strip()
+        for norm, vals in zip(batch.normalized, zip(*cols))
+    ]
+
+def normalize_series_with_cache(series: pd.Series, cache_path=PARSE_CACHE, n_jobs=-1, chunk=2000,
+                                executor=None):
+    """
+    Satır bazlı kalıcı cache: yalnızca cache'te olmayan (yeni/değişmiş) adresler
+    normalize edilir. cache_path=None -> cache kapalı. executor (ParseExecutor)
+    verilirse train/test aynı süreç havuzunu kullanır.
+    """
     texts = series.fillna("").astype(str).tolist()
-    print(f"[INFO] Normalize başlıyor (n={len(texts)}, jobs={n_jobs})")
     t0 = perf_counter()
 
-    def norm_chunk(lst):  # tek işlemci bir parça
-        return [_normalize_one(x) for x in lst]
-
-    parts = Parallel(n_jobs=n_jobs, prefer="threads", verbose=5)(
-        delayed(norm_chunk)(texts[i:i+chunk])
-        for i in range(0, len(texts), chunk)
-    )
-    res = [y for ch in parts for y in ch]
+    def norm_all(lst):
+        print(f"[INFO] Normalize başlıyor (n={len(lst)}, jobs={executor.workers if executor else n_jobs})")
+        return _signatures(parse_many([safe_str(x) for x in lst], chunk_size=chunk, n_jobs=n_jobs,
+                                      executor=executor))
+
+    if cache_path:
+        # _normalize_one imzası parse sürümüne bağlı; ayrı namespace altında tutulur
+        with ParseCache(cache_path, "baseline_signature", PIPELINE_VERSION, cfg=pipeline_cfg()) as cache:
+            res = cached_map(texts, norm_all, cache)
+            print(f"[CACHE] {cache.stats()}")
+    else:
+        res = norm_all(texts)
     print(f"[OK] Normalize bitti. Süre: {perf_counter()-t0:.1f}s")
-
-    with gzip.open(cpath, "wb") as f:
-        pickle.dump(res, f, protocol=pickle.HIGHEST_PROTOCOL)
-    print(f"[CACHE] Yazıldı -> {os.path.basename(cpath)}")
     return res
 
-def build_tfidf_index(train_texts, min_df=2, max_features=None, ngram_hi=2):
+def build_tfidf_index(train_texts, min_df=2, max_features=None, ngram_hi=2, n_jobs=-1):
+    import numpy as np
     from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.neighbors import NearestNeighbors
+    from addresskit.matching.sparse_knn import SparseKNN
     vec = TfidfVectorizer(ngram_range=(1, ngram_hi),
                           min_df=min_df,
-                          max_features=max_features)
+                          max_features=max_features,
+                          dtype=np.float32)
     X = vec.fit_transform(train_texts)
-    nn = NearestNeighbors(n_neighbors=1, metric="cosine").fit(X)
+    nn = SparseKNN(X, n_jobs=n_jobs)  # parça parça seyrek top-k
     return vec, nn, X.shape
 
 def tfidf_nn_predict(vec, nn, query_texts, train_labels):
+    import numpy as np
     Xq = vec.transform(query_texts)
-    dists, idxs = nn.kneighbors(Xq, n_neighbors=1)
-    labels = [train_labels[i[0]] for i in idxs]
-    sims = [(1.0 - float(d[0])) for d in dists]
-    return labels, sims
+    idxs, sims = nn.search(Xq, k=1)
+    labels = np.asarray(train_labels, dtype=object)[idxs[:, 0]].tolist()
+    return labels, sims[:, 0].astype(float).tolist()
 
 # ---------- Ana akış ----------
 def main():
@@ -119,7 +121,8 @@ def main():
     ap.add_argument("--max_features", type=int, default=None)
     ap.add_argument("--limit_train", type=int, default=None)
     ap.add_argument("--limit_test", type=int, default=None)
-    ap.add_argument("--n_jobs", type=int, default=-1)  # -1 = tüm çekirdekler
+    ap.add_argument("--workers", "--n_jobs", dest="n_jobs", type=int, default=-1)  # -1 = tüm çekirdekler
+    ap.add_argument("--cache", default=PARSE_CACHE, help="Kalıcı parse cache (SQLite); boş = kapalı")
     args = ap.parse_args()
 
     if not os.path.exists(args.train_csv): raise FileNotFoundError(args.train_csv)
@@ -143,19 +146,19 @@ def main():
     ids = test[id_col].tolist() if id_col else list(range(1, len(test)+1))
 
     # ---- normalize (paralel + cache)
-    print("[INFO] Train normalize ediliyor...")
-    tr_norm = normalize_series_with_cache(train[text_col], "train_norm",
-                                          src_path=args.train_csv, n_jobs=args.n_jobs)
-    print("[INFO] Test normalize ediliyor...")
-    te_norm = normalize_series_with_cache(test[test_text], "test_norm",
-                                          src_path=args.test_csv, n_jobs=args.n_jobs)
+    with ParseExecutor(args.n_jobs, progress=True) as ex:
+        print("[INFO] Train normalize ediliyor...")
+        tr_norm = normalize_series_with_cache(train[text_col], cache_path=args.cache, executor=ex)
+        print("[INFO] Test normalize ediliyor...")
+        te_norm = normalize_series_with_cache(test[test_text], cache_path=args.cache, executor=ex)
 
     # ---- TF‑IDF + 1‑NN
     from sklearn.exceptions import ConvergenceWarning  # sadece import, uyarı yok
     vec, nn, shape = build_tfidf_index(tr_norm,
                                        min_df=args.min_df,
                                        max_features=args.max_features,
-                                       ngram_hi=args.ngram_hi)
+                                       ngram_hi=args.ngram_hi,
+                                       n_jobs=args.n_jobs)
     print(f"[INFO] TF‑IDF matrisi: {shape[0]} x {shape[1]}")
     t0 = perf_counter()
     preds, sims = tfidf_nn_predict(vec, nn, te_norm, train[label_col].tolist())
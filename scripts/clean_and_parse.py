@@ -7,23 +7,46 @@ Türkçe adres temizleme + normalizasyon + parça çıkarımı
 - Tam satır dup'ları ve address_clean dup'ları düşürülür
 - Şüpheli satırlar opsiyonel olarak atılabilir veya ayrı dosyaya yazılır
 """
+from __future__ import annotations
 
 import os
 import re
+import sys
 import unicodedata
-import pandas as pd
-from typing import Dict, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    from addresskit.utils.cache import ParseCache
+    from addresskit.utils.io import read_csv_chunks
+    from addresskit.preprocessing.batch import ParsedBatch, parse_many
+    from addresskit.preprocessing.executor import ParseExecutor
+    from addresskit.preprocessing.gazetteer import load_gazetteer, tokenize as gazetteer_tokenize
+    from addresskit.preprocessing.rewrite import Rewriter, rules_from_regex_table
+except Exception:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from addresskit.utils.cache import ParseCache  # type: ignore
+    from addresskit.utils.io import read_csv_chunks  # type: ignore
+    from addresskit.preprocessing.batch import ParsedBatch, parse_many  # type: ignore
+    from addresskit.preprocessing.executor import ParseExecutor  # type: ignore
+    from addresskit.preprocessing.gazetteer import load_gazetteer, tokenize as gazetteer_tokenize  # type: ignore
+    from addresskit.preprocessing.rewrite import Rewriter, rules_from_regex_table  # type: ignore
 
 # ---------------- I/O ----------------
 ROOT_DIR = os.path.dirname(os.path.dirname(__file__))  # repo kökü
 RAW_DIR  = os.path.join(ROOT_DIR, "data", "raw")
 OUT_DIR  = os.path.join(ROOT_DIR, "data", "processed")
-os.makedirs(OUT_DIR, exist_ok=True)
 
 TRAIN_IN  = os.path.join(RAW_DIR, "train.csv")
 TEST_IN   = os.path.join(RAW_DIR, "test.csv")
 TRAIN_OUT = os.path.join(OUT_DIR, "train_clean_parsed.csv")
 TEST_OUT  = os.path.join(OUT_DIR, "test_clean_parsed.csv")
+PARSE_CACHE = os.path.join(ROOT_DIR, "data", "interim", "parse_cache.sqlite")
+
+# normalize_address / normalize_and_parse çıktısı değişirse artır (cache anahtarı)
+CLEAN_PARSE_VERSION = "2"
 
 # ---------------- Regex Yardımcıları ----------------
 MULTISPACE_RE = re.compile(r"\s+")
@@ -80,6 +103,9 @@ CANONICAL_SUBS = [
     (r"\bap\b", "apartman"),
     (r"\bblv\b", "bulvar"),
 ]
+# CANONICAL_SUBS'un derlenmiş hali: literal kurallar tek taramada, geri kalan
+# regex'ler (mah., kapı\s*no ...) sıralarında uygulanır
+_CANONICAL_REWRITER = Rewriter(rules_from_regex_table(CANONICAL_SUBS), "CANONICAL_SUBS")
 
 NO_FIX_RE    = re.compile(r"\bno\s*([0-9]+[a-z]?(?:/[0-9a-z]+)?)\b", re.IGNORECASE)
 KAT_FIX_RE   = re.compile(r"\bkat\s*([0-9]+[a-z]?)\b", re.IGNORECASE)
@@ -91,8 +117,7 @@ def normalize_address(raw: str) -> str:
     s = strip_punct_but_keep_address_separators(s)
     s = re.sub(r"(\d+)\.(sokak|cadde|mahalle)\b", r"\1 \2", s)
     s = re.sub(r"(?<!\d)/(?!\d)", " / ", s)
-    for pat, repl in CANONICAL_SUBS:
-        s = re.sub(pat, repl, s)
+    s = _CANONICAL_REWRITER(s)
     s = NO_FIX_RE.sub(r"no \1", s)
     s = KAT_FIX_RE.sub(r"kat \1", s)
     s = DAIRE_FIX_RE.sub(r"daire \1", s)
@@ -114,29 +139,12 @@ def extract_following_name(text: str, anchor: str) -> str:
         return val
     return ""
 
-CITY_HINTS = {
-    "istanbul","ankara","izmir","bursa","antalya","muğla","aydın","tekirdağ","kocaeli","konya",
-    "adana","mersin","samsun","eskişehir","trabzon","kayseri","gaziantep","balıkesir","manisa",
-    "şanlıurfa","diyarbakır","hatay","k.maraş","kahramanmaraş","denizli","sakarya","tekirdag"
-}
-DISTRICT_HINTS = {
-    "fethiye","çeşme","bodrum","kartal","kadıköy","üsküdar","ataşehir","bornova","konak","mamak",
-    "keçiören","tepebaşı","odunpazarı","tarsus","tekkeköy","buca","karabağlar","karşıyaka","menemen",
-    "bayrakli","bayraklı","çamlıyayla","muratpaşa","kepez","seyhan","yüreğir","çankaya","yenimahalle"
-}
-
 def guess_city_district(text: str) -> Dict[str, str]:
-    il = ilce = ""
-    pieces = [norm_spaces(x) for x in re.split(r"/", text)]
-    for p in reversed(pieces):
-        toks = set(p.split())
-        if not il and (toks & CITY_HINTS):
-            il = list(toks & CITY_HINTS)[0]
-        if not ilce and (toks & DISTRICT_HINTS):
-            ilce = list(toks & DISTRICT_HINTS)[0]
+    # il/ilçe adları ortak gazetteer'dan; ilçe seçilen ile ait olmalı
+    place = load_gazetteer().locate(gazetteer_tokenize(text))
     out = {}
-    if il: out["il"] = il
-    if ilce: out["ilce"] = ilce
+    if place.il: out["il"] = place.il
+    if place.ilce: out["ilce"] = place.ilce
     return out
 
 def normalize_and_parse(raw: str) -> Tuple[str, Dict[str, str]]:
@@ -199,8 +207,21 @@ def normalize_and_parse(raw: str) -> Tuple[str, Dict[str, str]]:
 
     return txt, parts
 
+def open_clean_parse_cache(path: str) -> ParseCache:
+    return ParseCache(path, "clean_and_parse", CLEAN_PARSE_VERSION,
+                      cfg={"gazetteer": load_gazetteer().fingerprint()})
+
+def parse_many_cached(
+    texts: List[str], cache: Optional[ParseCache] = None, n_jobs: int = 1,
+    executor: Optional[ParseExecutor] = None,
+) -> ParsedBatch:
+    """normalize_and_parse'ın toplu, cache'li, kolon bazlı hali (yalnızca eksikler hesaplanır)."""
+    return parse_many(
+        texts, cache, parse_fn=normalize_and_parse, keys=PART_COLS, n_jobs=n_jobs, executor=executor
+    )
+
 # -------------- Kalite metrikleri --------------
-def add_quality_flags(df: pd.DataFrame, col: str) -> pd.DataFrame:
+def add_quality_flags(df: pd.DataFrame, col: str, duplicates: bool = True) -> pd.DataFrame:
     s = df[col].astype(str)
     df["char_len"]    = s.str.len()
     df["word_len"]    = s.str.split().map(len)
@@ -212,11 +233,49 @@ def add_quality_flags(df: pd.DataFrame, col: str) -> pd.DataFrame:
         (df["char_len"] > 180)|
         (df["digit_count"] == 0)
     ).astype(int)
-    df["is_duplicate_clean"] = df.duplicated(subset=[col], keep=False).astype(int)
+    # parça parça işlerken tekrar bayrağı dosya geneli durumdan gelir (bkz. ChunkDeduper)
+    if duplicates:
+        from addresskit.utils.dedup import duplicated, fingerprints
+
+        df["is_duplicate_clean"] = duplicated(fingerprints(s), keep=False).astype(int)
     return df
 
 # -------------- Çekirdek temizleme --------------
 PART_COLS = ["mahalle","cadde","sokak","no","daire","kat","bina_adi","mevkii","il","ilce","_confidence"]
+DEFAULT_CHUNK_ROWS = 100_000
+_ROW = "_row"  # ara dosyalarda yazılan satırın sırası
+
+def _clean_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """Satır içi newline -> boşluk, strip; boş/anlamsız/çok kısa adresleri at."""
+    for c in df.columns:
+        df[c] = df[c].str.replace(r"\r?\n", " ", regex=True).str.strip()
+    if "address" not in df.columns:
+        df.columns = [c.lower() for c in df.columns]
+    if "address" not in df.columns:
+        raise ValueError("Girdi dosyasında 'address' kolonu yok.")
+    a = df["address"]
+    keep = (a != "") & ~a.str.match(ONLY_PUNCT_SP_RE) & (a.str.len() > 5)
+    return df[keep]
+
+def _finalize(part_path: str, out_path: str, late, chunk_size: int) -> int:
+    """Ara dosyayı okuyup geç tespit edilen tekrar bayraklarını düzeltir, _row'u atar."""
+    import numpy as np
+    import pandas as pd
+
+    rows = 0
+    with open(out_path, "w", encoding="utf-8-sig", newline="") as f:
+        if not os.path.getsize(part_path):  # girdide hiç satır yok
+            os.remove(part_path)
+            return 0
+        reader = pd.read_csv(part_path, dtype=str, keep_default_na=False, chunksize=chunk_size)
+        for i, chunk in enumerate(reader):
+            if len(late):
+                hit = np.isin(chunk[_ROW].to_numpy(dtype=np.int64), late)
+                chunk.loc[hit, "is_duplicate_clean"] = "1"
+            chunk.drop(columns=[_ROW]).to_csv(f, index=False, header=i == 0)
+            rows += len(chunk)
+    os.remove(part_path)
+    return rows
 
 def process_file(
     in_path: str,
@@ -225,91 +284,116 @@ def process_file(
     add_missing_id: bool = True,
     drop_exact_duplicates: bool = True,
     drop_clean_duplicates: bool = True,
-    drop_suspicious: bool = False
-):
-    print(f"[RUN] reading: {os.path.abspath(in_path)}")
-    # Daha sağlam CSV okuma
-    df = pd.read_csv(in_path, encoding="utf-8", engine="python", on_bad_lines="skip")
+    drop_suspicious: bool = False,
+    cache_path: Optional[str] = PARSE_CACHE,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+    n_jobs: int = 1,
+) -> Dict[str, int]:
+    """
+    Dosyayı chunk_size satırlık parçalar halinde (C motoru, bozuk satırlar
+    atlanır; bkz. read_csv_chunks) okur; her parça normalize + parse edilir (n_jobs > 1 ise tek bir
+    süreç havuzunda), kalite bayrakları parça bazında, tekrar durumu dosya
+    geneli tutulur. Bellekte aynı anda tek parça bulunur.
+    """
+    import pandas as pd
+    from addresskit.utils.dedup import ChunkDeduper, fingerprints, row_fingerprints
 
-    # --- global string temizlik: \r?\n -> ' ', strip ---
-    for c in df.select_dtypes(include=["object"]).columns:
-        df[c] = df[c].astype(str).str.replace(r"\r?\n", " ", regex=True).str.strip()
-
-    # --- 'address' mecburi ve anlamlı olsun ---
-    if "address" not in df.columns:
-        df.columns = [c.lower() for c in df.columns]
-    if "address" not in df.columns:
-        raise ValueError("Girdi dosyasında 'address' kolonu yok.")
-
-    df = df[df["address"].notna()]
-    df = df[df["address"].str.strip() != ""]
-    df = df[~df["address"].str.match(ONLY_PUNCT_SP_RE)]     # sadece noktalama/boşluk olanları at
-    df = df[df["address"].str.len() > 5]                    # çok kısa olanları at
-
-    # --- normalize + parse ---
-    parsed = df["address"].map(normalize_and_parse)
-    df["address_clean"] = parsed.map(lambda x: x[0])
-    parts_series = parsed.map(lambda x: x[1])
-
-    for k in PART_COLS:
-        df[k] = parts_series.map(lambda d, kk=k: d.get(kk, ""))
-
-    # --- eksik/NaN normalize ---
-    df = df.fillna("")  # tüm NaN'ları boş string yap (metin modeli için güvenli)
-
-    # --- kalite bayrakları ---
-    df = add_quality_flags(df, "address_clean")
-
-    # --- tam satır dup'ları düşür ---
-    if drop_exact_duplicates:
-        before = len(df)
-        df = df.drop_duplicates()
-        print(f"[INFO] Exact-duplicate rows dropped: {before - len(df)}")
-
-    # --- address_clean bazlı dup'ları düşür ---
-    if drop_clean_duplicates:
-        before = len(df)
-        df = df.drop_duplicates(subset=["address_clean"])
-        print(f"[INFO] address_clean-duplicate rows dropped: {before - len(df)}")
-
-    # --- ID ekle (gerekirse) ---
-    if add_missing_id and "id" not in df.columns:
-        df.insert(0, "id", range(1, len(df) + 1))
-
-    # --- şüphelileri işleme ---
-    susp = df[df["is_suspicious"] == 1]
-    if not susp.empty:
-        susp_path = out_path.replace(".csv", "_suspicious.csv")
-        susp.to_csv(susp_path, index=False, encoding="utf-8-sig")
-        print(f"[INFO] Suspicious saved: {os.path.abspath(susp_path)} (rows={len(susp)})")
+    print(f"[RUN] reading: {os.path.abspath(in_path)}")
+    pool = ParseExecutor(n_jobs, progress=True)
+    cache = open_clean_parse_cache(cache_path) if cache_path else None
+
+    state = ChunkDeduper(drop_exact_duplicates, drop_clean_duplicates)
+    susp_path = out_path.replace(".csv", "_suspicious.csv")
+    out_part, susp_part = out_path + ".part", susp_path + ".part"
+    n_read = n_susp = 0
+    try:
+        with open(out_part, "w", encoding="utf-8", newline="") as f_out, \
+             open(susp_part, "w", encoding="utf-8", newline="") as f_susp:
+            for k, df in enumerate(read_csv_chunks(in_path, chunk_size)):
+                n_read += len(df)
+                df = _clean_chunk(df)
+                raw_cols = list(df.columns)
+
+                # --- normalize + parse (satır bazlı kalıcı cache) ---
+                parsed = parse_many_cached(df["address"].tolist(), cache, executor=pool)
+                df = pd.concat(
+                    [df, parsed.to_frame(index=df.index, fill="", normalized_col="address_clean")], axis=1
+                )
+                df = add_quality_flags(df, "address_clean", duplicates=False)
+
+                # --- tam satır / address_clean tekrarları (dosya geneli, 64-bit parmak izi) ---
+                keep, dup, order = state.update(
+                    row_fingerprints(df, raw_cols), fingerprints(df["address_clean"])
+                )
+                df["is_duplicate_clean"] = dup
+                df[_ROW] = order
+                df = df[keep]
+
+                # --- ID ekle (gerekirse): yazılan satırların sırası ---
+                if add_missing_id and "id" not in raw_cols:
+                    df.insert(0, "id", df[_ROW] + 1)
+
+                # --- şüphelileri ayrı dosyaya ---
+                susp = df[df["is_suspicious"] == 1]
+                if not susp.empty:
+                    susp.to_csv(f_susp, index=False, header=n_susp == 0)
+                    n_susp += len(susp)
+                    if drop_suspicious:
+                        df = df[df["is_suspicious"] == 0]
+
+                # --- kolon sırası ---
+                cols = ["id"] if "id" in df.columns else []
+                cols += ["address", "address_clean"] + PART_COLS + [
+                    "char_len","word_len","digit_count","punct_count",
+                    "is_suspicious","is_duplicate_clean"
+                ]
+                if has_label and "label" in df.columns: cols.append("label")
+                cols = [c for c in cols if c in df.columns] + [_ROW]
+                df[cols].to_csv(f_out, index=False, header=k == 0)
+                print(f"[INFO] chunk {k}: read={n_read} written={state.written}")
+    finally:
+        pool.close()
+        if cache is not None:
+            print(f"[CACHE] {cache.stats()}")
+            cache.close()
+
+    print(f"[INFO] Exact-duplicate rows dropped: {state.dropped_exact}")
+    print(f"[INFO] address_clean-duplicate rows dropped: {state.dropped_clean}")
+    late = state.late_duplicates()
+    if n_susp:
+        _finalize(susp_part, susp_path, late, chunk_size)
+        print(f"[INFO] Suspicious saved: {os.path.abspath(susp_path)} (rows={n_susp})")
         if drop_suspicious:
-            df = df[df["is_suspicious"] == 0]
             print(f"[INFO] Suspicious rows removed from main set.")
-
-    # --- kolon sırası ---
-    base_cols = ["address","address_clean"] + PART_COLS + [
-        "char_len","word_len","digit_count","punct_count",
-        "is_suspicious","is_duplicate_clean"
-    ]
-    cols = []
-    if "id" in df.columns: cols.append("id")
-    cols += base_cols
-    if has_label and "label" in df.columns: cols.append("label")
-    cols = [c for c in cols if c in df.columns]
-    df = df[cols]
+    else:
+        os.remove(susp_part)
 
     # --- kaydet ---
-    print(f"[RUN] writing: {os.path.abspath(out_path)} (rows={len(df)})")
-    df.to_csv(out_path, index=False, encoding="utf-8-sig")
+    rows = _finalize(out_part, out_path, late, chunk_size)
+    print(f"[RUN] writing: {os.path.abspath(out_path)} (rows={rows})")
+    return {"read": n_read, "written": rows, "suspicious": n_susp,
+            "dropped_exact": state.dropped_exact, "dropped_clean": state.dropped_clean}
+
+def _parse_args():
+    import argparse
+
+    p = argparse.ArgumentParser(description="Train/test temizleme + parse (parça parça)")
+    p.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_ROWS)
+    p.add_argument("--workers", "--n-jobs", dest="n_jobs", type=int, default=-1, help="-1: bütün çekirdekler")
+    p.add_argument("--cache", default=PARSE_CACHE, help="Kalıcı parse cache (SQLite); boş = kapalı")
+    return p.parse_args()
 
 def main():
+    args = _parse_args()
+    os.makedirs(OUT_DIR, exist_ok=True)
+    opts = dict(cache_path=args.cache or None, chunk_size=args.chunk_size, n_jobs=args.n_jobs)
     if os.path.exists(TRAIN_IN):
-        process_file(TRAIN_IN, TRAIN_OUT, has_label=True)
+        process_file(TRAIN_IN, TRAIN_OUT, has_label=True, **opts)
     else:
         print(f"[WARN] Train bulunamadı: {TRAIN_IN}")
 
     if os.path.exists(TEST_IN):
-        process_file(TEST_IN, TEST_OUT, has_label=False)
+        process_file(TEST_IN, TEST_OUT, has_label=False, **opts)
     else:
         print(f"[INFO] Test bulunamadı (atlandı): {TEST_IN}")
 
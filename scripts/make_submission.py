@@ -22,12 +22,14 @@ DATA_RAW = os.path.join(DATA_DIR, "raw")
 
 # ---- Paket importları (önce normal, olmazsa path'e kökü ekle)
 try:
-    from addresskit.preprocessing.normalize_and_parse import normalize_and_parse
-    from addresskit.preprocessing.postprocess import postprocess_parts
+    from addresskit.preprocessing import parse_many
+    from addresskit.preprocessing.executor import ParseExecutor
+    from addresskit.preprocessing.pipeline import open_parse_cache
 except Exception:
     sys.path.append(ROOT)  # kökü PYTHONPATH'e ekle
-    from addresskit.preprocessing.normalize_and_parse import normalize_and_parse  # type: ignore
-    from addresskit.preprocessing.postprocess import postprocess_parts  # type: ignore
+    from addresskit.preprocessing import parse_many  # type: ignore
+    from addresskit.preprocessing.executor import ParseExecutor  # type: ignore
+    from addresskit.preprocessing.pipeline import open_parse_cache  # type: ignore
 
 
 # ---- Yardımcılar
@@ -49,17 +51,28 @@ def safe_str(x) -> str:
     return "" if s.lower() in {"nan", "none"} else s
 
 
+STRING_ORDER = ["il", "ilçe", "mahalle", "cadde", "sokak",
+                "bina_adı", "mevkii", "no", "kat", "daire"]
+
+
 def stringify_parts(parts: dict) -> str:
     """Tek kolonluk okunabilir çıktı."""
-    order = ["il", "ilçe", "mahalle", "cadde", "sokak",
-             "bina_adı", "mevkii", "no", "kat", "daire"]
     chunks = []
-    for k in order:
+    for k in STRING_ORDER:
         if k in parts and parts[k]:
             chunks.append(f"{k}:{parts[k]}")
     return " | ".join(chunks)
 
 
+def stringify_columns(batch) -> list:
+    """stringify_parts'ın kolon bazlı hali (satır başına dict kurmadan)."""
+    cols = [batch[k] for k in STRING_ORDER]
+    return [
+        " | ".join(f"{k}:{v}" for k, v in zip(STRING_ORDER, vals) if v)
+        for vals in zip(*cols)
+    ]
+
+
 def load_sample_template():
     """sample_submission.csv varsa kolon düzenini döndür (id_col, pred_col, columns)."""
     sample_p = os.path.join(DATA_DIR, "sample_submission.csv")
@@ -86,6 +99,10 @@ def main():
                     choices=["parts_string", "parts_json", "normalized"],
                     default="parts_string",
                     help="Tek kolonlu submission için çıktı modu.")
+    ap.add_argument("--cache", default=os.path.join(DATA_DIR, "interim", "parse_cache.sqlite"),
+                    help="Kalıcı parse cache (SQLite); boş verilirse kapalı.")
+    ap.add_argument("--workers", type=int, default=-1,
+                    help="Parse süreç sayısı; -1: bütün çekirdekler, 1: seri.")
     args = ap.parse_args()
 
     # test.csv oku
@@ -105,27 +122,29 @@ def main():
     # id yoksa sıradan üret
     ids = df[id_col].tolist() if id_col in df.columns else list(range(1, len(df) + 1))
 
-    preds = []
-    for i, txt in enumerate(df[text_col].tolist()):
-        norm, parts = normalize_and_parse(safe_str(txt))
-        parts = postprocess_parts(norm, parts)  # <<< DİKKAT: imza (norm, parts)
-
-        # tek kolonluk prediction değeri
-        if args.prediction_mode == "normalized":
-            pred_value = norm
-        elif args.prediction_mode == "parts_json":
-            pred_value = json.dumps({k: v for k, v in parts.items() if not k.startswith("_")},
-                                    ensure_ascii=False)
+    texts = [safe_str(t) for t in df[text_col].tolist()]
+    with ParseExecutor(args.workers, progress=True) as ex:
+        if args.cache:
+            with open_parse_cache(args.cache) as cache:
+                batch = parse_many(texts, cache, executor=ex)
+                print(f"[CACHE] {cache.stats()}")
         else:
-            pred_value = stringify_parts({k: v for k, v in parts.items() if not k.startswith("_")})
-
-        preds.append(pred_value)
+            batch = parse_many(texts, executor=ex)
+
+    # tek kolonluk prediction değeri
+    if args.prediction_mode == "normalized":
+        preds = batch.normalized
+    elif args.prediction_mode == "parts_json":
+        preds = [json.dumps({k: v for k, v in batch.parts(i).items() if not k.startswith("_")},
+                            ensure_ascii=False) for i in range(len(batch))]
+    else:
+        preds = stringify_columns(batch)
 
-        if i < 5:
-            print("\n" + "=" * 60)
-            print("Original :", txt)
-            print("Normalized:", norm)
-            print("Parts    :", parts)
+    for i, txt in enumerate(df[text_col].head(5)):
+        print("\n" + "=" * 60)
+        print("Original :", txt)
+        print("Normalized:", batch.normalized[i])
+        print("Parts    :", batch.parts(i))
 
     # submission'ı kur
     if template_cols is not None:
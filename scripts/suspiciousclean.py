@@ -1,6 +1,13 @@
 import pandas as pd
 import re
 import os
+import sys
+
+try:
+    from addresskit.utils.dedup import ChunkDeduper, fingerprints, row_fingerprints
+except Exception:
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from addresskit.utils.dedup import ChunkDeduper, fingerprints, row_fingerprints  # type: ignore
 
 # --- 1) Dosya yolları (gerekirse düzenle) ---
 train_path = r"C:/Users/iremn/hackathon/address-hackathon/data/processed/train_clean_parsed.csv"
@@ -44,15 +51,12 @@ bad_rows_mask = is_bad_address(s0["address"]) | is_bad_address(s0["address_clean
 s1 = s0.loc[~bad_rows_mask].copy()
 dropped_bad = int(bad_rows_mask.sum())
 
-# b) Tam satır duplicate’leri at
-before = len(s1)
-s1 = s1.drop_duplicates()
-dropped_exact_dups = before - len(s1)
-
-# c) address_clean bazlı duplicate’leri at
-before2 = len(s1)
-s1 = s1.drop_duplicates(subset=["address_clean"])
-dropped_clean_dups = before2 - len(s1)
+# b) Tam satır, c) address_clean bazlı duplicate’leri at (64-bit parmak izleri, tek geçiş)
+dedup = ChunkDeduper(drop_exact=True, drop_clean=True)
+keep, _, _ = dedup.update(row_fingerprints(s1), fingerprints(s1["address_clean"]))
+s1 = s1.loc[keep]
+dropped_exact_dups = dedup.dropped_exact
+dropped_clean_dups = dedup.dropped_clean
 
 # d) low confidence etiketi ve opsiyonel ağırlık
 s1["confidence_flag"] = "low_confidence"
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+TF-IDF -> SVD(256) -> L2 gömmeleri üzerinde IVF yaklaşık en yakın komşu
+ile adres -> etiket eşleme (compare_train_clean_vs_lowconf.py boru hattı).
+
+Kullanım (proje kökünden):
+    python -m scripts.svd_ann_match --n-lists 2048 --nprobe 8
+    python -m scripts.svd_ann_match --pq-m 32          # ürün nicemleme (vektör yerine 32 bayt kod)
+
+- İndeks models/ann/ altına memory-map edilebilir .npy olarak yazılır.
+- Test sorgularının bir örneğinde kesin (kaba kuvvet) top-k ile
+  karşılaştırılarak nprobe başına recall ve sorgu süresi raporlanır.
+"""
+
+import os
+import sys
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(__file__)
+ROOT = os.path.abspath(os.path.join(HERE, ".."))
+
+try:
+    from addresskit.matching.ivf import IVFIndex, exact_topk, recall_curve
+except Exception:
+    sys.path.append(ROOT)
+    from addresskit.matching.ivf import IVFIndex, exact_topk, recall_curve  # type: ignore
+
+PROC_DIR = os.path.join("data", "processed")
+INDEX_DIR = os.path.join("models", "ann")
+
+
+def _parse_args():
+    p = argparse.ArgumentParser(description="SVD gömmeleri + IVF ANN eşleme")
+    p.add_argument("--train", default=os.path.join(PROC_DIR, "train_clean_parsed.csv"))
+    p.add_argument("--test", default=os.path.join(PROC_DIR, "test_clean_parsed.csv"))
+    p.add_argument("--text-col", default="address")
+    p.add_argument("--out", default=os.path.join("submissions", "submission_ann.csv"))
+    p.add_argument("--index-dir", default=INDEX_DIR)
+    p.add_argument("--svd-components", type=int, default=256)
+    p.add_argument("--svd-sample", type=int, default=200_000)
+    p.add_argument("--max-features", type=int, default=200_000)
+    p.add_argument("--n-lists", type=int, default=None, help="ters liste sayısı; varsayılan ~4*sqrt(n)")
+    p.add_argument("--pq-m", type=int, default=0, help="ürün nicemleme alt uzay sayısı; 0 = kapalı")
+    p.add_argument("--nprobe", type=int, default=8)
+    p.add_argument("--k", type=int, default=10, help="recall@k için k")
+    p.add_argument("--eval-queries", type=int, default=2000, help="recall eğrisi için test örneği; 0 = kapalı")
+    p.add_argument("--curve", default="1,2,4,8,16,32,64", help="ölçülecek nprobe değerleri")
+    return p.parse_args()
+
+
+def embed(train_texts, test_texts, args):
+    """TF-IDF (1-2 gram) -> örneklemde fit edilen TruncatedSVD -> L2 normalize (float32)."""
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.preprocessing import normalize
+
+    vec = TfidfVectorizer(max_features=args.max_features, ngram_range=(1, 2), min_df=3, dtype=np.float32)
+    X_tr = vec.fit_transform(train_texts)
+    X_te = vec.transform(test_texts)
+    svd = TruncatedSVD(n_components=min(args.svd_components, X_tr.shape[1] - 1), algorithm="randomized",
+                       n_iter=2, random_state=42)
+    rng = np.random.default_rng(42)
+    sample = rng.choice(X_tr.shape[0], size=min(args.svd_sample, X_tr.shape[0]), replace=False)
+    svd.fit(X_tr[sample])
+    E_tr = normalize(svd.transform(X_tr)).astype(np.float32)
+    E_te = normalize(svd.transform(X_te)).astype(np.float32)
+    return vec, svd, E_tr, E_te
+
+
+def main():
+    import joblib
+
+    args = _parse_args()
+    train = pd.read_csv(args.train)
+    test = pd.read_csv(args.test)
+    print(f"[INFO] train={len(train)} test={len(test)}")
+
+    t0 = time.perf_counter()
+    vec, svd, E_tr, E_te = embed(train[args.text_col].fillna("").astype(str),
+                                 test[args.text_col].fillna("").astype(str), args)
+    print(f"[INFO] gömmeler: {E_tr.shape} ({time.perf_counter() - t0:.1f}s)")
+
+    t0 = time.perf_counter()
+    index = IVFIndex.build(E_tr, n_lists=args.n_lists, pq_m=args.pq_m)
+    print(f"[INFO] {index} kuruldu ({time.perf_counter() - t0:.1f}s)")
+    index.save(args.index_dir)
+    np.save(os.path.join(args.index_dir, "labels.npy"), train["label"].to_numpy())
+    joblib.dump({"vectorizer": vec, "svd": svd}, os.path.join(args.index_dir, "embedder.joblib"))
+
+    t0 = time.perf_counter()
+    index = IVFIndex.load(args.index_dir)  # memmap
+    print(f"[INFO] indeks yüklendi ({(time.perf_counter() - t0) * 1000:.1f} ms) -> {args.index_dir}")
+
+    if args.eval_queries and len(E_te):
+        rng = np.random.default_rng(0)
+        q = E_te[rng.choice(len(E_te), min(args.eval_queries, len(E_te)), replace=False)]
+        exact = exact_topk(q, E_tr, args.k)
+        print(f"[INFO] recall-nprobe eğrisi ({len(q)} sorgu, k={args.k}):")
+        for r in recall_curve(index, q, exact, args.k, [int(x) for x in args.curve.split(",") if x]):
+            print(f"  nprobe={r['nprobe']:>4}  recall@{args.k}={r[f'recall@{args.k}']:.4f}  "
+                  f"recall@1={r['recall@1']:.4f}  {r['ms_per_query']:.3f} ms/sorgu")
+
+    t0 = time.perf_counter()
+    ids, scores = index.search(E_te, k=1, nprobe=args.nprobe)
+    labels = train["label"].to_numpy()
+    pred = np.where(ids[:, 0] >= 0, labels[np.maximum(ids[:, 0], 0)], labels[0])
+    print(f"[INFO] test sorgusu: {(time.perf_counter() - t0) * 1000 / max(len(E_te), 1):.3f} ms/sorgu "
+          f"(nprobe={args.nprobe})")
+
+    out = pd.DataFrame({"id": test["id"] if "id" in test.columns else np.arange(len(test)),
+                        "label": pred, "score": scores[:, 0]})
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    out.to_csv(args.out, index=False)
+    print(f"[OK] {args.out} yazıldı (rows={len(out)})")
+
+
+if __name__ == "__main__":
+    main()
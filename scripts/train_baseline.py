@@ -4,6 +4,10 @@ Adım 3: Özellik çıkarımı + Baz Model (TF-IDF + SGD-Logistic) + Tahmin
 - Girdi: data/processed/train_clean_parsed.csv, test_clean_parsed.csv
 - Çıktı: models/baseline/*.pkl, submissions/submission_baseline.csv
 - Ölçek: ~848k satır, ~10k sınıf -> lineer ölçeklenebilir çözüm
+- Özellik modu: --features tfidf (sözlüklü, varsayılan) | hashing (durumsuz,
+  parça parça / paralel); --compare iki modun CV farkını da raporlar
+- --train-mode incremental: bellek dışı partial_fit eğitimi; --update yeni.csv
+  kayıtlı modeli tam yeniden eğitmeden günceller
 """
 
 import os
@@ -16,7 +20,7 @@ import numpy as np
 import pandas as pd
 
 from sklearn.model_selection import StratifiedKFold
-from sklearn.metrics import accuracy_score, f1_score, top_k_accuracy_score
+from sklearn.metrics import accuracy_score, f1_score
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.pipeline import FeatureUnion
 from sklearn.linear_model import SGDClassifier
@@ -24,42 +28,50 @@ from sklearn.preprocessing import LabelEncoder
 from sklearn.utils.class_weight import compute_class_weight
 import joblib
 
+try:
+    from addresskit.modeling.bundle import export_bundle
+    from addresskit.modeling.channels import fit_channels
+    from addresskit.modeling.fields import build_text_fields
+    from addresskit.modeling.folds import run_folds, write_fold_layout
+    from addresskit.modeling.hashing import HashedChannel
+    from addresskit.modeling.incremental import (IncrementalTrainer, ShardSet, ShardWriter, chunked_predict,
+                                                 encode_labels)
+    from addresskit.modeling.pruning import CandidateIndex, admin_keys, predict_pruned, prune_stats
+    from addresskit.modeling.topk import predict_topk, topk_accuracy
+    from addresskit.preprocessing.executor import ParseExecutor
+    from addresskit.utils.vectorizer_store import VectorizerStore, data_digest, vectorizer_params
+except Exception:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from addresskit.modeling.bundle import export_bundle  # type: ignore
+    from addresskit.modeling.channels import fit_channels  # type: ignore
+    from addresskit.modeling.fields import build_text_fields  # type: ignore
+    from addresskit.modeling.folds import run_folds, write_fold_layout  # type: ignore
+    from addresskit.modeling.hashing import HashedChannel  # type: ignore
+    from addresskit.modeling.incremental import (IncrementalTrainer, ShardSet, ShardWriter,  # type: ignore
+                                                 chunked_predict, encode_labels)
+    from addresskit.modeling.pruning import CandidateIndex, admin_keys, predict_pruned, prune_stats  # type: ignore
+    from addresskit.modeling.topk import predict_topk, topk_accuracy  # type: ignore
+    from addresskit.preprocessing.executor import ParseExecutor  # type: ignore
+    from addresskit.utils.vectorizer_store import VectorizerStore, data_digest, vectorizer_params  # type: ignore
+
 # ----------------- I/O -----------------
 PROC_DIR = os.path.join("data", "processed")
 TRAIN_PATH = os.path.join(PROC_DIR, "train_clean_parsed.csv")
 TEST_PATH  = os.path.join(PROC_DIR, "test_clean_parsed.csv")
 
 MODELS_DIR = os.path.join("models", "baseline")
+BUNDLE_DIR = os.path.join(MODELS_DIR, "bundle")  # memory-map edilebilir çıkarım paketi
+INCREMENTAL_ENCODER = "incremental_label_encoder.pkl"  # artımlı modelin etiket kodları (update ile büyür)
+FEATURE_CACHE = os.path.join("data", "interim", "features")
+SHARD_DIR = os.path.join("data", "interim", "shards")
+CV_DIR = os.path.join("data", "interim", "cv")
+PRUNE_MIN_SIZE = 3  # budama öneki için en az aday sınıf; daha dar kümeler üst öneke düşer
 SUBMIT_DIR = "submissions"
-os.makedirs(MODELS_DIR, exist_ok=True)
-os.makedirs(SUBMIT_DIR, exist_ok=True)
 
 # ----------------- Yardımcı -----------------
 def now():
     return time.strftime("%H:%M:%S")
 
-def safe_col(df, c):
-    return df[c].astype(str) if c in df.columns else pd.Series([""]*len(df))
-
-def build_text_fields(df: pd.DataFrame):
-    """
-    Ana metin: address_clean
-    Yan metin: ayrıştırılmış parçaların birleştirilmiş hali
-    """
-    base = safe_col(df, "address_clean")
-    parts = []
-    for c in ["mahalle","cadde","sokak","no","daire","kat","bina_adi","mevkii","il","ilce"]:
-        parts.append(safe_col(df, c))
-    side = (" ".join([c for c in ["mahalle","cadde","sokak","no","daire","kat","bina_adi","mevkii","il","ilce"]]))
-    # üstteki sadece referans; asıl side_text aşağıda oluşturuluyor
-    side_text = pd.Series([""]*len(df))
-    for c in ["mahalle","cadde","sokak","no","daire","kat","bina_adi","mevkii","il","ilce"]:
-        if c in df.columns:
-            side_text = side_text.str.cat(df[c].astype(str), sep=" ")
-
-    # final iki alan döndür
-    return base.fillna(""), side_text.fillna("")
-
 # ----------------- Vektörizerler -----------------
 def make_vectorizers(max_features_char=500_000, max_features_word=150_000):
     """
@@ -75,7 +87,8 @@ def make_vectorizers(max_features_char=500_000, max_features_word=150_000):
         max_features=max_features_char,
         lowercase=False,  # zaten temiz
         norm="l2",
-        sublinear_tf=True
+        sublinear_tf=True,
+        dtype=np.float32
     )
     word_vect = TfidfVectorizer(
         analyzer="word",
@@ -85,49 +98,72 @@ def make_vectorizers(max_features_char=500_000, max_features_word=150_000):
         lowercase=False,
         token_pattern=r"[a-z0-9çğıöşü]+",
         norm="l2",
-        sublinear_tf=True
+        sublinear_tf=True,
+        dtype=np.float32
     )
     return char_vect, word_vect
 
-def fit_transform_features(train_base, train_side, test_base, test_side):
-    """
-    İki ayrı vektörizeri hem base (address_clean) hem side (parça metni) için fitler;
-    sonra birleştirir (yatay konkat).
-    """
-    print(f"[{now()}] TF-IDF vektörizer oluşturuluyor...")
+def tfidf_channels():
+    """Dört kanal: base/side x char/word (yan kanal daha küçük)."""
     char_vect_base, word_vect_base = make_vectorizers()
     char_vect_side, word_vect_side = make_vectorizers(
         max_features_char=200_000, max_features_word=80_000
     )  # yan kanal daha küçük
-
-    print(f"[{now()}] Fit (base/char)...")
-    X_char_base_tr = char_vect_base.fit_transform(train_base)
-    X_char_base_te = char_vect_base.transform(test_base)
-
-    print(f"[{now()}] Fit (base/word)...")
-    X_word_base_tr = word_vect_base.fit_transform(train_base)
-    X_word_base_te = word_vect_base.transform(test_base)
-
-    print(f"[{now()}] Fit (side/char)...")
-    X_char_side_tr = char_vect_side.fit_transform(train_side)
-    X_char_side_te = char_vect_side.transform(test_side)
-
-    print(f"[{now()}] Fit (side/word)...")
-    X_word_side_tr = word_vect_side.fit_transform(train_side)
-    X_word_side_te = word_vect_side.transform(test_side)
-
-    # birleştir
-    from scipy.sparse import hstack
-    X_tr = hstack([X_char_base_tr, X_word_base_tr, X_char_side_tr, X_word_side_tr]).tocsr()
-    X_te = hstack([X_char_base_te, X_word_base_te, X_char_side_te, X_word_side_te]).tocsr()
-
-    vect_bundle = {
+    return {
         "char_vect_base": char_vect_base,
         "word_vect_base": word_vect_base,
         "char_vect_side": char_vect_side,
         "word_vect_side": word_vect_side
     }
-    return X_tr, X_te, vect_bundle
+
+def fit_transform_features(train_base, train_side, test_base, test_side, n_jobs=-1):
+    """
+    Dört vektörizeri (base = address_clean, side = parça metni) ayrı süreçlerde
+    paralel fitler; sonra birleştirir (yatay konkat).
+    """
+    print(f"[{now()}] TF-IDF vektörizer oluşturuluyor...")
+    specs = [(name, vec, *((train_base, test_base) if name.endswith("_base") else (train_side, test_side)))
+             for name, vec in tfidf_channels().items()]
+    print(f"[{now()}] Fit (4 kanal)...")
+    return fit_channels(specs, n_jobs=n_jobs)
+
+# ----------------- Hashing özellikleri -----------------
+WORD_TOKEN_PATTERN = r"[a-z0-9çğıöşü]+"
+
+def make_hashed_channels(n_features_char=2**19, n_features_word=2**17):
+    """
+    make_vectorizers'ın hashing karşılığı (aynı n-gram / min_df / sublinear_tf);
+    boyutlar max_features'a yakın seçildi (model katsayıları kolon sayısıyla büyür).
+    """
+    char_ch = HashedChannel("char", (3, 5), n_features=n_features_char, min_df=3, dtype=np.float32)
+    word_ch = HashedChannel("word", (1, 2), n_features=n_features_word, min_df=3,
+                            token_pattern=WORD_TOKEN_PATTERN, dtype=np.float32)
+    return char_ch, word_ch
+
+def hashed_channels():
+    char_base, word_base = make_hashed_channels()
+    char_side, word_side = make_hashed_channels(n_features_char=2**18, n_features_word=2**16)
+    return {"char_vect_base": char_base, "word_vect_base": word_base,
+            "char_vect_side": char_side, "word_vect_side": word_side}
+
+def fit_transform_hashed(train_base, train_side, test_base, test_side, n_jobs=-1):
+    """
+    fit_transform_features'ın hashing hali: sözlük yok, yalnız idf öğrenilir
+    (belge frekansı geçişi); fit ve dönüşüm parçalar halinde süreçlere dağıtılır.
+    """
+    print(f"[{now()}] Hashing vektörizer oluşturuluyor...")
+    channels = [(name, ch, *((train_base, test_base) if name.endswith("_base") else (train_side, test_side)))
+                for name, ch in hashed_channels().items()]
+
+    from scipy.sparse import hstack
+    X_tr, X_te = [], []
+    with ParseExecutor(n_jobs, label="hashing") as ex:
+        for name, ch, tr, te in channels:
+            print(f"[{now()}] Fit ({name})...")
+            X_tr.append(ch.fit_transform(tr.tolist(), executor=ex))
+            X_te.append(ch.transform(te.tolist(), executor=ex))
+    vect_bundle = {name: ch for name, ch, _, _ in channels}
+    return hstack(X_tr).tocsr(), hstack(X_te).tocsr(), vect_bundle
 
 # ----------------- Model -----------------
 def make_model(n_classes: int):
@@ -148,8 +184,223 @@ def make_model(n_classes: int):
     )
     return clf
 
+def _cv_fold(layout, fold, n_classes, keys=None, prune_min_rows=1, prune_min_size=PRUNE_MIN_SIZE):
+    """Tek fold (işçi süreçte): memmap görünümleri üzerinde fit + top-3 (+ budama)."""
+    X_tr_f, y_tr_f, tr_rows = layout.train(fold)
+    X_va_f, y_va_f, va_rows = layout.valid(fold)
+
+    clf = make_model(n_classes=n_classes)
+    clf.fit(X_tr_f, y_tr_f)
+
+    # val (parça parça top-3; yoğun predict_proba yok)
+    t0 = time.perf_counter()
+    top = predict_topk(clf, X_va_f, k=3)
+    res = {"predict_sec": time.perf_counter() - t0,
+           "acc": accuracy_score(y_va_f, top.labels[:, 0]),
+           "macroF1": f1_score(y_va_f, top.labels[:, 0], average="macro"),
+           "top3": topk_accuracy(y_va_f, top.labels)}
+
+    if keys is not None:
+        index = CandidateIndex(prune_min_rows).fit([keys[i] for i in tr_rows], y_tr_f, classes=clf.classes_)
+        t0 = time.perf_counter()
+        group, sets = index.candidates([keys[i] for i in va_rows], min_size=prune_min_size)
+        top_p = predict_pruned(clf, X_va_f, group, sets, k=3)
+        st = prune_stats(group, sets, len(clf.classes_), y_va_f, clf.classes_)
+        res.update({f"pruned_{k}": v for k, v in st.items()})
+        res.update(pruned_sec=time.perf_counter() - t0,
+                   pruned_acc=accuracy_score(y_va_f, top_p.labels[:, 0]),
+                   pruned_top3=topk_accuracy(y_va_f, top_p.labels))
+    return res
+
+def cv_eval(X_tr, y, n_classes: int, n_splits: int = 3, keys=None, prune_min_rows: int = 1,
+            prune_min_size: int = PRUNE_MIN_SIZE, n_jobs: int = -1, cv_dir=CV_DIR):
+    """
+    Katmanlı k-fold; fold ortalamaları {'acc', 'macroF1', 'top3'}.
+    X_tr bir kez cv_dir'e fold sıralı yazılır; fold'lar ayrı süreçlerde
+    kopyasız memmap görünümleri üzerinde çalışır (bkz. modeling/folds.py).
+    keys (il, ilce, mahalle) verilirse aday sınıf budaması da ölçülür:
+    budama oranı, doğru sınıfın kapsanma oranı, doğruluk farkı ve süre.
+    """
+    print(f"[{now()}] CV eval ({n_splits}-fold)...")
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+    folds = [va_idx for _, va_idx in skf.split(np.zeros(len(y)), y)]
+    write_fold_layout(X_tr, y, folds, cv_dir)
+    results = run_folds(cv_dir, _cv_fold, n_jobs, n_classes, keys, prune_min_rows, prune_min_size)
+
+    for r in results:
+        print(f"  Fold {r['fold']}: acc={r['acc']:.4f}  macroF1={r['macroF1']:.4f}  top3={r['top3']:.4f}  "
+              f"{r['sec']:.1f}s  rss={r['rss_start_mb']:.0f}->{r['rss_mb']:.0f}MB (tepe {r['peak_rss_mb']:.0f}MB)")
+        if keys is not None:
+            print(f"          budama: rate={r['pruned_rate']:.3f}  fallback={r['pruned_fallback']:.3f}  "
+                  f"coverage={r['pruned_coverage']:.4f}  acc={r['pruned_acc']:.4f} ({r['pruned_acc'] - r['acc']:+.4f})  "
+                  f"top3={r['pruned_top3']:.4f}  süre {r['predict_sec']:.2f}s -> {r['pruned_sec']:.2f}s")
+
+    res = {k: float(np.mean([r[k] for r in results])) for k in ("acc", "macroF1", "top3")}
+    print(f"[{now()}] CV mean: acc={res['acc']:.4f}  macroF1={res['macroF1']:.4f}  top3={res['top3']:.4f}")
+    if keys is not None:
+        for k in ("rate", "coverage", "acc", "top3"):
+            res[f"pruned_{k}"] = float(np.mean([r[f"pruned_{k}"] for r in results]))
+        print(f"[{now()}] CV budama: rate={res['pruned_rate']:.3f}  coverage={res['pruned_coverage']:.4f}  "
+              f"acc={res['pruned_acc']:.4f} ({res['pruned_acc'] - res['acc']:+.4f})  top3={res['pruned_top3']:.4f}")
+    return res
+
+def build_features(mode, tr_base, tr_side, te_base, te_side, n_jobs=-1, cache_dir=FEATURE_CACHE):
+    """
+    Özellikleri üretir; cache_dir verilirse (girdi hash'i + vektörizer
+    parametreleri) anahtarlı cache'ten okur / cache'e yazar.
+    """
+    store = VectorizerStore(cache_dir) if cache_dir else None
+    if store is not None:
+        channels = hashed_channels() if mode == "hashing" else tfidf_channels()
+        params = {name: vectorizer_params(v) for name, v in channels.items()}
+        key = store.key(mode, params, [data_digest(x.tolist()) for x in (tr_base, tr_side, te_base, te_side)])
+        hit = store.load(key)
+        if hit is not None:
+            print(f"[CACHE] Özellikler cache'ten: {store.path(key)}")
+            return hit
+    if mode == "hashing":
+        out = fit_transform_hashed(tr_base, tr_side, te_base, te_side, n_jobs=n_jobs)
+    else:
+        out = fit_transform_features(tr_base, tr_side, te_base, te_side, n_jobs=n_jobs)
+    if store is not None:
+        path = store.save(key, *out, meta={"mode": mode, "params": params})
+        print(f"[CACHE] Özellikler kaydedildi: {path}")
+    return out
+
+# ----------------- Artımlı (out-of-core) eğitim -----------------
+def hashed_transform(bundle, base, side, executor=None):
+    """Bir parçanın 4 kanallı hashing özellikleri (kanal sırası bundle sırası)."""
+    from scipy.sparse import hstack
+    mats = [ch.transform((base if name.endswith("_base") else side).tolist(), executor=executor)
+            for name, ch in bundle.items()]
+    return hstack(mats).tocsr()
+
+def _label_chunks(path, chunk_rows):
+    for df in pd.read_csv(path, chunksize=chunk_rows):
+        base, side = build_text_fields(df.reset_index(drop=True))
+        yield df, base, side
+
+def train_incremental(args):
+    """
+    Train dosyası hiçbir zaman tamamen belleğe alınmaz:
+    1. geçiş idf + etiket sayımı, 2. geçiş özellik shard'ları (+ holdout),
+    sonra shard'lar üzerinde partial_fit epoch'ları (holdout ile erken durdurma).
+    """
+    from collections import Counter
+    from scipy.sparse import vstack
+
+    bundle = hashed_channels()
+    counts = Counter()
+    with ParseExecutor(args.n_jobs, label="hashing") as ex:
+        print(f"[{now()}] 1. geçiş: idf + etiketler...")
+        for df, base, side in _label_chunks(TRAIN_PATH, args.chunk_rows):
+            for name, ch in bundle.items():
+                ch.partial_fit((base if name.endswith("_base") else side).tolist(), executor=ex)
+            counts.update(df["label"].tolist())
+        le = LabelEncoder().fit(list(counts))  # shard'lara etiket kodları yazılır
+        classes = np.arange(len(le.classes_))
+        print(f"[{now()}] rows={sum(counts.values())} classes={len(classes)}")
+
+        print(f"[{now()}] 2. geçiş: özellik shard'ları -> {args.shard_dir}")
+        rng = np.random.default_rng(42)
+        ho_X, ho_y, n_ho = [], [], 0
+        with ShardWriter(args.shard_dir) as w:
+            for df, base, side in _label_chunks(TRAIN_PATH, args.chunk_rows):
+                X = hashed_transform(bundle, base, side, ex)
+                y = encode_labels(le, df["label"])
+                cand = rng.random(len(y)) < args.holdout  # önce çek, sonra toplam holdout'u sınırla
+                ho = cand & (n_ho + np.cumsum(cand) <= args.holdout_max)
+                n_ho += int(ho.sum())
+                if ho.any():
+                    ho_X.append(X[ho]); ho_y.append(y[ho])
+                w.write(X[~ho], y[~ho])
+        holdout = (vstack(ho_X).tocsr(), np.concatenate(ho_y)) if ho_X else None
+        print(f"[{now()}] shards={w.n_shards} train_rows={w.rows} holdout={n_ho}")
+
+        trainer = IncrementalTrainer(lambda: make_model(n_classes=len(classes)), classes,
+                                     counts=np.array([counts[c] for c in le.classes_]),
+                                     batch_size=args.batch_size, max_epochs=args.max_epochs,
+                                     patience=args.patience)
+        print(f"[{now()}] partial_fit epoch'ları...")
+        trainer.fit(ShardSet(args.shard_dir), holdout)
+
+        # test tahmini (parça parça)
+        print(f"[{now()}] Predict test...")
+        ids, preds = [], []
+        for df, base, side in _label_chunks(TEST_PATH, args.chunk_rows):
+            ids.extend(df["id"].tolist() if "id" in df.columns else range(len(ids), len(ids) + len(df)))
+            preds.append(le.classes_[chunked_predict(trainer.clf, hashed_transform(bundle, base, side, ex))])
+
+    sub = pd.DataFrame({"id": ids, "label": np.concatenate(preds) if preds else []})
+    sub_path = os.path.join(SUBMIT_DIR, "submission_baseline.csv")
+    sub.to_csv(sub_path, index=False)
+    print(f"[{now()}] Wrote submission: {sub_path}  (rows={len(sub)})")
+
+    joblib.dump(bundle,  os.path.join(MODELS_DIR, "hashed_bundle.pkl"))
+    joblib.dump(trainer, os.path.join(MODELS_DIR, "incremental_model.pkl"))
+    joblib.dump(le,      os.path.join(MODELS_DIR, INCREMENTAL_ENCODER))
+    export_bundle(BUNDLE_DIR, bundle, trainer.clf, le.classes_[trainer.clf.classes_])
+    print(f"[{now()}] Saved models to: {MODELS_DIR} (bundle: {BUNDLE_DIR})")
+
+def update_incremental(args):
+    """Kayıtlı artımlı modeli yeni etiketli satırlarla günceller (idf sabit kalır)."""
+    bundle = joblib.load(os.path.join(MODELS_DIR, "hashed_bundle.pkl"))
+    model_path = os.path.join(MODELS_DIR, "incremental_model.pkl")
+    trainer = joblib.load(model_path)
+    le_path = os.path.join(MODELS_DIR, INCREMENTAL_ENCODER)
+    le = joblib.load(le_path)
+    n, added = 0, 0
+    with ParseExecutor(args.n_jobs, label="hashing") as ex:
+        for df, base, side in _label_chunks(args.update, args.chunk_rows):
+            y = encode_labels(le, df["label"], grow=True)  # yeni etiketler yeni kod alır
+            added += trainer.update(hashed_transform(bundle, base, side, ex), y)
+            n += len(df)
+    joblib.dump(trainer, model_path)
+    joblib.dump(le, le_path)
+    export_bundle(BUNDLE_DIR, bundle, trainer.clf, le.classes_[trainer.clf.classes_])
+    print(f"[{now()}] Model güncellendi: rows={n} yeni_sınıf={added} -> {model_path}")
+
 # ----------------- Ana akış -----------------
+def _parse_args():
+    import argparse
+
+    p = argparse.ArgumentParser(description="TF-IDF/hashing + SGD baseline")
+    p.add_argument("--features", choices=["tfidf", "hashing"], default="tfidf")
+    p.add_argument("--compare", action="store_true", help="Diğer özellik modunun CV farkını da raporla")
+    p.add_argument("--n-jobs", type=int, default=-1, help="özellik çıkarımı süreç sayısı; -1: bütün çekirdekler")
+    p.add_argument("--feature-cache", default=FEATURE_CACHE, help="Özellik cache dizini; boş = kapalı")
+    p.add_argument("--cv-jobs", type=int, default=-1, help="paralel CV fold süreci; -1: min(fold, çekirdek)")
+    p.add_argument("--cv-dir", default=CV_DIR, help="fold sıralı memmap özellik dizini")
+    p.add_argument("--prune", action="store_true",
+                   help="il/ilçe/mahalle -> eğitimde görülen etiketler; yalnız aday sınıfları skorla")
+    p.add_argument("--prune-min-rows", type=int, default=1, help="bir öneki kullanmak için gereken en az train satırı")
+    p.add_argument("--prune-min-size", type=int, default=PRUNE_MIN_SIZE,
+                   help="bir öneki kullanmak için gereken en az aday sınıf (CV ve test tahmininde aynı)")
+    # artımlı mod (her zaman hashing özellikleri)
+    p.add_argument("--train-mode", choices=["full", "incremental"], default="full",
+                   help="incremental: train parça parça okunur, partial_fit + holdout erken durdurma")
+    p.add_argument("--update", default=None, help="Kayıtlı artımlı modeli bu CSV'deki etiketli satırlarla güncelle")
+    p.add_argument("--chunk-rows", type=int, default=100_000)
+    p.add_argument("--batch-size", type=int, default=10_000, help="partial_fit mini-batch boyu")
+    p.add_argument("--max-epochs", type=int, default=10)
+    p.add_argument("--patience", type=int, default=3)
+    p.add_argument("--holdout", type=float, default=0.02, help="erken durdurma için ayrılan oran")
+    p.add_argument("--holdout-max", type=int, default=50_000)
+    p.add_argument("--shard-dir", default=SHARD_DIR)
+    return p.parse_args()
+
 def main():
+    args = _parse_args()
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    os.makedirs(SUBMIT_DIR, exist_ok=True)
+    if args.update:
+        update_incremental(args)
+        return
+    if args.train_mode == "incremental":
+        train_incremental(args)
+        print(f"[{now()}] DONE.")
+        return
+
     # 1) veriyi oku
     print(f"[{now()}] Loading train/test...")
     train = pd.read_csv(TRAIN_PATH)
@@ -162,8 +413,9 @@ def main():
     tr_base, tr_side = build_text_fields(train)
     te_base, te_side = build_text_fields(test)
 
-    # 3) TF-IDF'leri fit et ve dönüştür
-    X_tr, X_te, vect_bundle = fit_transform_features(tr_base, tr_side, te_base, te_side)
+    # 3) TF-IDF (ya da hashing) özelliklerini fit et ve dönüştür
+    X_tr, X_te, vect_bundle = build_features(args.features, tr_base, tr_side, te_base, te_side,
+                                          args.n_jobs, args.feature_cache)
 
     # 4) etiket encode
     print(f"[{now()}] Label encode...")
@@ -171,29 +423,18 @@ def main():
     y = le.fit_transform(train["label"].values)
 
     # 5) CV ile hızlı değerlendirme (opsiyonel: süre için katmanlı 3-fold)
-    print(f"[{now()}] CV eval (3-fold)...")
-    skf = StratifiedKFold(n_splits=3, shuffle=True, random_state=42)
-    accs, f1s, top3s = [], [], []
-    for fold, (tr_idx, va_idx) in enumerate(skf.split(X_tr, y), 1):
-        X_tr_f, X_va_f = X_tr[tr_idx], X_tr[va_idx]
-        y_tr_f, y_va_f = y[tr_idx], y[va_idx]
-
-        clf = make_model(n_classes=len(le.classes_))
-        clf.fit(X_tr_f, y_tr_f)
-
-        # val
-        proba = clf.predict_proba(X_va_f)
-        y_pred = proba.argmax(axis=1)
-
-        acc = accuracy_score(y_va_f, y_pred)
-        f1m = f1_score(y_va_f, y_pred, average="macro")
-        # top-k (k=3), scikit >=1.0
-        top3 = top_k_accuracy_score(y_va_f, proba, k=3, labels=np.arange(len(le.classes_)))
-
-        accs.append(acc); f1s.append(f1m); top3s.append(top3)
-        print(f"  Fold {fold}: acc={acc:.4f}  macroF1={f1m:.4f}  top3={top3:.4f}")
-
-    print(f"[{now()}] CV mean: acc={np.mean(accs):.4f}  macroF1={np.mean(f1s):.4f}  top3={np.mean(top3s):.4f}")
+    keys = admin_keys(train) if args.prune else None
+    cv = cv_eval(X_tr, y, n_classes=len(le.classes_), keys=keys, prune_min_rows=args.prune_min_rows,
+                 prune_min_size=args.prune_min_size, n_jobs=args.cv_jobs, cv_dir=args.cv_dir)
+    if args.compare:
+        other = "tfidf" if args.features == "hashing" else "hashing"
+        print(f"[{now()}] Karşılaştırma: {other} özellikleri...")
+        X_other, _, _ = build_features(other, tr_base, tr_side, te_base, te_side, args.n_jobs, args.feature_cache)
+        cv_other = cv_eval(X_other, y, n_classes=len(le.classes_), n_jobs=args.cv_jobs, cv_dir=args.cv_dir)
+        del X_other
+        hashed, tfidf = (cv, cv_other) if args.features == "hashing" else (cv_other, cv)
+        print(f"[{now()}] hashing - tfidf: " + "  ".join(
+            f"{k}={hashed[k] - tfidf[k]:+.4f}" for k in ("acc", "macroF1", "top3")))
 
     # 6) Tüm train ile yeniden eğit
     print(f"[{now()}] Fit full model...")
@@ -202,8 +443,15 @@ def main():
 
     # 7) Test tahmini
     print(f"[{now()}] Predict test...")
-    test_proba = clf_full.predict_proba(X_te)
-    test_pred  = test_proba.argmax(axis=1)
+    if args.prune:
+        index = CandidateIndex(args.prune_min_rows).fit(keys, y, classes=clf_full.classes_)
+        group, sets = index.candidates(admin_keys(test), min_size=args.prune_min_size)
+        test_pred = predict_pruned(clf_full, X_te, group, sets, k=1).labels[:, 0]
+        st = prune_stats(group, sets, len(clf_full.classes_))
+        print(f"[{now()}] Budama (test): rate={st['rate']:.3f}  fallback={st['fallback']:.3f}  "
+              f"ort. aday={st['candidates']:.1f}")
+    else:
+        test_pred = predict_topk(clf_full, X_te, k=1).labels[:, 0]
     pred_labels = le.inverse_transform(test_pred)
 
     # 8) Submission oluştur
@@ -219,10 +467,14 @@ def main():
     print(f"[{now()}] Wrote submission: {sub_path}  (rows={len(sub)})")
 
     # 9) Artefaktları kaydet (inference için)
-    joblib.dump(vect_bundle, os.path.join(MODELS_DIR, "tfidf_bundle.pkl"))
+    bundle_name = "tfidf_bundle.pkl" if args.features == "tfidf" else "hashed_bundle.pkl"
+    joblib.dump(vect_bundle, os.path.join(MODELS_DIR, bundle_name))
     joblib.dump(le,           os.path.join(MODELS_DIR, "label_encoder.pkl"))
     joblib.dump(clf_full,     os.path.join(MODELS_DIR, "sgd_model.pkl"))
-    print(f"[{now()}] Saved models to: {MODELS_DIR}")
+    export_bundle(BUNDLE_DIR, vect_bundle, clf_full, le.classes_[clf_full.classes_])
+    if args.prune:
+        joblib.dump(index, os.path.join(MODELS_DIR, "candidate_index.pkl"))
+    print(f"[{now()}] Saved models to: {MODELS_DIR} (bundle: {BUNDLE_DIR})")
 
     print(f"[{now()}] DONE.")
 
@@ -0,0 +1,35 @@
+import pytest
+
+from addresskit.preprocessing import ParsedAddress, parse_many
+from addresskit.preprocessing.pipeline import parse_addresses
+from addresskit.utils.cache import ParseCache
+
+TEXTS = [
+    "Atatürk Mah. Cumhuriyet Cad. No:12/3 Kat:2 Fethiye/Muğla",
+    "yıldız apt. ali veli sokağı no: 7 bodrum muğla",
+    None,
+    "Barbaros Bulv. İş Hanı kat 3 daire 12 izmir",
+] * 3
+
+
+def test_columns_match_row_api(tmp_path):
+    ref = parse_addresses(TEXTS)
+    with ParseCache(tmp_path / "c.sqlite", "t", "1") as cache:
+        for _ in range(2):  # ikinci tur tamamen cache'ten
+            batch = parse_many(TEXTS, cache, chunk_size=3)
+            assert batch.normalized == [r[0] for r in ref]
+            assert [batch.parts(i) for i in range(len(batch))] == [r[1] for r in ref]
+        assert cache.stats()["hits"] == len(TEXTS) + 8
+
+    assert batch["mahalle"][0] == "atatürk" and batch["mahalle"][2] is None
+    row = batch.row(0)
+    assert isinstance(row, ParsedAddress) and not hasattr(row, "__dict__")
+    assert (row.ilce, row["ilçe"], row.get("no")) == ("fethiye", "fethiye", "12")
+    assert row.to_dict() == ref[0][1]
+
+
+def test_to_frame_fills_missing():
+    pytest.importorskip("pandas")
+    df = parse_many(TEXTS[:3]).to_frame(fill="")
+    assert list(df.columns[:2]) == ["normalized", "mahalle"]
+    assert df.loc[2, "mahalle"] == "" and df.loc[0, "no"] == "12"
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+import scipy.sparse as sp  # noqa: E402
+from sklearn.feature_extraction.text import TfidfVectorizer  # noqa: E402
+from sklearn.linear_model import SGDClassifier  # noqa: E402
+
+from addresskit.modeling.bundle import InferenceBundle, export_bundle  # noqa: E402
+from addresskit.modeling.hashing import HashedChannel  # noqa: E402
+
+MAH = ["Atatürk", "Cumhuriyet", "Gümbet", "Kazımdirik", "Çarşı"]
+
+
+def _data(n, n_classes, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(n_classes, size=n)
+    base = [f"{MAH[v]} Mah.  {rng.integers(100)}. sokak No:{rng.integers(50)}" for v in y]
+    side = [f"{MAH[v].lower()} {rng.integers(20)}" for v in y]
+    return base, side, np.array([f"L{v}" for v in y])
+
+
+def _vects():
+    return {
+        "char_vect_base": TfidfVectorizer(analyzer="char", ngram_range=(2, 4), sublinear_tf=True, dtype=np.float32),
+        "word_vect_base": TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, min_df=2, dtype=np.float32),
+        "char_vect_side": HashedChannel("char", (2, 3), n_features=2**12),
+    }
+
+
+def _fit(n_classes):
+    base, side, y = _data(400, n_classes)
+    vects = _vects()
+    X = sp.hstack([v.fit_transform(side if n.endswith("_side") else base) for n, v in vects.items()], format="csr")
+    clf = SGDClassifier(loss="log_loss", random_state=0).fit(X, y)
+    return vects, clf, base, side, X
+
+
+@pytest.mark.parametrize("n_classes", [5, 2])
+def test_bundle_matches_sklearn(tmp_path, n_classes):
+    vects, clf, base, side, X = _fit(n_classes)
+    export_bundle(tmp_path, vects, clf, clf.classes_)
+    b = InferenceBundle.load(tmp_path)
+    assert isinstance(b.coef, np.memmap)
+
+    Xb = b.transform(base, side)
+    assert Xb.shape == X.shape and abs(Xb - X).max() < 1e-5
+    top = b.predict_topk(base, side, k=3, chunk_rows=37)
+    assert np.array_equal(top.labels[:, 0], clf.predict(X))
+    assert top.labels.shape == (len(base), min(3, n_classes))
+    full = b.predict_topk(base, side, k=2, full_proba=True)
+    assert np.allclose(full.proba, -np.sort(-clf.predict_proba(X), axis=1)[:, :2], atol=1e-4)
+
+
+def test_unseen_text_and_empty(tmp_path):
+    vects, clf, *_ = _fit(5)
+    export_bundle(tmp_path, vects, clf, clf.classes_)
+    b = InferenceBundle.load(tmp_path, mmap=False)
+    X = b.transform(["", "zzzz qqqq"], ["", ""])
+    assert X.shape[0] == 2 and X[0].nnz == 0
+    assert b.predict_topk([], [], k=1).labels.shape == (0, 1)
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from addresskit.normalize import normalize_text, open_normalize_cache
+from addresskit.preprocessing.pipeline import open_parse_cache, parse_address
+from addresskit.utils.cache import ParseCache, cached_map
+
+
+def test_cache_hits_misses_and_scope(tmp_path: Path):
+    db = tmp_path / "c.sqlite"
+    with ParseCache(db, "ns", "1") as c:
+        assert c.get("a") is None
+        c.put("a", {"x": 1})
+        assert c.get("a") == {"x": 1}
+        assert c.stats()["hits"] == 1 and c.stats()["misses"] == 1
+
+    # sürüm değişince eski kayıt görünmez
+    with ParseCache(db, "ns", "2") as c:
+        assert c.get("a") is None
+
+
+def test_cache_eviction_bound(tmp_path: Path):
+    with ParseCache(tmp_path / "c.sqlite", "ns", "1", max_entries=10) as c:
+        c.put_many((str(i), i) for i in range(25))
+        assert len(c) <= 10
+        assert c.evictions > 0
+
+
+def test_cached_map_computes_only_missing(tmp_path: Path):
+    calls = []
+
+    def fn(lst):
+        calls.append(list(lst))
+        return [t.upper() for t in lst]
+
+    with ParseCache(tmp_path / "c.sqlite", "ns", "1") as c:
+        assert cached_map(["a", "b", "a"], fn, c) == ["A", "B", "A"]
+        assert cached_map(["a", "c"], fn, c) == ["A", "C"]
+    assert calls == [["a", "b"], ["c"]]
+
+
+def test_normalize_and_parse_cached_equal(tmp_path: Path):
+    cfg = {"replace": {"cd.": "cadde"}}
+    with open_normalize_cache(tmp_path / "n.sqlite", cfg) as c:
+        for _ in range(2):
+            assert normalize_text("Atatürk CD. No:5", cfg, c) == normalize_text(
+                "Atatürk CD. No:5", cfg
+            )
+        assert c.hits == 1
+
+    raw = "Cumhuriyet Mah. 1234 Sk. No:5/3 Fethiye/Muğla"
+    with open_parse_cache(tmp_path / "p.sqlite") as c:
+        first = parse_address(raw, c)
+        second = parse_address(raw, c)
+    assert first == second == parse_address(raw)
+
+
+def test_normalize_cache_with_repo_config(tmp_path: Path):
+    from addresskit.normalize import load_cfg
+
+    # YAML `no:` anahtarları False okunur; karışık tipli anahtarlar hash'lenebilmeli
+    cfg = load_cfg(str(Path(__file__).resolve().parents[1] / "configs" / "normalize.yaml"))
+    with open_normalize_cache(tmp_path / "n.sqlite", cfg) as c:
+        assert normalize_text("Atatürk Cd. No:5", cfg, c) == normalize_text("Atatürk Cd. No:5", cfg)
+    assert open_normalize_cache(tmp_path / "n.sqlite", cfg).scope == c.scope
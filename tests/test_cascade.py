@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("rapidfuzz")
+from sklearn.feature_extraction.text import TfidfVectorizer  # noqa: E402
+
+from addresskit.matching.knn_index import TfidfKNNIndex, save_knn_index  # noqa: E402
+from addresskit.modeling.cascade import Cascade, Gate, StageOutput, _threshold, calibrate_gate, load_gates, save_gates  # noqa: E402
+from addresskit.modeling.topk import TopK  # noqa: E402
+
+STREETS = ["atatürk", "cumhuriyet", "inönü", "gazi", "fevzi çakmak", "mimar sinan", "kazım karabekir", "barbaros"]
+
+
+def _addr(rng, n):
+    lab = rng.integers(len(STREETS) * 5, size=n)
+    texts = [f"{STREETS[c % 8]} mah. {c // 8 + 1}. sokak no {rng.integers(1, 9)} kat {rng.integers(1, 4)}"
+             for c in lab]
+    return texts, np.array([f"L{c}" for c in lab], dtype=object)
+
+
+class _Bundle:
+    """Sabit tahminli sahte paket: ilk yarıda emin ve doğru, ikinci yarıda kararsız ve yanlış."""
+
+    def __init__(self, y):
+        self.y = y
+
+    def predict_topk(self, base, side, k=2, chunk_rows=0, full_proba=False):
+        rows = np.array([int(b) for b in base])
+        sure = rows < len(self.y) // 2
+        labels = np.stack([np.where(sure, self.y[rows], "X"), np.full(len(rows), "Y", dtype=object)], axis=1)
+        proba = np.stack([np.where(sure, 0.9, 0.4), np.where(sure, 0.1, 0.35)], axis=1).astype(np.float32)
+        return TopK(labels, np.log(proba), proba)
+
+
+def test_threshold_keeps_total_accuracy():
+    sig = np.array([0.9, 0.8, 0.8, 0.5, 0.3])
+    correct = np.array([1, 1, 0, 1, 0], dtype=bool)
+    fallback = np.array([1, 0, 1, 1, 1], dtype=bool)
+    # önek kazancı: 0, +1, 0 (eşit grup birlikte), 0, -1 -> en geniş güvenli önek 0.5'e kadar
+    assert _threshold(sig, correct, fallback) == 0.5
+    assert _threshold(sig, np.zeros(5, dtype=bool), np.ones(5, dtype=bool)) is None  # her kabul kayıp
+    out = StageOutput(np.array(["a", "b", "c", "d", "e"]), sig, np.zeros(5))
+    gate = calibrate_gate(out, np.where(correct, out.labels, "z"), fallback)
+    assert gate.conf == 0.5 and gate.accept(out).tolist() == [True, True, True, True, False]
+
+
+def test_cascade_calibrate_and_run(tmp_path):
+    rng = np.random.default_rng(0)
+    tr_texts, tr_y = _addr(rng, 400)
+    va_texts, va_y = _addr(rng, 120)
+    vec = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), dtype=np.float32)
+    save_knn_index(tmp_path / "knn", vec, vec.fit_transform(tr_texts), tr_y, texts=tr_texts)
+    index = TfidfKNNIndex(tmp_path / "knn")
+    assert index.texts([3, 0]) == [tr_texts[3], tr_texts[0]]
+
+    base = [str(i) for i in range(len(va_texts))]
+    cas = Cascade(_Bundle(va_y), index, k=5)
+    assert cas.stages == ["bundle", "knn", "rerank"]
+    gates = cas.calibrate(base, base, va_texts, va_y)
+    assert gates["bundle"].conf is not None and gates["bundle"].conf > 0.4  # kararsız yarı ileri gider
+
+    pred, stage_of, report = cas.run(base, base, va_texts, y=va_y)
+    assert [r["stage"] for r in report][0] == "bundle" and report[0]["accepted"] >= len(va_y) // 2
+    assert sum(r["accepted"] for r in report) == len(va_y) and (stage_of >= 0).all()
+    # kalibrasyon kümesinde toplam doğruluk son kademeden (tek başına) düşük değil
+    alone, _, _ = Cascade(None, index, k=5).run(base, base, va_texts)
+    assert np.mean(pred == va_y) >= np.mean(alone == va_y)
+
+    save_gates(tmp_path / "g.json", gates)
+    assert load_gates(tmp_path / "g.json") == gates
+    assert Gate().accept(StageOutput(va_y, np.ones(len(va_y)), np.ones(len(va_y)))).sum() == 0
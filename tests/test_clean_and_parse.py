@@ -0,0 +1,43 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+from scripts.clean_and_parse import process_file  # noqa: E402
+
+ROWS = [
+    "id,address,label",
+    '1,"Atatürk Mah. Cumhuriyet Cad. No:12 Fethiye/Muğla",7',
+    '2,"ATATÜRK MAH. CUMHURİYET CAD. NO:12 FETHİYE/MUĞLA",7',
+    '3,"yıldız apt. ali veli sokağı no: 7 bodrum muğla",8',
+    '3,"yıldız apt. ali veli sokağı no: 7 bodrum muğla",8',
+    '4,"bad, row",1,extra,fields',
+    '5,"kısa",2',
+    '6,"barbaros\nbulvarı no 3 izmir",9',
+    '7,"İstiklal Caddesi no 5 kat 2 beyoğlu istanbul",4',
+]
+
+
+def _run(tmp_path, chunk_size, **kw):
+    src = tmp_path / "in.csv"
+    src.write_text("\n".join(ROWS) + "\n", encoding="utf-8")
+    out = tmp_path / f"out_{chunk_size}.csv"
+    stats = process_file(str(src), str(out), True, cache_path=None, chunk_size=chunk_size, **kw)
+    return stats, out.read_bytes()
+
+
+def test_streaming_matches_single_chunk(tmp_path):
+    stats, small = _run(tmp_path, 2)
+    _, whole = _run(tmp_path, 1000)
+    assert small == whole
+    assert stats["dropped_exact"] == 1 and stats["dropped_clean"] == 1
+
+    df = pd.read_csv(tmp_path / "out_2.csv", encoding="utf-8-sig")
+    assert df["id"].tolist() == [1, 3, 6, 7]
+    # ilk satırın tekrarı sonraki parçada görülse de bayrak 1 olur
+    assert df["is_duplicate_clean"].tolist() == [1, 1, 0, 0]
+    assert df.loc[2, "address"] == "barbaros bulvarı no 3 izmir"
+
+
+def test_keep_duplicates_flags_all(tmp_path):
+    _, out = _run(tmp_path, 3, drop_exact_duplicates=False, drop_clean_duplicates=False)
+    df = pd.read_csv(tmp_path / "out_3.csv", encoding="utf-8-sig")
+    assert len(df) == 6 and df["is_duplicate_clean"].tolist() == [1, 1, 1, 1, 0, 0]
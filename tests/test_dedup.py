@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+from addresskit.utils.dedup import (  # noqa: E402
+    ChunkDeduper,
+    FingerprintIndex,
+    duplicated,
+    fingerprints,
+    occurrence_rank,
+    row_fingerprints,
+)
+
+
+def _rows(n=400, seed=0):
+    r = random.Random(seed)
+    return {
+        "id": [str(r.randint(1, 60)) for _ in range(n)],
+        "address": [r.choice(["a", "b", "c", "d", "e"]) for _ in range(n)],
+    }
+
+
+def test_rank_and_duplicated():
+    fps = fingerprints(["x", "y", "x", "z", "x", "y"])
+    assert occurrence_rank(fps).tolist() == [0, 0, 1, 0, 2, 1]
+    assert duplicated(fps).tolist() == [False, False, True, False, True, True]
+    assert duplicated(fps, keep=False).tolist() == [True, True, True, False, True, True]
+
+
+def test_index_counts_across_chunks():
+    idx = FingerprintIndex()
+    a, b = fingerprints(["p", "q", "p"]), fingerprints(["q", "r"])
+    assert idx.prior(a).tolist() == [0, 0, 1]
+    idx.add(a, rows=np.array([10, 11, 12]))
+    assert idx.prior(b).tolist() == [1, 0]
+    idx.add(b, rows=np.array([13, 14]))
+    assert sorted(idx.repeated_first_rows().tolist()) == [10, 11]
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 400])
+def test_chunk_deduper_matches_pandas(chunk):
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame(_rows())
+    ref = df.drop_duplicates().drop_duplicates(subset=["address"])
+    dup_ref = df.duplicated(subset=["address"], keep=False)
+
+    dd = ChunkDeduper()
+    kept, flags = [], np.zeros(len(df), dtype=int)
+    for s in range(0, len(df), chunk):
+        part = df.iloc[s : s + chunk]
+        keep, dup, rows = dd.update(row_fingerprints(part), fingerprints(part["address"]))
+        kept.extend(part.index[keep])
+        flags[s : s + chunk] = dup
+    assert kept == ref.index.tolist()
+    assert dd.dropped_exact + dd.dropped_clean == len(df) - len(ref)
+    # geç tespit edilen ilk geçişler düzeltildiğinde keep=False ile aynı
+    final = flags[ref.index].copy()
+    final[dd.late_duplicates()] = 1
+    assert final.tolist() == dup_ref[ref.index].astype(int).tolist()
@@ -0,0 +1,27 @@
+from addresskit.preprocessing.batch import parse_many
+from addresskit.preprocessing.executor import ParseExecutor, n_workers
+
+
+def _square(chunk, offset):
+    return [x * x + offset for x in chunk]
+
+
+def test_map_keeps_order_across_processes():
+    items = list(range(103))
+    with ParseExecutor(2) as ex:
+        assert ex.map(_square, items, 1, chunk_size=10) == [x * x + 1 for x in items]
+        chunks = [items[i : i + 7] for i in range(0, 103, 7)]
+        assert [r[0] for r in ex.map_chunks(_square, chunks, 0)] == [c[0] ** 2 for c in chunks]
+        assert ex.done == 206
+    assert ex._pool is None
+
+
+def test_parse_many_shared_executor_matches_serial():
+    texts = [f"atatürk mah. {i}. sokak no:{i} bornova izmir" for i in range(40)]
+    serial = parse_many(texts)
+    with ParseExecutor(2) as ex:
+        par = parse_many(texts, chunk_size=6, executor=ex)
+        assert ex._pool is not None  # parse_many paylaşılan havuzu kapatmaz
+    assert par.normalized == serial.normalized
+    assert par.columns == serial.columns
+    assert n_workers(1) == n_workers(0) == 1 and n_workers(-1) >= 1
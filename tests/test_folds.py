@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from addresskit.modeling.folds import FoldLayout, run_folds, write_fold_layout
+
+
+def _fold_sums(layout, fold, scale):
+    X_tr, y_tr, _ = layout.train(fold)
+    X_va, y_va, _ = layout.valid(fold)
+    return {"tr": float(X_tr.sum()) * scale, "va_rows": X_va.shape[0], "y": int(y_tr.sum() + y_va.sum())}
+
+
+def _data(n=103, seed=0):
+    X = sp.random(n, 30, density=0.2, format="csr", dtype=np.float32, random_state=seed)
+    y = np.arange(n) % 4
+    rng = np.random.default_rng(seed)
+    folds = np.array_split(rng.permutation(n), 3)
+    return X, y, folds
+
+
+def test_views_match_fancy_indexing(tmp_path):
+    X, y, folds = _data()
+    layout = write_fold_layout(X, y, folds, tmp_path / "cv")
+    for f, va in enumerate(folds):
+        tr = np.concatenate([folds[(f + j) % 3] for j in (1, 2)])
+        X_tr, y_tr, rows_tr = layout.train(f)
+        X_va, y_va, rows_va = layout.valid(f)
+        assert np.array_equal(rows_va, va) and np.array_equal(rows_tr, tr)
+        assert (X_tr != X[tr]).nnz == 0 and (X_va != X[va]).nnz == 0
+        assert np.array_equal(y_tr, y[tr]) and np.array_equal(y_va, y[va])
+        assert np.shares_memory(X_tr.data, layout.data)  # kopya değil, memmap dilimi
+    assert FoldLayout(tmp_path / "cv", mmap=False).n_folds == 3
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_run_folds_ordered_with_stats(tmp_path, n_jobs):
+    X, y, folds = _data()
+    write_fold_layout(X, y, folds, tmp_path)
+    res = run_folds(tmp_path, _fold_sums, n_jobs, 2.0)
+    assert [r["fold"] for r in res] == [1, 2, 3]
+    assert [r["va_rows"] for r in res] == [len(f) for f in folds]
+    assert sum(r["tr"] for r in res) == pytest.approx(2.0 * 2 * X.sum(), rel=1e-5)
+    assert all(r["sec"] >= 0 and r["peak_rss_mb"] > 0 for r in res)
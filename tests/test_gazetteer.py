@@ -0,0 +1,52 @@
+import json
+
+from addresskit.matching.blocking import make_block_key
+from addresskit.preprocessing.gazetteer import Gazetteer, load_gazetteer, tokenize
+
+HIER = {
+    "İstanbul": {"Kadıköy": ["Caferağa Mahallesi", "Moda"], "Şile": ["Balibey"]},
+    "Muğla": {"Fethiye": ["Cumhuriyet"], "Bodrum": ["Gümbet"]},
+    "Sakarya": {"Merkez": []},
+    "Kayseri": {"Merkez": []},
+    "Afyonkarahisar": {"Sandıklı": []},
+}
+
+
+def _gz():
+    return Gazetteer.from_hierarchy(HIER, source="toy")
+
+
+def test_multiword_and_folding():
+    gz = _gz()
+    toks = tokenize("caferaga mah. moda kadikoy istanbul")
+    levels = [(h.start, h.end, sorted(h.levels)) for h in gz.spans(toks)]
+    assert levels == [(0, 1, ["mahalle"]), (2, 3, ["mahalle"]), (3, 4, ["ilce"]), (4, 5, ["il"])]
+    # çok token'lı ad tek span
+    assert [(h.start, h.end) for h in gz.spans(tokenize("k. maraş"))] == [(0, 2)]
+    assert gz.is_il("MUĞLA".lower()) and gz.is_il("mugla") and gz.is_ilce("şile")
+
+
+def test_locate_is_hierarchy_consistent():
+    gz = _gz()
+    assert gz.locate(tokenize("gümbet bodrum/muğla"), with_mahalle=True)[:3] == ("muğla", "bodrum", "gümbet")
+    # ilçe ile ait değilse alınmaz; belirsiz ilçeden il çıkarılmaz
+    assert gz.locate(tokenize("fethiye istanbul"))[:2] == ("istanbul", "")
+    assert gz.locate(tokenize("merkez mahalle"))[:2] == ("", "merkez")
+    assert gz.locate(tokenize("sandıklı"))[:2] == ("afyonkarahisar", "sandıklı")
+    assert gz.locate(tokenize("ali afyon"))[:2] == ("afyonkarahisar", "")
+
+
+def test_builtin_fallback_and_fingerprint(tmp_path):
+    p = tmp_path / "h.json"
+    p.write_text(json.dumps(HIER, ensure_ascii=False), encoding="utf-8")
+    loaded = load_gazetteer(str(p))
+    assert loaded.complete and loaded.fingerprint() == _gz().fingerprint().replace("toy", "h.json")
+    missing = load_gazetteer(str(tmp_path / "yok.json"))
+    assert not missing.complete
+    assert missing.locate(tokenize("fethiye/muğla"))[:2] == ("muğla", "fethiye")
+
+
+def test_block_key_falls_back_to_gazetteer():
+    row = {"t": "cumhuriyet cad no 3 bodrum muğla"}
+    assert make_block_key(row, "t", "province+district") == "muğla|bodrum"
+    assert make_block_key({"t": "abc sokak"}, "t", "province+district") == "abcsokak"
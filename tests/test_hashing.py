@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+from sklearn.feature_extraction.text import TfidfVectorizer  # noqa: E402
+
+from addresskit.modeling.hashing import HashedChannel  # noqa: E402
+from addresskit.preprocessing.executor import ParseExecutor  # noqa: E402
+
+DOCS = [f"atatürk mah {i % 7} sokak no {i % 13} bornova izmir" for i in range(120)] + ["tek seferlik xyz"]
+
+
+@pytest.mark.parametrize("analyzer,ngrams,pattern", [("char", (3, 5), None), ("word", (1, 2), r"[a-z0-9çğıöşü]+")])
+def test_matches_tfidf_without_collisions(analyzer, ngrams, pattern):
+    kw = {"token_pattern": pattern} if pattern else {}
+    ref = TfidfVectorizer(analyzer=analyzer, ngram_range=ngrams, min_df=3, lowercase=False,
+                          sublinear_tf=True, **kw).fit_transform(DOCS)
+    X = HashedChannel(analyzer, ngrams, n_features=2**22, min_df=3, token_pattern=pattern).fit_transform(DOCS)
+    assert X.shape == (len(DOCS), 2**22)
+    for i in range(len(DOCS)):
+        assert np.allclose(np.sort(X[i].data), np.sort(ref[i].data))
+
+
+def test_chunked_parallel_equals_serial():
+    serial = HashedChannel("char", (3, 4), n_features=2**16, min_df=2)
+    a = serial.fit_transform(DOCS)
+    par = HashedChannel("char", (3, 4), n_features=2**16, min_df=2)
+    with ParseExecutor(2) as ex:
+        b = par.fit_transform(DOCS, executor=ex, chunk_size=17)
+    assert np.array_equal(serial.idf_, par.idf_)
+    assert abs(a - b).max() < 1e-12
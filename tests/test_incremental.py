@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+from sklearn.linear_model import SGDClassifier  # noqa: E402
+
+from addresskit.modeling.hashing import HashedChannel  # noqa: E402
+from addresskit.modeling.incremental import IncrementalTrainer, ShardSet, ShardWriter, chunked_predict, encode_labels  # noqa: E402
+
+MAH = ["atatürk", "cumhuriyet", "gümbet", "kazımdirik"]
+
+
+def _data(n, labels, seed):
+    rng = np.random.default_rng(seed)
+    y = rng.choice(labels, n)
+    texts = [f"{MAH[v % len(MAH)] if v < 4 else 'yeni'} mah {rng.integers(100)} sokak no {rng.integers(50)}" for v in y]
+    return texts, y
+
+
+def _model():
+    return SGDClassifier(loss="log_loss", alpha=1e-4, class_weight="balanced", early_stopping=True, random_state=0)
+
+
+def test_shards_fit_and_update(tmp_path):
+    ch = HashedChannel("word", (1, 1), n_features=2**12)
+    texts, y = _data(600, [0, 1, 2, 3], seed=0)
+    for s in range(0, 600, 150):  # idf parça parça
+        ch.partial_fit(texts[s : s + 150])
+    assert ch.n_docs == 600
+
+    with ShardWriter(tmp_path) as w:
+        for s in range(0, 500, 100):
+            w.write(ch.transform(texts[s : s + 100]), y[s : s + 100])
+    shards = ShardSet(tmp_path)
+    assert len(shards) == 5 and sum(X.shape[0] for X, _ in shards) == 500
+
+    holdout = (ch.transform(texts[500:]), y[500:])
+    tr = IncrementalTrainer(_model, classes=[0, 1, 2, 3], counts=np.bincount(y[:500]),
+                            batch_size=64, max_epochs=8, patience=2)
+    hist = tr.fit(shards, holdout)
+    assert 1 <= len(hist) <= 8 and hist[-1]["holdout_acc"] > 0.95
+
+    new_texts, new_y = _data(160, [0, 1, 2, 3, 4], seed=1)  # yeni sınıf + eski sınıflardan satırlar
+    assert tr.update(ch.transform(new_texts), new_y, epochs=3) == 1
+    assert list(tr.clf.classes_) == [0, 1, 2, 3, 4]
+    assert np.mean(chunked_predict(tr.clf, ch.transform(new_texts), chunk_rows=7) == new_y) > 0.9
+    assert np.mean(chunked_predict(tr.clf, holdout[0]) == holdout[1]) > 0.9
+
+
+def test_string_labels_encoded_for_shards(tmp_path):
+    from sklearn.preprocessing import LabelEncoder
+
+    y = np.array(["mah_b", "mah_a", "mah_b"], dtype=object)
+    with ShardWriter(tmp_path) as w:
+        with pytest.raises(TypeError):
+            w.write(np.eye(3), y)  # object dizisi pickle'sız geri okunamaz
+        le = LabelEncoder().fit(y)
+        w.write(np.eye(3), encode_labels(le, y))
+    _, codes = ShardSet(tmp_path).load(0)
+    assert codes.tolist() == [1, 0, 1] and le.classes_[codes].tolist() == y.tolist()
+
+    # update: yeni (daha uzun) etiket sona eklenir, eski kodlar korunur
+    assert encode_labels(le, ["yeni_mahalle", "mah_a"], grow=True).tolist() == [2, 0]
+    assert le.classes_.tolist() == ["mah_a", "mah_b", "yeni_mahalle"]
+    with pytest.raises(ValueError):
+        encode_labels(le, ["bilinmeyen"])
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from addresskit.matching.ivf import IVFIndex, exact_topk, recall_curve
+
+
+def _data(n=3000, d=32, seed=0):
+    rng = np.random.default_rng(seed)
+    C = rng.normal(size=(40, d))
+    X = C[rng.integers(40, size=n)] + 0.3 * rng.normal(size=(n, d))
+    X = (X / np.linalg.norm(X, axis=1, keepdims=True)).astype(np.float32)
+    nq = min(200, n)
+    Q = X[:nq] + 0.05 * rng.normal(size=(nq, d)).astype(np.float32)
+    return X, Q / np.linalg.norm(Q, axis=1, keepdims=True)
+
+
+def test_exhaustive_probe_is_exact_and_recall_grows(tmp_path):
+    X, Q = _data()
+    index = IVFIndex.build(X, n_lists=32)
+    assert index.offsets[-1] == len(X) and sorted(index.ids.tolist()) == list(range(len(X)))
+    exact = exact_topk(Q, X, 10)
+    # sorgu ve train parçalı (küçük bütçe) sonuç tam matrisle aynı
+    small = exact_topk(Q, X, 10, train_block=700, working_mb=0.5)
+    assert np.array_equal(small[0], exact[0]) and np.allclose(small[1], np.sort(Q @ X.T, axis=1)[:, ::-1][:, :10])
+    ids, sc = index.search(Q, k=10, nprobe=32)
+    assert np.allclose(sc, exact[1], atol=1e-5)
+    curve = recall_curve(index, Q, exact, 10, (1, 4, 32))
+    assert [r["nprobe"] for r in curve] == [1, 4, 32]
+    assert curve[0]["recall@10"] <= curve[1]["recall@10"] <= curve[2]["recall@10"] == 1.0
+
+    index.save(tmp_path)
+    loaded = IVFIndex.load(tmp_path)
+    assert isinstance(loaded.vectors, np.memmap) and loaded.codes is None
+    assert np.array_equal(loaded.search(Q, k=5, nprobe=4)[0], index.search(Q, k=5, nprobe=4)[0])
+
+
+def test_pq_scores_match_reconstruction(tmp_path):
+    X, Q = _data(n=1500, d=16)
+    index = IVFIndex.build(X, n_lists=8, pq_m=4)
+    assert index.vectors is None and index.codes.dtype == np.uint8
+    m, _, sub = index.codebooks.shape
+    R = np.concatenate([index.codebooks[j][index.codes[:, j]] for j in range(m)], axis=1)
+    ids, sc = index.search(Q[:20], k=3, nprobe=8)
+    pos = np.argsort(index.ids)  # orijinal satır -> liste sırası
+    assert np.allclose(sc, np.einsum("qd,qkd->qk", Q[:20], R[pos[ids]]), atol=1e-4)
+    index.save(tmp_path)
+    assert IVFIndex.load(tmp_path, mmap=False).pq_m == 4
+    with pytest.raises(ValueError):
+        IVFIndex.build(X, n_lists=4, pq_m=5)
+
+
+def test_padding_when_probe_has_few_rows():
+    X, Q = _data(n=50, d=8)
+    index = IVFIndex.build(X, n_lists=25)
+    ids, sc = index.search(Q[:3], k=40, nprobe=1)
+    assert (ids == -1).any() and np.all(np.isneginf(sc[ids == -1]))
+    assert index.search(Q[:0], k=2)[0].shape == (0, 2)
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+import pandas as pd  # noqa: E402
+from sklearn.feature_extraction.text import TfidfVectorizer  # noqa: E402
+
+from addresskit.matching.knn_index import TfidfKNNIndex, has_knn_index, open_knn_index, save_knn_index  # noqa: E402
+from addresskit.matching.sparse_knn import SparseKNN  # noqa: E402
+from addresskit.matching.string_similarity import fit_knn, predict_knn, predict_knn_index, run_match  # noqa: E402
+
+TRAIN = [f"{s} mah. {n}. sokak no {n % 40} {d} izmir" for n in range(300)
+         for s, d in [(("atatürk", "alsancak", "bostanlı")[n % 3], ("konak", "karşıyaka", "buca")[n % 3])]]
+TEST = ["atatürk mah 12 sk no 12 konak", "bostanlı mahallesi 5. sokak karşıyaka", "", "alsancak 77. sokak"]
+
+
+@pytest.mark.parametrize("analyzer", ["char", "char_wb"])
+def test_index_matches_in_memory_knn(tmp_path, analyzer):
+    vec = TfidfVectorizer(analyzer=analyzer, ngram_range=(3, 5), dtype=np.float32)
+    X = vec.fit_transform(TRAIN)
+    labels = np.array([f"L{i % 50}" for i in range(len(TRAIN))], dtype=object)
+    save_knn_index(tmp_path / "idx", vec, X, labels)
+    assert has_knn_index(tmp_path / "idx") and not has_knn_index(tmp_path / "yok")
+
+    index = TfidfKNNIndex(tmp_path / "idx", train_block=128)
+    assert index._blocks is None and len(index) == len(TRAIN)  # diziler ilk sorguda açılır
+    idx, sims = index.search(TEST, k=3)
+    ref_idx, ref_sims = SparseKNN(X).search(vec.transform(TEST), k=3)
+    assert np.allclose(sims, ref_sims, atol=1e-5)
+    assert (idx[:, 0] == ref_idx[:, 0]).mean() >= 0.75
+    B = index._blocks[1][1]  # memmap dizilerinin kopyasız görünümü
+    assert B.shape[0] == 128 and not B.data.flags.writeable  # salt okunur memmap
+    pred, s1 = index.predict(TEST)
+    assert pred.shape == (4,) and pred[0].startswith("L") and s1[2] == 0.0
+
+
+def test_open_is_cached_and_string_similarity_reuses_index(tmp_path):
+    train = pd.DataFrame({"address_norm": TRAIN, "label": [i % 50 for i in range(len(TRAIN))]})
+    test = pd.DataFrame({"id": range(len(TEST)), "address_norm": TEST})
+    vec, knn, X = fit_knn(train["address_norm"], n_jobs=1, train_labels=train["label"],
+                          index_dir=tmp_path / "idx")
+    assert open_knn_index(tmp_path / "idx") is open_knn_index(tmp_path / "idx")
+    ref = predict_knn(test["address_norm"], vec, knn, X, train["label"])
+    got = predict_knn_index(test["address_norm"], tmp_path / "idx", n_jobs=1)
+    assert got[0] == ref[0] and np.allclose(got[1], ref[1], atol=1e-5)
+
+    # indeks varken train dosyası okunmaz
+    test.to_csv(tmp_path / "test.csv", index=False)
+    run_match(tmp_path / "train_yok.csv", tmp_path / "test.csv", tmp_path / "out.parquet",
+              index_dir=tmp_path / "idx")
+    assert pd.read_parquet(tmp_path / "out.parquet")["label_pred"].tolist() == ref[0]
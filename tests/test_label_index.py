@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+import scipy.sparse as sp  # noqa: E402
+
+from addresskit.matching.label_index import LabelCentroidIndex, compare_index_modes  # noqa: E402
+from addresskit.matching.sparse_knn import SparseKNN  # noqa: E402
+
+
+def _data(n=600, n_labels=12, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(n_labels, size=n)
+    proto = sp.random(n_labels, 200, density=0.08, random_state=seed).toarray()
+    X = proto[y] + 0.3 * sp.random(n, 200, density=0.03, random_state=seed + 1).toarray()
+    return sp.csr_matrix(X), np.array([f"L{v}" for v in y])
+
+
+def test_centroids_and_full_rerank():
+    X, y = _data()
+    idx = LabelCentroidIndex(X, y)
+    assert len(idx) == 12 and idx.centroids.shape == (12, 200)
+    pred, sims = idx.predict(X[:100])
+    assert np.mean(pred == y[:100]) > 0.9 and sims.shape == (100,)
+    assert idx.predict(X[:5], k=3)[0].shape == (5, 3)
+
+    # bütün etiketler aday -> tam satır kaba kuvvet 1-NN ile aynı
+    full = LabelCentroidIndex(X, y, rerank_m=12)
+    Q = X[::7] + sp.random(X[::7].shape[0], 200, density=0.05, random_state=3)
+    p_full, s_full = full.predict(Q)
+    p_rows, s_rows = SparseKNN(X, labels=y).predict(Q)
+    assert np.allclose(s_full, s_rows, atol=1e-5) and np.mean(p_full == p_rows) > 0.98
+    with pytest.raises(ValueError):
+        full.predict(Q, k=2)
+
+
+def test_compare_index_modes():
+    X, y = _data()
+    rows = compare_index_modes(X[:500], y[:500], X[500:], y[500:], rerank_ms=(0, 2))
+    assert [r["mode"] for r in rows] == ["rows", "centroid", "centroid+rerank2"]
+    assert rows[0]["index_rows"] == 500 and rows[1]["index_rows"] == 12
+    assert all(0 <= r["acc"] <= 1 and r["ms_per_query"] >= 0 for r in rows)
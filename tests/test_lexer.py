@@ -0,0 +1,37 @@
+import importlib
+
+from addresskit.preprocessing.lexer import CITY, KEYWORD, NAME, NUMBER, SLASH, SLASH_NUMBER, lex
+from addresskit.preprocessing.pipeline import parse_address
+from addresskit.preprocessing.postprocess import postprocess_parts
+
+nap = importlib.import_module("addresskit.preprocessing.normalize_and_parse")
+
+SAMPLES = [
+    "Atatürk Mah. Cumhuriyet Cad. No:12/3 Kat:2 Fethiye/Muğla",
+    "Kızılay mh 864.sk no 5 d 4 Çankaya Ankara",
+    "yıldız apt. ali veli sokağı no: 7 bodrum muğla",
+    "kapı no:3 esentepe mevkii kadıköy / istanbul",
+    "Barbaros Bulv. İş Hanı kat 3 daire 12 izmir",
+]
+
+
+def test_token_kinds():
+    lx = lex("atatürk mahalle no 12/3 5 / muğla")
+    assert lx.kinds() == [NAME, KEYWORD, KEYWORD, SLASH_NUMBER, NUMBER, SLASH, CITY]
+    assert lx.index("no") == 2 and lx.index("sokak") == -1
+
+
+def test_shared_tokens_match_plain_path():
+    for s in SAMPLES:
+        norm, parts, lexed = nap.normalize_and_parse_lexed(s)
+        assert (norm, parts) == nap.normalize_and_parse(s)
+        assert postprocess_parts(norm, parts, lexed=lexed) == postprocess_parts(norm, parts)
+
+
+def test_parse_address_fields():
+    norm, parts = parse_address(SAMPLES[0])
+    assert norm == "atatürk mahalle cumhuriyet cadde no 12/3 kat at 2 fethiye / muğla"
+    assert parts["mahalle"] == "atatürk" and parts["cadde"] == "cumhuriyet"
+    assert (parts["no"], parts["daire"]) == ("12", "3")
+    assert (parts["il"], parts["ilçe"]) == ("muğla", "fethiye")
+    assert parts["_confidence"] == 0.78
@@ -27,3 +27,35 @@ def test_match(tmp_path: Path):
         and rows[1]["right_id"] == "1"
         and float(rows[1]["score"]) == 1.0
     )
+
+
+def _run(tmp_path: Path, cfg_text: str, name: str):
+    out = tmp_path / f"{name}.csv"
+    cfg = tmp_path / f"{name}.yaml"
+    cfg.write_text(cfg_text, encoding="utf-8")
+    match_addresses(str(tmp_path / "left.csv"), str(tmp_path / "right.csv"), str(out), str(cfg))
+    return list(csv.DictReader(out.open(encoding="utf-8")))
+
+
+def test_match_retrieve_rerank(tmp_path: Path):
+    (tmp_path / "left.csv").write_text(
+        "id,address\n0,Atatürk Mah 12. Sokak No 5\n1,Cumhuriyet Cad No 40 Konak\n2,Gazi Bulvarı 7\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "right.csv").write_text(
+        "id,address\n"
+        "a,Atatürk Mahallesi 12. Sokak No 5\n"
+        "b,Atatürk Mahallesi 14. Sokak No 9\n"
+        "c,Cumhuriyet Caddesi No 40 Konak\n"
+        "d,Cumhuriyet Caddesi No 41 Buca\n"
+        "e,Gazi Bulvarı No 7\n",
+        encoding="utf-8",
+    )
+    base = "threshold: 50\ntopk: 2\nwrite_unmatched: false\n"
+    # N = sağ satır sayısı -> bloklamasız fuzzy ile aynı sonuç
+    full = _run(tmp_path, base + "method: retrieve\nretrieve_n: 5\n", "full")
+    fuzzy = _run(tmp_path, base + "method: fuzzy\n", "fuzzy")
+    assert full == fuzzy
+    # N = 1: satır başına tek aday, en iyi eşleşme korunur
+    top1 = _run(tmp_path, base + "method: retrieve\nretrieve_n: 1\n", "top1")
+    assert [(r["left_id"], r["right_id"]) for r in top1] == [("0", "a"), ("1", "c"), ("2", "e")]
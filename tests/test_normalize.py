@@ -0,0 +1,26 @@
+import warnings
+
+from addresskit.normalize import normalize_text, profile_rules
+
+
+def test_profile_rules_counts_and_errors():
+    cfg = {
+        "regex": [{"pattern": r"\bno\s*:\s*", "repl": "no "}, {"pattern": "([", "repl": ""}],
+        "replace": {"cd.": "cadde", "zzz": "y"},
+        "abbreviations": {"mh": "mahalle"},
+    }
+    texts = ["Atatürk Cd. No:5", "Fatih MH 12", "Kadıköy"]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        stats, summary = profile_rules(texts, cfg)
+        expected = [normalize_text(t, cfg) for t in texts]
+
+    rows = {(st.step, st.rule): st.as_row() for st in stats}
+    assert rows[("regex", r"\bno\s*:\s*")]["matches"] == 1
+    assert rows[("regex", "([")]["error"].startswith("re.error")
+    assert rows[("replace", "cd.")]["changed"] == 1
+    assert rows[("replace", "zzz")]["dead"] == 1
+    assert rows[("abbreviations", "mh")]["matches"] == 1
+    assert summary["texts"] == 3 and summary["errors"] == 1
+    assert summary["single_pass_divergent"] == 0
+    assert expected[0] == "atatürk cadde no 5"
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from addresskit.preprocessing.batch import ParsedBatch
+from addresskit.preprocessing.parsed_store import ParsedWriter, read_parsed, source_columns
+
+
+def _batch(rows):
+    b = ParsedBatch(("il", "ilçe", "mahalle", "no", "_confidence"))
+    b.extend([(f"norm {i}", dict(r)) for i, r in enumerate(rows)])
+    return b
+
+
+ROWS1 = [{"il": "muğla", "ilçe": "bodrum", "_confidence": 0.5}, {"il": "muğla", "no": "3"}]
+ROWS2 = [{"il": "izmir", "ilçe": "bornova", "mahalle": "kazımdirik"}, {}]
+
+
+def _values(col):
+    return col.astype(object).where(col.notna(), None).tolist()
+
+
+def _write(path):
+    with ParsedWriter(path) as w:
+        w.write(_batch(ROWS1), extra={"id": ["a", "b"]})
+        w.write(_batch(ROWS2), extra={"id": ["c", "d"]})
+    return w
+
+
+def test_jsonl_roundtrip(tmp_path):
+    p = tmp_path / "out.jsonl"
+    assert _write(p).rows == 4
+    first = json.loads(p.read_text(encoding="utf-8").splitlines()[1])
+    assert first == {"id": "b", "normalized": "norm 1", "il": "muğla", "no": "3"}
+    df = read_parsed(p, columns=["id", "ilce"])
+    assert list(df.columns) == ["id", "ilce"]
+    assert _values(df["ilce"]) == ["bodrum", None, "bornova", None]
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_arrow_roundtrip(tmp_path, suffix):
+    pytest.importorskip("pyarrow")
+    p = tmp_path / f"out{suffix}"
+    _write(p)
+    df = read_parsed(p)
+    assert list(df.columns) == ["id", "normalized", "il", "ilce", "mahalle", "no", "confidence"]
+    assert df["il"].dtype == "category"
+    assert _values(df["il"]) == ["muğla", "muğla", "izmir", None]
+    assert df["confidence"].dtype == "float64"
+    assert _values(df["no"]) == [None, "3", None, None]
+    proj = read_parsed(p, columns=["mahalle"])
+    assert list(proj.columns) == ["mahalle"]
+    assert _values(proj["mahalle"])[2] == "kazımdirik"
+
+
+def test_unknown_suffix(tmp_path):
+    with pytest.raises(ValueError):
+        ParsedWriter(tmp_path / "out.csv")
+
+
+def test_source_columns_do_not_overwrite_parts(tmp_path):
+    p = tmp_path / "out.jsonl"
+    b = _batch(ROWS1[:1])
+    with ParsedWriter(p) as w:
+        with pytest.raises(ValueError, match="il"):
+            w.write(b, extra={"il": ["SOURCE-IL"], "normalized": ["SOURCE-NORM"]})
+        names = source_columns(["id", "il", "normalized"], b.keys)
+        assert names == {"id": "id", "il": "src_il", "normalized": "src_normalized"}
+        w.write(b, extra={names["il"]: ["SOURCE-IL"], names["normalized"]: ["SOURCE-NORM"]})
+    rec = json.loads(p.read_text(encoding="utf-8"))
+    assert rec["src_il"] == "SOURCE-IL" and rec["il"] == "muğla"
+    assert rec["src_normalized"] == "SOURCE-NORM" and rec["normalized"] == "norm 0"
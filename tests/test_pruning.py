@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+import scipy.sparse as sp  # noqa: E402
+from sklearn.linear_model import SGDClassifier  # noqa: E402
+
+from addresskit.modeling.pruning import CandidateIndex, admin_keys, predict_pruned, prune_stats  # noqa: E402
+from addresskit.modeling.topk import predict_topk  # noqa: E402
+
+
+def _fit(n=300, n_classes=6, seed=0):
+    rng = np.random.default_rng(seed)
+    X = sp.random(n, 40, density=0.2, format="csr", random_state=seed)
+    y = rng.integers(n_classes, size=n) * 10
+    return SGDClassifier(loss="log_loss", random_state=0).fit(X, y), X, y
+
+
+def test_admin_keys_and_backoff():
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame({"il": ["İzmir", "izmir", None, "Muğla"], "ilce": ["buca", "yok", "", "bodrum"],
+                       "mahalle": ["a", np.nan, "x", "gümbet"]})
+    keys = admin_keys(df)
+    assert keys[1] == ("izmir", None, None) and keys[2] == (None, None, "x")
+    idx = CandidateIndex().fit([("izmir", "buca", "a"), ("izmir", "bornova", "b"), ("muğla", None, None)],
+                               ["A", "B", "C"], classes=["A", "B", "C"])
+    group, sets = idx.candidates([("izmir", "buca", "a"), ("izmir", "buca", "zz"), ("izmir", None, None),
+                                  ("ankara", None, None), (None, None, None)])
+    assert [sets[g].tolist() if g >= 0 else None for g in group] == [[0], [0], [0, 1], None, None]
+    group, sets = idx.candidates([("izmir", "buca", "a")], min_size=2)  # küçük küme -> üst önek
+    assert sets[group[0]].tolist() == [0, 1]
+
+
+def test_matches_full_when_candidates_cover():
+    clf, X, y = _fit()
+    full = predict_topk(clf, X, k=3)
+    keys = [("il",) if i % 3 else (None,) for i in range(X.shape[0])]  # üçte biri fallback
+    idx = CandidateIndex().fit(keys, y, classes=clf.classes_)
+    group, sets = idx.candidates(keys, min_size=3)
+    top = predict_pruned(clf, X, group, sets, k=3, chunk_rows=17)
+    assert np.array_equal(top.labels, full.labels)
+    assert np.allclose(top.scores, full.scores, atol=1e-5)
+    st = prune_stats(group, sets, len(clf.classes_), y, clf.classes_)
+    assert st["coverage"] == 1.0 and st["fallback"] == pytest.approx(np.mean(group < 0))
+
+
+def test_restricts_to_candidates_and_binary():
+    clf, X, y = _fit(n_classes=6, seed=1)
+    keys = [(f"il{v}",) for v in y]  # her il tek etiket
+    idx = CandidateIndex().fit(keys, y, classes=clf.classes_)
+    group, sets = idx.candidates(keys)
+    top = predict_pruned(clf, X, group, sets, k=2)
+    assert np.array_equal(top.labels[:, 0], y) and np.all(np.isneginf(top.scores[:, 1]))
+    assert prune_stats(group, sets, 6)["rate"] == pytest.approx(5 / 6)
+
+    clf2, X2, y2 = _fit(n_classes=2, seed=2)
+    group = np.full(X2.shape[0], -1)
+    assert np.array_equal(predict_pruned(clf2, X2, group, [], k=1).labels[:, 0], clf2.predict(X2))
@@ -0,0 +1,80 @@
+import random
+import re
+
+from addresskit.normalize import normalize_text
+from addresskit.preprocessing.normalize_part import ABBR_MAP, _ABBR_REWRITER
+from addresskit.preprocessing.rewrite import (
+    RegexRule,
+    Rewriter,
+    Rule,
+    apply_sequential,
+    rules_from_regex,
+    rules_from_regex_table,
+)
+
+WORDS = (
+    "mah mah. mahallesi mh mh. cd cd. cad. caddesi bulv bulv. sok. sk sokağı "
+    "no no: no. d d. k: apt ap at. daire kat 12 5/3 atatürk kadıköy fethiye/muğla , . :"
+).split()
+
+
+def _corpus(n=3000, seed=7):
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(WORDS) + rng.choice([" ", " ", ""]) for _ in range(rng.randint(1, 8)))
+        for _ in range(n)
+    ]
+
+
+def test_rules_from_regex_expands_simple_patterns():
+    rules = rules_from_regex(r"\bbulv?\.?\b", "bulvar")
+    assert sorted(r.source for r in rules) == ["bul", "bul.", "bulv", "bulv."]
+    assert rules_from_regex(r"\bkapı\s*no\b", "no") == [RegexRule(r"\bkapı\s*no\b", "no")]
+    (d,) = rules_from_regex(r"\bd\b(?=\s*\d)", "daire")
+    assert d.lookahead == r"\s*\d"
+
+
+def test_abbr_map_single_pass_matches_sequential():
+    assert not _ABBR_REWRITER.conflicts and _ABBR_REWRITER.n_passes == 1
+    for s in _corpus():
+        ref = s
+        for pat, rep in ABBR_MAP.items():
+            ref = re.sub(pat, rep, ref)
+        assert _ABBR_REWRITER(s) == ref, s
+
+
+def test_mixed_table_keeps_order():
+    table = [Rule("mahallesi", "mahalle"), RegexRule(r"\bmah.\b", "mahalle"), Rule("cd", "cadde")]
+    rw = Rewriter(table)
+    assert rw.n_passes == 3
+    for s in _corpus(500):
+        assert rw(s) == apply_sequential(table, s)
+
+
+def test_conflicts_are_flagged():
+    rw = Rewriter([Rule("ab", "x", False, False), Rule("abc", "y", False, False)], on_conflict="ignore")
+    assert [c.kind for c in rw.conflicts] == ["shadow"]
+    rw = Rewriter([Rule("cd", "cadde"), Rule("cadde", "cad")], on_conflict="ignore")
+    assert [c.kind for c in rw.conflicts] == ["chain"]
+    rw = Rewriter([Rule("a", "1"), Rule("a", "2")], on_conflict="ignore")
+    assert [c.kind for c in rw.conflicts] == ["duplicate"]
+
+
+def test_split_conflicts_keeps_sequential_semantics():
+    import importlib
+
+    abbr = importlib.import_module("addresskit.preprocessing.normalize_and_parse").ABBR
+    rw = Rewriter(rules_from_regex_table(abbr.items()), split_conflicts=True)
+    assert not rw.conflicts and 1 < rw.n_passes < len(abbr)
+    for s in _corpus():
+        ref = s
+        for pat, rep in abbr.items():
+            ref = re.sub(pat, rep, ref)
+        assert rw(s) == ref, s
+
+
+def test_normalize_text_tables():
+    cfg = {"replace": {"cd.": "cadde ", "/": " "}, "abbreviations": {"mh": "mahalle", "sk": "sokak"}}
+    assert normalize_text("Cumhuriyet MH. 12 SK. Kadıköy/İstanbul", cfg) == (
+        "cumhuriyet mahalle. 12 sokak. kadıköy istanbul"
+    )
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+import scipy.sparse as sp  # noqa: E402
+from sklearn.neighbors import NearestNeighbors  # noqa: E402
+
+from addresskit.matching.sparse_knn import SparseKNN, budget_rows, sparse_topk  # noqa: E402
+
+
+def _data():
+    X = sp.random(900, 400, density=0.03, format="csr", random_state=0)
+    Q = sp.random(130, 400, density=0.03, format="csr", random_state=1)
+    return X, Q
+
+
+@pytest.mark.parametrize("n_jobs", [1, 3])
+def test_matches_sklearn_brute_cosine(n_jobs):
+    X, Q = _data()
+    d, i = NearestNeighbors(metric="cosine", algorithm="brute").fit(X).kneighbors(Q, 4)
+    idx, sims = sparse_topk(Q, X, k=4, chunk_rows=17, train_block=101, n_jobs=n_jobs)
+    assert idx.shape == (130, 4) and sims.dtype == np.float32
+    assert np.allclose(sims, 1 - d, atol=1e-5)
+    assert np.mean(idx[:, 0] == i[:, 0]) > 0.99  # yalnız eşit benzerlikte farklı olabilir
+    assert np.all(np.diff(sims, axis=1) <= 0)
+
+
+def test_predict_labels_and_edge_cases():
+    X, Q = _data()
+    labels = np.array([f"L{j % 7}" for j in range(X.shape[0])])
+    knn = SparseKNN(X, labels=labels, train_block=64)
+    pred, sims = knn.predict(X[:20])  # kendisi en yakın komşu
+    assert pred.tolist() == labels[:20].tolist() and np.allclose(sims[X[:20].getnnz(axis=1) > 0], 1, atol=1e-5)
+    assert knn.predict(Q, k=3)[0].shape == (130, 3)
+    idx, _ = knn.search(Q[:0], k=2)
+    assert idx.shape == (0, 2)
+    assert sparse_topk(Q, X[:2], k=5)[0].shape == (130, 2)
+    with pytest.raises(ValueError):
+        SparseKNN(X).predict(Q)
+
+
+def test_working_memory_budget_bounds_chunk():
+    # 1 MB / (2 thread x 1000 kolon x 20 bayt) = 26 satır
+    assert budget_rows(1000, workers=2, working_mb=1) == 26
+    assert budget_rows(10**9, workers=64, working_mb=1) == 1
+    X, Q = _data()
+    ref = sparse_topk(Q, X, k=3)
+    tiny = sparse_topk(Q, X, k=3, train_block=300, working_mb=0.01)  # parça boyu 1 satıra iner
+    assert np.array_equal(ref[1], tiny[1])
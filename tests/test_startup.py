@@ -0,0 +1,13 @@
+import pytest
+
+from addresskit.utils.startup import load_budgets, measure
+
+BUDGETS = {m: s for m, s in load_budgets().items() if m.startswith("addresskit.")}
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS))
+def test_no_heavy_imports_at_import_time(module):
+    # süre bütçesi makineye bağlı (CLI --check); burada yalnız yasaklı paketler
+    m = measure(module, repeat=1)
+    assert m.module in m.modules
+    assert m.forbidden(BUDGETS[module].get("forbid") or []) == []
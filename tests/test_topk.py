@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+from sklearn.linear_model import SGDClassifier  # noqa: E402
+
+from addresskit.modeling.topk import predict_topk, topk_accuracy  # noqa: E402
+
+
+def _fit(n_classes, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(300, 12))
+    y = rng.integers(n_classes, size=300) * 10  # etiketler 0..n-1 değil
+    return SGDClassifier(loss="log_loss", random_state=0).fit(X, y), X, y
+
+
+def test_matches_full_decision_function():
+    clf, X, y = _fit(7)
+    top = predict_topk(clf, X, k=3, chunk_rows=41)
+    S = clf.decision_function(X)
+    ref = clf.classes_[np.argsort(-S, axis=1)[:, :3]]
+    assert np.array_equal(top.labels, ref)
+    assert np.array_equal(top.labels[:, 0], clf.predict(X))
+    assert np.allclose(top.proba.sum(axis=1), 1.0, atol=1e-5)
+    assert np.all(np.diff(top.scores, axis=1) <= 0)
+    assert topk_accuracy(y, top.labels) >= np.mean(top.labels[:, 0] == y)
+
+
+def test_binary_and_large_k():
+    clf, X, _ = _fit(2)
+    top = predict_topk(clf, X, k=5)
+    assert top.labels.shape == (300, 2)
+    assert np.array_equal(top.labels[:, 0], clf.predict(X))
+
+
+def test_full_proba_matches_predict_proba():
+    for n_classes in (7, 2):
+        clf, X, _ = _fit(n_classes)
+        top = predict_topk(clf, X, k=2, chunk_rows=41, full_proba=True)
+        ref = -np.sort(-clf.predict_proba(X), axis=1)[:, :2]
+        assert np.allclose(top.proba, ref, atol=1e-5)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+pytest.importorskip("sklearn")
+from sklearn.feature_extraction.text import TfidfVectorizer  # noqa: E402
+
+from addresskit.modeling.channels import fit_channels  # noqa: E402
+from addresskit.utils.vectorizer_store import VectorizerStore, data_digest, vectorizer_params  # noqa: E402
+
+TR = [f"atatürk mah {i % 5} sokak no {i} izmir" for i in range(30)]
+TE = ["atatürk mah 2 sokak", "bornova izmir"]
+
+
+def _specs(min_df=1):
+    return [
+        ("char", TfidfVectorizer(analyzer="char", ngram_range=(2, 3), min_df=min_df, dtype=np.float32), TR, TE),
+        ("word", TfidfVectorizer(min_df=min_df, dtype=np.float32), TR, TE),
+    ]
+
+
+def test_fit_channels_parallel_matches_serial():
+    X_tr, X_te, bundle = fit_channels(_specs(), n_jobs=2)
+    ref = [vec.fit_transform(tr) for _, vec, tr, _ in _specs()]
+    assert list(bundle) == ["char", "word"]
+    assert X_tr.dtype == np.float32 and X_tr.shape == (30, sum(r.shape[1] for r in ref))
+    assert abs(X_tr[:, : ref[0].shape[1]] - ref[0]).max() == 0
+    te = sp.hstack([bundle["char"].transform(TE), bundle["word"].transform(TE)])
+    assert abs(X_te - te).max() == 0
+
+
+def test_store_roundtrip_and_key(tmp_path):
+    store = VectorizerStore(tmp_path)
+    params = {n: vectorizer_params(v) for n, v, _, _ in _specs()}
+    key = store.key("tfidf", params, [data_digest(TR), data_digest(TE)])
+    assert store.load(key) is None
+
+    X_tr, X_te, bundle = fit_channels(_specs(), n_jobs=1)
+    store.save(key, X_tr, X_te, bundle, meta={"mode": "tfidf"})
+    X_tr2, X_te2, bundle2 = store.load(key)
+    assert (X_tr2 != X_tr).nnz == 0 and X_tr2.dtype == np.float32
+    assert bundle2["word"].vocabulary_ == bundle["word"].vocabulary_
+    assert store.stats() == {"hits": 1, "misses": 1}
+
+    other = {n: vectorizer_params(v) for n, v, _, _ in _specs(min_df=2)}
+    assert store.key("tfidf", other, [data_digest(TR), data_digest(TE)]) != key
+    assert data_digest(TR[::-1]) != data_digest(TR)
@@ -0,0 +1,44 @@
+import json
+
+from addresskit.preprocessing.weak_labeling import WeakLabeler, label_file
+
+HIER = {
+    "Muğla": {"Fethiye": ["Cumhuriyet"], "Bodrum": ["Gümbet"]},
+    "Kahramanmaraş": {"Onikişubat": ["Yeni Mahalle"]},
+}
+
+
+def _files(tmp_path):
+    h, i = tmp_path / "h.json", tmp_path / "i.json"
+    h.write_text(json.dumps(HIER, ensure_ascii=False), encoding="utf-8")
+    i.write_text(json.dumps({"Karşıyaka": {"il": "muğla", "ilce": "bodrum"}}, ensure_ascii=False), encoding="utf-8")
+    return str(h), str(i)
+
+
+def test_bio_spans(tmp_path):
+    lab = WeakLabeler.from_files(*_files(tmp_path))
+    res = lab.label("yeni mahalle onikişubat k.maraş")
+    assert res["tokens"] == ["yeni", "mahalle", "onikişubat", "k", ".", "maraş"]
+    assert res["labels"] == ["B-MAHALLE", "O", "B-ILCE", "B-IL", "I-IL", "I-IL"]
+    assert lab.label("karşıyaka fethiye/mugla")["labels"] == ["B-MAHALLE", "B-ILCE", "O", "B-IL"]
+
+
+def test_label_file_parallel_keeps_order(tmp_path):
+    h, i = _files(tmp_path)
+    src = tmp_path / "in.csv"
+    rows = ["id,address"] + [f"{n},{'gümbet bodrum' if n % 3 else 'ali sokak'}" for n in range(40)]
+    src.write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+    out1, out2 = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    stats = label_file(src, out1, {}, chunk_size=7, hier_path=h, index_path=i)
+    label_file(src, out2, {}, chunk_size=7, n_jobs=2, hier_path=h, index_path=i)
+    assert out1.read_text(encoding="utf-8") == out2.read_text(encoding="utf-8")
+
+    first = [json.loads(x) for x in out1.read_text(encoding="utf-8").splitlines()[:2]]
+    assert [r["id"] for r in first] == ["0", "1"]
+    assert first[1]["labels"] == ["B-MAHALLE", "B-ILCE"]
+    assert stats["rows"] == 40 and stats["tagged_rows"] == 26
+
+    conll = tmp_path / "c.conll"
+    label_file(src, conll, {}, fmt="conll", limit=2, hier_path=h, index_path=i)
+    assert conll.read_text(encoding="utf-8") == "ali\tO\nsokak\tO\n\ngümbet\tB-MAHALLE\nbodrum\tB-ILCE\n\n"